@@ -1,14 +1,17 @@
 """
 Twitter account manager for handling multiple accounts
 """
-import tweepy
-from typing import List, Optional, Dict
+from typing import TYPE_CHECKING, List, Optional, Dict
 from config import Config
+from metrics import metrics
 from models import Account, SessionLocal
 from datetime import datetime
 import logging
 import time
 
+if TYPE_CHECKING:
+    import tweepy
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,6 +29,9 @@ class TwitterAccountManager:
         
         logger.info(f"Loading {len(account_numbers)} Twitter accounts...")
         
+        # Imported here so modules that only need the database stay fast to import
+        import tweepy
+        
         for account_num in account_numbers:
             try:
                 creds = Config.get_account_credentials(account_num)
@@ -81,11 +87,11 @@ class TwitterAccountManager:
         finally:
             db.close()
     
-    def get_account(self, account_number: int) -> Optional[tweepy.Client]:
+    def get_account(self, account_number: int) -> Optional['tweepy.Client']:
         """Get a specific account client"""
         return self.accounts.get(account_number)
     
-    def get_all_accounts(self) -> Dict[int, tweepy.Client]:
+    def get_all_accounts(self) -> Dict[int, 'tweepy.Client']:
         """Get all account clients"""
         return self.accounts
     
@@ -109,6 +115,7 @@ class TwitterAccountManager:
                 return False
             
             client.follow_user(target_user_id)
+            metrics.increment('api_calls', api='twitter_follow')
             logger.info(f"Account {account_number} followed user {target_user_id}")
             time.sleep(2)  # Rate limiting
             return True
@@ -124,6 +131,7 @@ class TwitterAccountManager:
                 return False
             
             client.retweet(tweet_id)
+            metrics.increment('api_calls', api='twitter_retweet')
             logger.info(f"Account {account_number} retweeted {tweet_id}")
             time.sleep(2)  # Rate limiting
             return True
@@ -139,6 +147,7 @@ class TwitterAccountManager:
                 return False
             
             client.like(tweet_id)
+            metrics.increment('api_calls', api='twitter_like')
             logger.info(f"Account {account_number} liked {tweet_id}")
             time.sleep(2)  # Rate limiting
             return True
@@ -154,6 +163,7 @@ class TwitterAccountManager:
                 return False
             
             client.create_tweet(text=text, in_reply_to_tweet_id=tweet_id)
+            metrics.increment('api_calls', api='twitter_reply')
             logger.info(f"Account {account_number} replied to {tweet_id}")
             time.sleep(2)  # Rate limiting
             return True
@@ -0,0 +1,6 @@
+"""
+Offline benchmark suite
+
+Runs the bot's hot paths against local stand-ins for Twitter and CoinGecko.
+See benchmarks/run.py.
+"""
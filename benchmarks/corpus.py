@@ -0,0 +1,133 @@
+"""
+Seeded synthetic tweet corpora
+"""
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator
+
+# Symbol -> (CoinGecko id, USD price); the last entries are unknown to CoinGecko
+TOKENS = {
+    'BTC': ('bitcoin', 65000.0),
+    'ETH': ('ethereum', 3200.0),
+    'SOL': ('solana', 150.0),
+    'BNB': ('binancecoin', 580.0),
+    'DOGE': ('dogecoin', 0.15),
+    'XRP': ('ripple', 0.55),
+    'LINK': ('chainlink', 14.0),
+    'PEPE': ('pepe', 0.00001),
+    'WIF': ('dogwifcoin', 2.5),
+    'ARB': ('arbitrum', 0.9),
+    'MOONX': (None, None),
+    'SCAMZ': (None, None),
+}
+
+GIVEAWAY_TEMPLATES = [
+    "🎁 GIVEAWAY! Win {amount} {symbol}! Follow @{handle}, RT and like to enter. Ends in {hours} hours",
+    "{amount} ${symbol} airdrop 🚀 ✅ Follow @{handle} ✅ Retweet ✅ Tag 3 friends. Deadline {date}",
+    "Free {symbol} giveaway for our community: {amount} {symbol} to 5 winners. Like + comment your wallet",
+    "CONTEST 🏆 We're giving away {amount} {symbol}! 1. Follow @{handle} 2. Retweet 3. Like. Winners in {days} days",
+    "Win {amount} {symbol} 💰 must follow @{handle} and reply with #crypto. Ends {date}",
+]
+
+NOISE_TEMPLATES = [
+    "{symbol} looking bullish today, chart is clean",
+    "Just bought more {symbol}, not financial advice",
+    "Anyone else watching {symbol} break resistance? 👀",
+    "Thread on why {symbol} fundamentals matter 🧵",
+    "Crypto markets are wild this week, {symbol} up again",
+    "Lost my keys again, crypto is hard",
+]
+
+WINNER_TEMPLATES = [
+    "Congratulations @{handle}! You won {amount} {symbol} in our giveaway, DM to claim your prize",
+    "@{handle} you're the winner of the {symbol} contest 🎉",
+    "Selected winner: @{handle}. Congrats!",
+]
+
+MENTION_TEMPLATES = [
+    "@{handle} thanks for joining the {symbol} community",
+    "@{handle} what do you think about {symbol}?",
+    "gm @{handle} ☀️",
+]
+
+
+def _fill(rng: random.Random, template: str, now: datetime) -> str:
+    symbol = rng.choice(list(TOKENS))
+    return template.format(
+        symbol=symbol,
+        amount=rng.choice(['1', '5', '10', '100', '1,000', '0.5', '50,000']),
+        handle=f"project{rng.randrange(1000)}",
+        hours=rng.choice([12, 24, 48, 72]),
+        days=rng.choice([1, 3, 7]),
+        date=(now + timedelta(days=rng.randrange(1, 10))).strftime('%B %d'),
+    )
+
+
+def generate_tweets(count: int, seed: int = 0, giveaway_ratio: float = 0.3,
+                    start_id: int = 1_000_000) -> Iterator[Dict]:
+    """
+    Generate search results with the fields of the TweetCandidates returned by
+    TwitterGiveawayBot._search_query
+
+    Args:
+        count: Number of tweets
+        seed: Random seed; the same seed always yields the same corpus
+        giveaway_ratio: Fraction of tweets that are giveaways
+        start_id: Id of the first tweet (ids increase by one)
+
+    Yields:
+        Tweet dictionaries, oldest first
+    """
+    rng = random.Random(seed)
+    now = datetime(2024, 1, 1)
+
+    for i in range(count):
+        templates = GIVEAWAY_TEMPLATES if rng.random() < giveaway_ratio else NOISE_TEMPLATES
+        author = rng.randrange(5000)
+        yield {
+            'id': start_id + i,
+            'text': _fill(rng, rng.choice(templates), now),
+            'author_id': 10_000 + author,
+            'author_username': f"user{author}",
+            'author_followers': rng.choice([50, 800, 2500, 10_000, 250_000]),
+            'created_at': now + timedelta(seconds=i),
+            'retweet_count': rng.randrange(500),
+            'like_count': rng.randrange(2000),
+        }
+
+
+def generate_mentions(count: int, seed: int = 0, winner_ratio: float = 0.05,
+                      start_id: int = 5_000_000) -> Iterator[Dict]:
+    """
+    Generate mentions of a bot account, some of them winner announcements
+
+    Yields:
+        Dictionaries with id, text and author_id
+    """
+    rng = random.Random(seed)
+    now = datetime(2024, 1, 1)
+
+    for i in range(count):
+        templates = WINNER_TEMPLATES if rng.random() < winner_ratio else MENTION_TEMPLATES
+        yield {
+            'id': start_id + i,
+            'text': _fill(rng, rng.choice(templates), now),
+            'author_id': 10_000 + rng.randrange(5000),
+        }
+
+
+def write_price_fixture(path: str) -> int:
+    """
+    Write the known TOKENS prices as a fixture for FixturePriceSource
+
+    Args:
+        path: Output JSON file
+
+    Returns:
+        Number of prices written
+    """
+    prices = {symbol: price for symbol, (_, price) in TOKENS.items() if price is not None}
+    with open(path, 'w') as f:
+        json.dump(prices, f, indent=2)
+    return len(prices)
@@ -0,0 +1,121 @@
+"""
+Local stand-ins for the Twitter and CoinGecko clients
+"""
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+from tweepy import Response
+
+from benchmarks.corpus import TOKENS
+
+
+class FakeSearchClient:
+    """tweepy.Client stand-in serving search_recent_tweets from a list of tweets"""
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Args:
+            latency: Seconds to sleep per request
+        """
+        self.latency = latency
+        self.tweets: List[Dict] = []  # oldest first
+        self.requests = 0
+
+    def publish(self, tweets: List[Dict]):
+        """Make tweets visible to searches (ids must keep increasing)"""
+        self.tweets.extend(tweets)
+
+    def search_recent_tweets(self, query: str, max_results: int = 10, since_id=None,
+                             next_token: Optional[str] = None, **kwargs) -> Response:
+        """Return tweets newer than since_id, newest first, max_results per page"""
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        # next_token is the index (from the newest end) where the page starts
+        end = len(self.tweets) - int(next_token or 0)
+        start = max(end - max_results, 0)
+        page = self.tweets[start:end]
+        if since_id is not None:
+            page = [tweet for tweet in page if tweet['id'] > int(since_id)]
+        page.reverse()
+
+        meta = {'result_count': len(page)}
+        if page:
+            meta['newest_id'] = str(page[0]['id'])
+            older = self.tweets[start - 1] if start > 0 else None
+            if older and (since_id is None or older['id'] > int(since_id)):
+                meta['next_token'] = str(len(self.tweets) - start)
+
+        data = [
+            SimpleNamespace(id=tweet['id'], text=tweet['text'], author_id=tweet['author_id'],
+                            created_at=tweet['created_at'],
+                            public_metrics={'retweet_count': tweet['retweet_count'],
+                                            'like_count': tweet['like_count']})
+            for tweet in page
+        ]
+        users = {
+            tweet['author_id']: SimpleNamespace(
+                id=tweet['author_id'], username=tweet['author_username'],
+                public_metrics={'followers_count': tweet['author_followers']})
+            for tweet in page
+        }
+        return Response(data or None, {'users': list(users.values())}, [], meta)
+
+
+class FakeMentionsClient:
+    """tweepy.Client stand-in serving get_users_mentions one page at a time"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.pages: List[List[Dict]] = []
+
+    def get_users_mentions(self, id, max_results: int = 10, **kwargs) -> Response:
+        """Return the next queued page of mentions"""
+        if self.latency:
+            time.sleep(self.latency)
+        page = self.pages.pop(0) if self.pages else []
+        data = [SimpleNamespace(**mention) for mention in page[:max_results]]
+        return Response(data or None, {}, [], {'result_count': len(data)})
+
+
+class FakeAccountManager:
+    """TwitterAccountManager stand-in with one account"""
+
+    def __init__(self, client):
+        self.client = client
+        self.account_info = {1: {'id': 1, 'username': 'benchbot', 'name': 'Bench Bot'}}
+
+    def get_active_accounts(self, limit: int = None) -> List[int]:
+        return [1]
+
+    def get_account(self, account_number: int):
+        return self.client
+
+    def update_account_stats(self, account_number: int, participated: bool = False,
+                             won: bool = False):
+        pass
+
+
+class FakeCoinGecko:
+    """CoinGeckoClient stand-in priced from the corpus token table"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+        self.prices = {coin_id: price for coin_id, price in TOKENS.values() if coin_id}
+
+    def get_price(self, ids: str, vs_currencies: str) -> Dict:
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return {coin_id: {vs_currencies: self.prices[coin_id]}
+                for coin_id in ids.split(',') if coin_id in self.prices}
+
+    def get_coins_list(self) -> List[Dict]:
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return [{'id': coin_id, 'symbol': symbol.lower(), 'name': coin_id}
+                for symbol, (coin_id, _) in TOKENS.items() if coin_id]
@@ -0,0 +1,172 @@
+"""
+Generate tweet corpora and replay them through the giveaway pipeline
+
+    python -m benchmarks.replay generate corpus.jsonl.gz --size 100000 --seed 1
+    python -m benchmarks.replay replay corpus.jsonl.gz --rate 200
+    python -m benchmarks.replay replay recorded.jsonl.gz --latency-ms 50
+
+Replay feeds each tweet to TwitterGiveawayBot._process_potential_giveaway, as
+the search phase does, with the fake Twitter and CoinGecko clients and a
+throwaway SQLite database unless --database is given. A corpus recorded in
+production (CORPUS_RECORD_PATH) replays the same way as a synthetic one.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable
+
+from benchmarks.run import _percentile
+
+
+@dataclass
+class ReplayReport:
+    """Outcome of one replay"""
+    tweets: int
+    accepted: int
+    seconds: float
+    p50_ms: float
+    p99_ms: float
+    max_lag_ms: float  # furthest any tweet started behind its scheduled time
+
+    @property
+    def rate(self) -> float:
+        return self.tweets / self.seconds if self.seconds else 0.0
+
+
+def replay(bot, tweets: Iterable[Dict], rate: float = 0.0,
+           clock: Callable[[], float] = time.perf_counter,
+           sleep: Callable[[float], None] = time.sleep) -> ReplayReport:
+    """
+    Feed tweets through the bot's giveaway processing at a controlled rate
+
+    Args:
+        bot: TwitterGiveawayBot (normally wired to fake clients)
+        tweets: TweetCandidates or tweet dictionaries, e.g. from read_corpus or generate_tweets
+        rate: Tweets per second (0 replays as fast as possible)
+        clock: Monotonic clock
+        sleep: Sleep function
+
+    Returns:
+        ReplayReport
+    """
+    durations = array('d')
+    accepted = 0
+    max_lag = 0.0
+    start = clock()
+
+    for i, tweet_data in enumerate(tweets):
+        if rate:
+            due = start + i / rate
+            now = clock()
+            if now < due:
+                sleep(due - now)
+            else:
+                max_lag = max(max_lag, now - due)
+
+        began = clock()
+        if bot._process_potential_giveaway(tweet_data):
+            accepted += 1
+        durations.append(clock() - began)
+
+    bot.giveaway_writer.flush()
+    seconds = clock() - start
+    durations = sorted(durations)
+
+    return ReplayReport(
+        tweets=len(durations),
+        accepted=accepted,
+        seconds=seconds,
+        p50_ms=_percentile(durations, 0.50) * 1000,
+        p99_ms=_percentile(durations, 0.99) * 1000,
+        max_lag_ms=max_lag * 1000,
+    )
+
+
+def _generate(args) -> int:
+    from benchmarks.corpus import generate_tweets, write_price_fixture
+    from tweet_corpus import write_corpus
+
+    count = write_corpus(
+        generate_tweets(args.size, args.seed, giveaway_ratio=args.giveaway_ratio), args.output
+    )
+    print(f"Wrote {count:,} tweets to {args.output}")
+    if args.prices:
+        print(f"Wrote {write_price_fixture(args.prices)} prices to {args.prices}")
+    return 0
+
+
+def _replay(args) -> int:
+    # Config reads DATABASE_URL at import time, so choose the database first
+    tmp = None
+    if args.database:
+        os.environ['DATABASE_URL'] = args.database
+    else:
+        tmp = tempfile.TemporaryDirectory(prefix='giveaway-replay-')
+        os.environ['DATABASE_URL'] = f"sqlite:///{Path(tmp.name) / 'replay.db'}"
+    if args.prices:
+        # Price tokens from the fixture file instead of the fake CoinGecko client
+        os.environ['PRICE_SOURCES'] = 'cache,fixture'
+        os.environ['PRICE_FIXTURE_PATH'] = args.prices
+
+    try:
+        from benchmarks.suite import BenchmarkContext, make_bot
+        from records import TweetCandidate
+        from tweet_corpus import read_corpus
+
+        bot = make_bot(BenchmarkContext(size=0, latency=args.latency_ms / 1000))
+        tweets = map(TweetCandidate.from_dict, read_corpus(args.corpus))
+        if args.limit:
+            tweets = (tweet_data for _, tweet_data in zip(range(args.limit), tweets))
+
+        report = replay(bot, tweets, rate=args.rate)
+    finally:
+        if tmp:
+            tmp.cleanup()
+
+    target = f", target {args.rate:g}/s" if args.rate else ''
+    print(f"Replayed {report.tweets:,} tweets in {report.seconds:.2f}s ({report.rate:,.1f}/s{target})")
+    print(f"  accepted giveaways: {report.accepted:,}")
+    print(f"  per tweet: p50 {report.p50_ms:.3f} ms, p99 {report.p99_ms:.3f} ms")
+    if args.rate:
+        print(f"  max lag behind schedule: {report.max_lag_ms:.1f} ms")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate and replay tweet corpora")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help="Write a seeded synthetic corpus")
+    generate.add_argument('output', help="Corpus file (.jsonl or .jsonl.gz)")
+    generate.add_argument('--size', type=int, default=10_000, help="Tweets to generate")
+    generate.add_argument('--seed', type=int, default=0, help="Random seed")
+    generate.add_argument('--giveaway-ratio', type=float, default=0.3,
+                          help="Fraction of tweets that are giveaways")
+    generate.add_argument('--prices', metavar='FILE',
+                          help="Also write the corpus token prices as a price fixture")
+    generate.set_defaults(handler=_generate)
+
+    replay_parser = commands.add_parser('replay', help="Feed a corpus through the pipeline")
+    replay_parser.add_argument('corpus', help="Corpus file (.jsonl or .jsonl.gz)")
+    replay_parser.add_argument('--rate', type=float, default=0.0,
+                               help="Tweets per second (default: as fast as possible)")
+    replay_parser.add_argument('--limit', type=int, default=0, help="Replay at most this many tweets")
+    replay_parser.add_argument('--latency-ms', type=float, default=0.0,
+                               help="Simulated latency per fake API request")
+    replay_parser.add_argument('--database', metavar='URL',
+                               help="Database to write to (default: a throwaway SQLite file)")
+    replay_parser.add_argument('--prices', metavar='FILE',
+                               help="Price fixture to use instead of the fake CoinGecko client")
+    replay_parser.set_defaults(handler=_replay)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
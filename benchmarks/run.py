@@ -0,0 +1,207 @@
+"""
+Run the offline benchmark suite
+
+    python -m benchmarks.run                          # every benchmark, 10k tweets
+    python -m benchmarks.run parse_rules --size 1000000
+    python -m benchmarks.run --latency-ms 50          # simulate API round trips
+    python -m benchmarks.run --save benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json
+
+Each benchmark runs in its own process against a throwaway SQLite database,
+so peak RSS and database state are per benchmark. Peak RSS includes the fake
+API clients and the corpus window they serve.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Benchmark names, in run order (must match benchmarks/suite.py)
+BENCHMARK_NAMES = [
+    'search_giveaways',
+    'process_potential_giveaway',
+    'parse_rules',
+    'extract_token_info',
+    'print_statistics',
+    'winner_matching',
+    'check_mentions',
+]
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def run_worker(name: str, size: int, seed: int, latency: float) -> Dict:
+    """Run one benchmark in this process and summarize it"""
+    from benchmarks.suite import BENCHMARKS, BenchmarkContext
+
+    measurement = BENCHMARKS[name](BenchmarkContext(size=size, seed=seed, latency=latency))
+    durations = sorted(measurement.durations)
+    seconds = sum(durations)
+
+    return {
+        'ops': len(durations),
+        'items': measurement.items,
+        'seconds': round(seconds, 4),
+        'throughput': round(measurement.items / seconds, 1) if seconds else 0.0,
+        'p50_ms': round(_percentile(durations, 0.50) * 1000, 4),
+        'p99_ms': round(_percentile(durations, 0.99) * 1000, 4),
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def run_benchmark(name: str, size: int, seed: int, latency: float) -> Dict:
+    """Run one benchmark in a fresh process with its own database"""
+    with tempfile.TemporaryDirectory(prefix='giveaway-bench-') as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{Path(tmp) / 'bench.db'}")
+        completed = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.run', '--worker', name,
+             '--size', str(size), '--seed', str(seed), '--latency-ms', str(latency * 1000)],
+            cwd=ROOT, env=env, capture_output=True, text=True
+        )
+
+    if completed.returncode != 0:
+        raise RuntimeError(f"Benchmark {name} failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """
+    Find benchmarks that regressed against a baseline
+
+    Args:
+        results: Benchmark name -> summary
+        baseline: Benchmark name -> summary from an earlier run
+        tolerance: Allowed relative change (0.25 = 25%)
+
+    Returns:
+        Descriptions of the regressions
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if base['throughput'] and result['throughput'] < base['throughput'] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base['throughput']} -> {result['throughput']}/s")
+        if base['p99_ms'] and result['p99_ms'] > base['p99_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {base['p99_ms']} -> {result['p99_ms']} ms")
+        if base.get('peak_rss_mb') and result.get('peak_rss_mb') and \
+                result['peak_rss_mb'] > base['peak_rss_mb'] * (1 + tolerance):
+            regressions.append(f"{name}: peak RSS {base['peak_rss_mb']:.1f} -> "
+                               f"{result['peak_rss_mb']:.1f} MB")
+    return regressions
+
+
+def print_report(results: Dict[str, Dict], baseline: Optional[Dict[str, Dict]] = None):
+    """Print a results table, with throughput change against the baseline if given"""
+    print("=" * 96)
+    print(f"{'benchmark':<28}{'items':>10}{'items/s':>14}{'p50 ms':>11}{'p99 ms':>11}"
+          f"{'peak RSS MB':>13}{'vs base':>9}")
+    print("=" * 96)
+    for name, result in results.items():
+        change = ''
+        base = (baseline or {}).get(name)
+        if base and base['throughput']:
+            change = f"{(result['throughput'] / base['throughput'] - 1) * 100:+.0f}%"
+        rss = result['peak_rss_mb']
+        print(f"{name:<28}{result['items']:>10}{result['throughput']:>14,.1f}"
+              f"{result['p50_ms']:>11.3f}{result['p99_ms']:>11.3f}"
+              f"{rss if rss is not None else float('nan'):>13.1f}{change:>9}")
+    print()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the giveaway bot")
+    parser.add_argument('benchmarks', nargs='*',
+                        help=f"Benchmarks to run (default: all of {', '.join(BENCHMARK_NAMES)})")
+    parser.add_argument('--size', type=int, default=10_000, help="Tweets in the corpus")
+    parser.add_argument('--seed', type=int, default=0, help="Corpus random seed")
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                        help="Simulated latency per fake API request")
+    parser.add_argument('--save', metavar='PATH', help="Write results as a baseline file")
+    parser.add_argument('--compare', metavar='PATH', help="Compare against a baseline file")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed relative regression when comparing (default 0.25)")
+    parser.add_argument('--worker', metavar='NAME', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    latency = args.latency_ms / 1000
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.size, args.seed, latency)))
+        return 0
+
+    names = args.benchmarks or BENCHMARK_NAMES
+    unknown = sorted(set(names) - set(BENCHMARK_NAMES))
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+    print(f"Running {len(names)} benchmarks on {args.size:,} tweets "
+          f"(seed {args.seed}, latency {args.latency_ms:g} ms)")
+    results = {}
+    for name in names:
+        print(f"  {name}...", flush=True)
+        results[name] = run_benchmark(name, args.size, args.seed, latency)
+    print()
+
+    baseline = None
+    if args.compare and Path(args.compare).exists():
+        with open(args.compare) as f:
+            saved = json.load(f)
+        if saved['meta']['size'] != args.size:
+            print(f"Baseline was recorded with {saved['meta']['size']:,} tweets; not comparing")
+        else:
+            baseline = saved['results']
+    elif args.compare:
+        print(f"No baseline at {args.compare}; not comparing")
+
+    print_report(results, baseline)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'meta': {
+                    'size': args.size,
+                    'seed': args.seed,
+                    'latency_ms': args.latency_ms,
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'recorded_at': datetime.utcnow().isoformat(timespec='seconds'),
+                },
+                'results': results,
+            }, f, indent=2)
+        print(f"Saved results to {args.save}")
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"❌ {regression}")
+        if regressions:
+            return 1
+        print(f"✅ No regressions beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
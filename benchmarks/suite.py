@@ -0,0 +1,167 @@
+"""
+Benchmark definitions
+
+Imported only inside a benchmark worker process, after DATABASE_URL points at
+that worker's throwaway database.
+"""
+import contextlib
+import io
+import itertools
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Callable, Dict
+from unittest.mock import patch
+
+import bot as bot_module
+import price_checker as price_checker_module
+from benchmarks.corpus import generate_mentions, generate_tweets
+from benchmarks.fakes import FakeAccountManager, FakeCoinGecko, FakeMentionsClient, FakeSearchClient
+from config import Config
+from giveaway_parser import GiveawayParser
+from giveaway_writer import GiveawayWriter
+from models import init_db
+from records import TweetCandidate
+from rollups import rebuild_rollups
+from stats import print_statistics
+from winner_detector import WinnerDetector
+
+
+@dataclass
+class BenchmarkContext:
+    """Parameters shared by all benchmarks"""
+    size: int  # tweets in the corpus
+    seed: int = 0
+    latency: float = 0.0  # seconds per fake API request
+
+
+class Measurement:
+    """Per-operation timings of one benchmark"""
+
+    def __init__(self):
+        self.durations = array('d')
+        self.items = 0
+
+    def time(self, fn: Callable, *args, items: int = 1, **kwargs):
+        """Call fn, recording its duration as one operation covering `items` items"""
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.durations.append(time.perf_counter() - start)
+        self.items += items
+        return result
+
+
+BENCHMARKS: Dict[str, Callable[[BenchmarkContext], Measurement]] = {}
+
+
+def benchmark(name: str):
+    """Register a benchmark function under a name"""
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+def make_bot(ctx: BenchmarkContext):
+    """Create a TwitterGiveawayBot wired to the fake Twitter and CoinGecko clients"""
+    with patch.object(bot_module, 'TwitterAccountManager',
+                      lambda: FakeAccountManager(FakeMentionsClient(ctx.latency))), \
+            patch.object(price_checker_module, 'CoinGeckoClient',
+                         lambda: FakeCoinGecko(ctx.latency)):
+        bot = bot_module.TwitterGiveawayBot()
+
+    bot.price_checker.coin_index.stop()
+    bot.price_checker.coin_index.refresh()
+    bot.search_client = FakeSearchClient(ctx.latency)
+    return bot
+
+
+@benchmark('search_giveaways')
+def bench_search_giveaways(ctx: BenchmarkContext) -> Measurement:
+    """Search passes, each finding one window's worth of new tweets"""
+    bot = make_bot(ctx)
+    pass_size = Config.SEARCH_MAX_PAGES * 100
+    tweets = generate_tweets(ctx.size, ctx.seed)
+    measurement = Measurement()
+
+    while True:
+        window = list(itertools.islice(tweets, pass_size))
+        if not window:
+            return measurement
+        bot.search_client.publish(window)
+        measurement.time(bot.search_giveaways, items=len(window))
+
+
+@benchmark('process_potential_giveaway')
+def bench_process_potential_giveaway(ctx: BenchmarkContext) -> Measurement:
+    """Token extraction, filtering and buffered saving, one tweet at a time"""
+    bot = make_bot(ctx)
+    measurement = Measurement()
+    for tweet_data in map(TweetCandidate.from_dict, generate_tweets(ctx.size, ctx.seed)):
+        measurement.time(bot._process_potential_giveaway, tweet_data)
+    bot.giveaway_writer.flush()
+    return measurement
+
+
+@benchmark('parse_rules')
+def bench_parse_rules(ctx: BenchmarkContext) -> Measurement:
+    """Rule parsing per tweet"""
+    parser = GiveawayParser()
+    measurement = Measurement()
+    for tweet_data in generate_tweets(ctx.size, ctx.seed):
+        measurement.time(parser.parse_rules, tweet_data['text'])
+    return measurement
+
+
+@benchmark('extract_token_info')
+def bench_extract_token_info(ctx: BenchmarkContext) -> Measurement:
+    """Token and price extraction per tweet (prices come from the fake CoinGecko)"""
+    bot = make_bot(ctx)
+    measurement = Measurement()
+    for tweet_data in generate_tweets(ctx.size, ctx.seed):
+        measurement.time(bot.price_checker.extract_token_info, tweet_data['text'])
+    return measurement
+
+
+@benchmark('print_statistics')
+def bench_print_statistics(ctx: BenchmarkContext) -> Measurement:
+    """Dashboard rendering over a database holding the corpus' giveaways"""
+    init_db()
+    writer = GiveawayWriter()
+    for tweet_data in generate_tweets(ctx.size, ctx.seed, giveaway_ratio=1.0):
+        writer.add(tweet_data, {'token_symbol': 'BTC', 'token_price_usd': 65000.0})
+    writer.flush()
+    rebuild_rollups()
+
+    measurement = Measurement()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(50):
+            measurement.time(print_statistics)
+    return measurement
+
+
+@benchmark('winner_matching')
+def bench_winner_matching(ctx: BenchmarkContext) -> Measurement:
+    """Winner announcement detection per mention"""
+    detector = WinnerDetector(FakeAccountManager(None))
+    measurement = Measurement()
+    for mention in generate_mentions(ctx.size, ctx.seed):
+        measurement.time(detector._is_winner_announcement, mention['text'])
+    return measurement
+
+
+@benchmark('check_mentions')
+def bench_check_mentions(ctx: BenchmarkContext) -> Measurement:
+    """Mention checks of 100 mentions each, saving the winner notifications found"""
+    init_db()
+    client = FakeMentionsClient(ctx.latency)
+    detector = WinnerDetector(FakeAccountManager(client))
+    mentions = generate_mentions(ctx.size, ctx.seed)
+    measurement = Measurement()
+
+    while True:
+        page = list(itertools.islice(mentions, 100))
+        if not page:
+            return measurement
+        client.pages.append(page)
+        measurement.time(detector._check_mentions, 1, items=len(page))
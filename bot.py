@@ -1,8 +1,8 @@
 """
 Main bot orchestrator
 """
-import tweepy
-from typing import List, Dict
+from collections import Counter, defaultdict
+from typing import List, Dict, Optional, Tuple, Union
 from datetime import datetime, timedelta
 import logging
 import time
@@ -10,12 +10,34 @@ import time
 from config import Config
 from models import Giveaway, SessionLocal, init_db
 from account_manager import TwitterAccountManager
-from price_checker import PriceChecker
+from dedup import SeenTweetFilter
+from near_duplicates import NearDuplicateIndex, fingerprint, from_signed
+from giveaway_writer import GiveawayWriter
+from pending_giveaways import PendingGiveaway, expire_giveaways, iter_pending_giveaways
+from records import TokenInfo, TweetCandidate
+from search_checkpoints import SearchCheckpoints
+from search_planner import KeywordRouter, PlannedQuery, plan_queries
+from tweet_corpus import write_corpus
+from price_checker import PriceChecker, select_token
 from giveaway_parser import GiveawayParser
 from winner_detector import WinnerDetector
+from metrics import metrics
+from rollups import record_participation
+from stats_engine import collect_statistics
 
 logger = logging.getLogger(__name__)
 
+# Keyword sets searched each cycle, and the operators applied to all of them
+SEARCH_KEYWORDS = [
+    "crypto giveaway",
+    "token giveaway",
+    "BTC giveaway",
+    "ETH giveaway",
+    "crypto airdrop",
+    "win crypto",
+]
+SEARCH_FILTERS = "-is:retweet lang:en"
+
 
 class TwitterGiveawayBot:
     """Main bot class for finding and participating in crypto giveaways"""
@@ -31,8 +53,28 @@ class TwitterGiveawayBot:
         self.price_checker = PriceChecker()
         self.giveaway_parser = GiveawayParser()
         self.winner_detector = WinnerDetector(self.account_manager)
+        self.seen_tweets = SeenTweetFilter()
+        self.seen_tweets.warm()
+        self.near_duplicates = NearDuplicateIndex()
+        self.near_duplicates.warm()
+        self.giveaway_writer = GiveawayWriter(
+            on_flush=self.seen_tweets.add,
+            on_insert=self._index_stored_giveaways,
+            on_failure=lambda rows: self.near_duplicates.discard_pending(
+                row['tweet_id'] for row in rows
+            ),
+        )
+        self.search_checkpoints = SearchCheckpoints()
+        self.search_checkpoints.load()
+        self._unpriced: List[str] = []  # giveaways this pass left unpriced by a failing price source
+        self.keyword_router = KeywordRouter(SEARCH_KEYWORDS)
+        
+        # Keep the local symbol -> coin id index fresh (only needed to ask CoinGecko)
+        if 'coingecko' in Config.PRICE_SOURCES:
+            self.price_checker.coin_index.start_background_refresh()
         
         # Create search client using bearer token
+        import tweepy
         self.search_client = tweepy.Client(
             bearer_token=Config.TWITTER_BEARER_TOKEN,
             wait_on_rate_limit=True
@@ -40,101 +82,279 @@ class TwitterGiveawayBot:
         
         logger.info("Bot initialized successfully!")
     
-    def search_giveaways(self) -> List[Dict]:
+    def search_giveaways(self) -> List[TweetCandidate]:
         """Search for crypto giveaway tweets"""
         logger.info("Searching for crypto giveaways...")
         
         giveaways = []
+        candidates = []
         
-        # Build search queries
+        # Build search queries (keyword sets merged into as few requests as possible);
+        # the client waits on rate limits itself, so requests are sent back to back
         queries = self._build_search_queries()
+        keyword_counts = Counter()
+        tweet_queries = defaultdict(list)  # tweet id -> queries that returned it
+        self._unpriced = []
         
-        for query in queries:
+        for planned in queries:
+            query = planned.query
             try:
-                logger.info(f"Searching with query: {query}")
-                
-                # Search tweets from last 24 hours
-                end_time = datetime.utcnow()
-                start_time = end_time - timedelta(hours=24)
-                
-                tweets = self.search_client.search_recent_tweets(
-                    query=query,
-                    max_results=100,
-                    start_time=start_time.isoformat() + 'Z',
-                    tweet_fields=['created_at', 'author_id', 'public_metrics', 'text'],
-                    user_fields=['username', 'public_metrics'],
-                    expansions=['author_id']
-                )
+                since_id = self.search_checkpoints.since_id(query)
+                logger.info(f"Searching with query: {query} (since {since_id or 'lookback window'})")
+                with metrics.span('search_query', query=planned.keywords[0]):
+                    tweets, newest_id = self._search_query(query, since_id)
                 
-                if not tweets.data:
-                    continue
+                # Route each result back to the keyword sets that matched it
+                for tweet_data in tweets:
+                    matched = self.keyword_router.match(tweet_data.text, planned.keywords)
+                    tweet_data.matched_keywords = matched
+                    keyword_counts.update(matched)
+                    tweet_queries[str(tweet_data.id)].append(query)
                 
-                # Process tweets
-                users_dict = {user.id: user for user in tweets.includes.get('users', [])}
-                
-                for tweet in tweets.data:
-                    author = users_dict.get(tweet.author_id)
-                    if not author:
-                        continue
-                    
-                    tweet_data = {
-                        'id': tweet.id,
-                        'text': tweet.text,
-                        'author_id': tweet.author_id,
-                        'author_username': author.username,
-                        'author_followers': author.public_metrics.get('followers_count', 0),
-                        'created_at': tweet.created_at,
-                        'retweet_count': tweet.public_metrics.get('retweet_count', 0),
-                        'like_count': tweet.public_metrics.get('like_count', 0)
-                    }
-                    
-                    # Check if it's a valid giveaway
-                    if self._process_potential_giveaway(tweet_data):
-                        giveaways.append(tweet_data)
-                
-                # Rate limiting
-                time.sleep(5)
+                candidates.extend(tweets)
+                if newest_id:
+                    self.search_checkpoints.advance(query, newest_id)
                 
             except Exception as e:
                 logger.error(f"Error searching with query '{query}': {e}")
         
+        if keyword_counts:
+            logger.info("Results per keyword: " + ", ".join(
+                f"{keyword}={count}" for keyword, count in keyword_counts.most_common()
+            ))
+        
+        # Drop tweets returned by more than one query
+        candidates = list({str(tweet_data.id): tweet_data for tweet_data in candidates}.values())
+        
+        if Config.CORPUS_RECORD_PATH and candidates:
+            self._record_corpus(candidates)
+        
+        # Classify the whole pass up front so only giveaways reach price and DB checks
+        with metrics.span('classify_batch'):
+            batch = self.giveaway_parser.classify_batch(candidates)
+        
+        # Check all giveaway tweet ids against the database at once
+        giveaway_rows = batch.where('is_giveaway')
+        with metrics.span('dedup_check'):
+            new_ids = self.seen_tweets.filter_new(batch.ids[i] for i in giveaway_rows)
+        giveaway_rows = [i for i in giveaway_rows if str(batch.ids[i]) in new_ids]
+        
+        # Link reposts of stored giveaways to their originals before pricing anything
+        with metrics.span('near_duplicate_check'):
+            giveaway_rows = self._drop_near_duplicates(candidates, batch, giveaway_rows)
+        
+        # Resolve prices for every token seen this pass in one batch
+        symbols = {batch.token_symbol[i] for i in giveaway_rows if batch.token_symbol[i]}
+        if symbols:
+            with metrics.span('price_prefetch'):
+                self.price_checker.get_token_prices(sorted(symbols))
+        
+        failed_batches = self.giveaway_writer.failed_batches
+        try:
+            for i in giveaway_rows:
+                tweet_data = candidates[i]
+                # Check if it's a valid giveaway
+                if self._process_potential_giveaway(tweet_data, known_new=True):
+                    giveaways.append(tweet_data)
+        finally:
+            # Write everything accepted this pass in one transaction
+            self.giveaway_writer.flush()
+        
+        # Only move the checkpoints once this pass is stored; otherwise search it again.
+        # Giveaways left unpriced by a failing price source are searched again too
+        for tweet_id in self._unpriced:
+            for query in tweet_queries.get(str(tweet_id), ()):
+                self.search_checkpoints.hold(query, tweet_id)
+        if self.giveaway_writer.failed_batches == failed_batches:
+            self.search_checkpoints.save()
+        
         logger.info(f"Found {len(giveaways)} potential giveaways")
         return giveaways
     
-    def _build_search_queries(self) -> List[str]:
+    def _drop_near_duplicates(self, candidates: List[TweetCandidate], batch,
+                              rows: List[int]) -> List[int]:
+        """
+        Link the tweets that repost a stored giveaway to it
+        
+        Args:
+            candidates: This pass' search results
+            batch: Their ClassificationBatch
+            rows: Row indices of new giveaway tweets
+            
+        Returns:
+            Row indices of the tweets that are not reposts
+        """
+        remaining = []
+        for i in rows:
+            # Reuse the symbol the classifier already picked
+            if candidates[i].token_symbol is None:
+                candidates[i].token_symbol = batch.token_symbol[i]
+            if not self._link_near_duplicate(candidates[i]):
+                remaining.append(i)
+        
+        # Identical reposts of giveaways no longer in memory
+        fingerprints = {candidates[i].fingerprint for i in remaining if candidates[i].fingerprint}
+        if not fingerprints:
+            return remaining
+        stored = self.near_duplicates.find_stored(fingerprints)
+        
+        rows, remaining = remaining, []
+        for i in rows:
+            tweet_data = candidates[i]
+            original = stored.get(tweet_data.fingerprint)
+            if original is not None and original != str(tweet_data.id):
+                self.giveaway_writer.add_duplicate(tweet_data, original, 0)
+                metrics.increment('near_duplicates')
+            else:
+                remaining.append(i)
+        return remaining
+    
+    def _fingerprint(self, tweet_data: TweetCandidate) -> Tuple[int, Optional[str]]:
+        """Get a tweet's text fingerprint and token symbol, computed once per tweet"""
+        if tweet_data.fingerprint is None:
+            tweet_data.fingerprint = fingerprint(tweet_data.text)
+            if tweet_data.token_symbol is None:
+                tweet_data.token_symbol = select_token(
+                    tweet_data.text, self.giveaway_parser.stop_words
+                )[0]
+        return tweet_data.fingerprint, tweet_data.token_symbol
+    
+    def _link_near_duplicate(self, tweet_data: TweetCandidate) -> bool:
+        """
+        Queue a link to the giveaway a tweet reposts, if it is a near-duplicate
+        
+        Returns:
+            True if the tweet is a near-duplicate and needs no further processing
+        """
+        text_fingerprint, token_symbol = self._fingerprint(tweet_data)
+        original = self.near_duplicates.find(text_fingerprint, token_symbol, str(tweet_data.id))
+        if original is None:
+            return False
+        
+        logger.debug(f"Tweet {tweet_data.id} reposts giveaway {original.tweet_id} "
+                     f"({original.distance} bits apart)")
+        self.giveaway_writer.add_duplicate(tweet_data, original.tweet_id, original.distance)
+        metrics.increment('near_duplicates')
+        return True
+    
+    def _record_corpus(self, tweets: List[TweetCandidate]):
+        """Append this pass' search results to CORPUS_RECORD_PATH for offline replay"""
+        try:
+            write_corpus([tweet.to_dict() for tweet in tweets], Config.CORPUS_RECORD_PATH, append=True)
+        except (OSError, TypeError) as e:
+            logger.error(f"Error recording search results to {Config.CORPUS_RECORD_PATH}: {e}")
+    
+    def _search_query(self, query: str,
+                      since_id: str = None) -> Tuple[List[TweetCandidate], Optional[str]]:
+        """
+        Run a single search query
+        
+        Args:
+            query: Search query
+            since_id: Only return tweets newer than this id (defaults to the
+                last SEARCH_LOOKBACK_HOURS)
+            
+        Returns:
+            Tuple of (tweets found, newest tweet id or None)
+        """
+        params = {
+            'query': query,
+            'max_results': 100,
+            'tweet_fields': ['created_at', 'author_id', 'public_metrics', 'text'],
+            'user_fields': ['username', 'public_metrics'],
+            'expansions': ['author_id'],
+        }
+        if since_id:
+            params['since_id'] = since_id
+        else:
+            start_time = datetime.utcnow() - timedelta(hours=Config.SEARCH_LOOKBACK_HOURS)
+            params['start_time'] = start_time.isoformat() + 'Z'
+        
+        results = []
+        newest_id = None
+        
+        # Results come newest first, 100 per page
+        for _ in range(Config.SEARCH_MAX_PAGES):
+            tweets = self.search_client.search_recent_tweets(**params)
+            metrics.increment('api_calls', api='twitter_search')
+            meta = tweets.meta or {}
+            newest_id = newest_id or meta.get('newest_id')
+            results.extend(self._parse_search_page(tweets))
+            
+            next_token = meta.get('next_token')
+            if not next_token:
+                break
+            params['next_token'] = next_token
+        else:
+            logger.warning(f"Stopped after {Config.SEARCH_MAX_PAGES} pages for query '{query}'; "
+                           f"older results in this window are skipped")
+        
+        metrics.increment('tweets_fetched', len(results))
+        return results, newest_id
+    
+    def _parse_search_page(self, tweets) -> List[TweetCandidate]:
+        """Convert one page of search results to tweet candidates"""
+        if not tweets.data:
+            return []
+        
+        users_dict = {user.id: user for user in tweets.includes.get('users', [])}
+        
+        results = []
+        for tweet in tweets.data:
+            author = users_dict.get(tweet.author_id)
+            if not author:
+                continue
+            
+            results.append(TweetCandidate(
+                id=tweet.id,
+                text=tweet.text,
+                author_id=tweet.author_id,
+                author_username=author.username,
+                author_followers=author.public_metrics.get('followers_count', 0),
+                created_at=tweet.created_at,
+                retweet_count=tweet.public_metrics.get('retweet_count', 0),
+                like_count=tweet.public_metrics.get('like_count', 0)
+            ))
+        
+        return results
+    
+    def _build_search_queries(self) -> List[PlannedQuery]:
         """Build Twitter search queries for crypto giveaways"""
-        queries = [
-            "crypto giveaway -is:retweet lang:en",
-            "token giveaway -is:retweet lang:en",
-            "BTC giveaway -is:retweet lang:en",
-            "ETH giveaway -is:retweet lang:en",
-            "crypto airdrop -is:retweet lang:en",
-            "win crypto -is:retweet lang:en",
-        ]
-        return queries
+        return plan_queries(SEARCH_KEYWORDS, SEARCH_FILTERS, Config.SEARCH_QUERY_MAX_LENGTH)
     
-    def _process_potential_giveaway(self, tweet_data: Dict) -> bool:
-        """Process a potential giveaway tweet"""
+    def _process_potential_giveaway(self, tweet_data: Union[TweetCandidate, Dict],
+                                    known_new: bool = False) -> bool:
+        """Process a potential giveaway tweet (a TweetCandidate, or a dict such as a corpus line)"""
         try:
-            # Check if already in database
-            db = SessionLocal()
-            existing = db.query(Giveaway).filter_by(tweet_id=tweet_data['id']).first()
-            db.close()
+            tweet_data = TweetCandidate.from_dict(tweet_data)
+            
+            # Check if already in database (skipped when the caller already checked)
+            if not known_new and not self.seen_tweets.filter_new([tweet_data.id]):
+                return False
             
-            if existing:
+            # Reposts of a giveaway found earlier are linked to it instead of priced again
+            if (self.giveaway_parser.is_giveaway_tweet(tweet_data.text)
+                    and self._link_near_duplicate(tweet_data)):
                 return False
             
             # Extract token information
-            token_info = self.price_checker.extract_token_info(tweet_data['text'])
+            token_info = self.price_checker.extract_token_info(tweet_data.text)
             
             # Check if it's a valuable giveaway
             if not self.price_checker.is_valuable_giveaway(token_info):
-                logger.debug(f"Tweet {tweet_data['id']} doesn't meet value requirements")
+                if (token_info.token_symbol and token_info.token_price_usd is None
+                        and self.price_checker.price_unavailable(token_info.token_symbol)):
+                    logger.debug(f"Tweet {tweet_data.id} deferred: no price for "
+                                 f"{token_info.token_symbol} while a price source is failing")
+                    metrics.increment('giveaways_unpriced')
+                    self._unpriced.append(tweet_data.id)
+                    return False
+                logger.debug(f"Tweet {tweet_data.id} doesn't meet value requirements")
                 return False
             
             # Check if we should participate
             if not self.giveaway_parser.should_participate(tweet_data, token_info):
-                logger.debug(f"Tweet {tweet_data['id']} doesn't meet participation criteria")
+                logger.debug(f"Tweet {tweet_data.id} doesn't meet participation criteria")
                 return False
             
             # Save to database
@@ -146,48 +366,44 @@ class TwitterGiveawayBot:
             logger.error(f"Error processing tweet {tweet_data.get('id')}: {e}")
             return False
     
-    def _save_giveaway(self, tweet_data: Dict, token_info: Dict):
-        """Save giveaway to database"""
-        db = SessionLocal()
-        try:
-            giveaway = Giveaway(
-                tweet_id=tweet_data['id'],
-                author_id=tweet_data['author_id'],
-                author_username=tweet_data['author_username'],
-                tweet_text=tweet_data['text'],
-                token_name=token_info.get('token_name'),
-                token_symbol=token_info.get('token_symbol'),
-                token_price_usd=token_info.get('token_price_usd'),
-                estimated_value_usd=token_info.get('estimated_value_usd')
-            )
-            db.add(giveaway)
-            db.commit()
-            logger.info(f"Saved giveaway {tweet_data['id']} to database")
-        finally:
-            db.close()
+    def _save_giveaway(self, tweet_data: TweetCandidate, token_info: TokenInfo):
+        """Queue giveaway for the next batched database write"""
+        deadline = self.giveaway_parser.parse_deadline(tweet_data.text, tweet_data.created_at)
+        text_fingerprint, _ = self._fingerprint(tweet_data)
+        # Later copies in this pass are linked to it even before the batch is written;
+        # they join the same batch, and the entry is dropped if the batch rolls back
+        self.near_duplicates.add(tweet_data.id, text_fingerprint, token_info.token_symbol,
+                                 pending=True)
+        self.giveaway_writer.add(tweet_data, token_info, deadline, text_fingerprint)
+    
+    def _index_stored_giveaways(self, rows: List[Dict]):
+        """Keep the fingerprints of newly stored giveaways for near-duplicate checks"""
+        for row in rows:
+            if row['fingerprint'] is not None:
+                self.near_duplicates.add(row['tweet_id'], from_signed(row['fingerprint']),
+                                         row['token_symbol'])
     
     def participate_in_giveaways(self):
         """Participate in all pending giveaways"""
         logger.info("Participating in giveaways...")
         
-        db = SessionLocal()
-        try:
-            # Get giveaways that haven't been participated in yet
-            pending = db.query(Giveaway).filter_by(participated=False).all()
-            
-            logger.info(f"Found {len(pending)} pending giveaways")
-            
-            for giveaway in pending:
-                try:
+        # Drop giveaways whose deadline has passed before paging through the rest
+        expire_giveaways()
+        
+        # Pending giveaways are streamed page by page, most valuable first
+        processed = 0
+        for giveaway in iter_pending_giveaways():
+            processed += 1
+            try:
+                with metrics.span('participate_giveaway'):
                     self._participate_in_giveaway(giveaway)
-                    time.sleep(10)  # Rate limiting between giveaways
-                except Exception as e:
-                    logger.error(f"Error participating in giveaway {giveaway.tweet_id}: {e}")
-            
-        finally:
-            db.close()
+                time.sleep(10)  # Rate limiting between giveaways
+            except Exception as e:
+                logger.error(f"Error participating in giveaway {giveaway.tweet_id}: {e}")
+        
+        logger.info(f"Processed {processed} pending giveaways")
     
-    def _participate_in_giveaway(self, giveaway: Giveaway):
+    def _participate_in_giveaway(self, giveaway: PendingGiveaway):
         """Participate in a single giveaway with multiple accounts"""
         logger.info(f"Participating in giveaway: {giveaway.tweet_id}")
         
@@ -260,12 +476,16 @@ class TwitterGiveawayBot:
         try:
             db_giveaway = db.query(Giveaway).filter_by(id=giveaway.id).first()
             if db_giveaway:
+                if not db_giveaway.participated:
+                    record_participation(db, db_giveaway)
                 db_giveaway.participated = True
                 db_giveaway.followed = giveaway.followed
                 db_giveaway.retweeted = giveaway.retweeted
                 db_giveaway.liked = giveaway.liked
                 db_giveaway.commented = giveaway.commented
-                db.commit()
+                with metrics.span('db_commit', op='participation'):
+                    db.commit()
+                metrics.increment('participations')
         finally:
             db.close()
         
@@ -282,38 +502,39 @@ class TwitterGiveawayBot:
         logger.info("Starting bot cycle...")
         logger.info("=" * 50)
         
+        status = 'ok'
         try:
-            # Step 1: Search for new giveaways
-            self.search_giveaways()
-            
-            # Step 2: Participate in pending giveaways
-            self.participate_in_giveaways()
-            
-            # Step 3: Check for winner notifications
-            self.check_winners()
+            with metrics.span('cycle'):
+                # Step 1: Search for new giveaways
+                with metrics.span('phase', phase='search'):
+                    self.search_giveaways()
+                
+                # Step 2: Participate in pending giveaways
+                with metrics.span('phase', phase='participate'):
+                    self.participate_in_giveaways()
+                
+                # Step 3: Check for winner notifications
+                with metrics.span('phase', phase='winners'):
+                    self.check_winners()
             
             logger.info("Bot cycle completed successfully!")
             
         except Exception as e:
+            status = 'error'
             logger.error(f"Error in bot cycle: {e}")
+        
+        metrics.increment('cycles', status=status)
+        self._export_metrics()
+    
+    def _export_metrics(self):
+        """Write the metrics snapshot to METRICS_JSON_PATH, if configured"""
+        if not Config.METRICS_JSON_PATH:
+            return
+        try:
+            metrics.write_json(Config.METRICS_JSON_PATH)
+        except OSError as e:
+            logger.error(f"Error writing metrics to {Config.METRICS_JSON_PATH}: {e}")
     
     def get_statistics(self) -> Dict:
         """Get bot statistics"""
-        db = SessionLocal()
-        try:
-            total_giveaways = db.query(Giveaway).count()
-            participated = db.query(Giveaway).filter_by(participated=True).count()
-            wins = db.query(Giveaway).filter_by(won=True).count()
-            
-            from models import Account
-            active_accounts = db.query(Account).filter_by(is_active=True).count()
-            
-            return {
-                'total_giveaways_found': total_giveaways,
-                'total_participations': participated,
-                'total_wins': wins,
-                'active_accounts': active_accounts,
-                'win_rate': f"{(wins/participated*100):.2f}%" if participated > 0 else "0%"
-            }
-        finally:
-            db.close()
+        return collect_statistics(detail=False).as_dict()
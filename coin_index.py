@@ -0,0 +1,184 @@
+"""
+Persistent symbol -> CoinGecko coin id index
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import func
+
+from config import Config
+from metrics import metrics
+from models import CoinSymbol, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def rank_coins(coins: List[Dict], pinned: Optional[Dict[str, str]] = None) -> List[Dict]:
+    """
+    Build ranked index rows from CoinGecko's coin list
+
+    Coins are ranked per symbol: pinned ids first, then coins whose id matches
+    their name (usually the canonical asset), then shorter ids.
+
+    Args:
+        coins: Entries from get_coins_list() with id, symbol and name
+        pinned: Optional symbol -> coin id overrides that always rank first
+
+    Returns:
+        List of dicts with symbol, coin_id and rank
+    """
+    pinned = pinned or {}
+    by_symbol = {}
+
+    for coin in coins:
+        symbol = (coin.get('symbol') or '').upper().strip()
+        coin_id = coin.get('id')
+        if not symbol or not coin_id:
+            continue
+        by_symbol.setdefault(symbol, set()).add(coin_id)
+
+    for symbol, coin_id in pinned.items():
+        by_symbol.setdefault(symbol, set()).add(coin_id)
+
+    names = {coin.get('id'): (coin.get('name') or '').lower().replace(' ', '-') for coin in coins}
+
+    rows = []
+    for symbol, coin_ids in by_symbol.items():
+        def sort_key(coin_id):
+            return (
+                coin_id != pinned.get(symbol),
+                coin_id != names.get(coin_id),
+                len(coin_id),
+                coin_id,
+            )
+
+        for rank, coin_id in enumerate(sorted(coin_ids, key=sort_key)):
+            rows.append({'symbol': symbol, 'coin_id': coin_id, 'rank': rank})
+
+    return rows
+
+
+class CoinIndex:
+    """Local, periodically refreshed index of CoinGecko coin ids by symbol"""
+
+    def __init__(self, fetch_coins: Callable[[], List[Dict]],
+                 pinned: Optional[Dict[str, str]] = None,
+                 refresh_hours: int = None):
+        """
+        Args:
+            fetch_coins: Callable returning CoinGecko's coin list
+            pinned: Symbol -> coin id overrides that always rank first
+            refresh_hours: Age after which the index is rebuilt
+        """
+        self.fetch_coins = fetch_coins
+        self.pinned = pinned or {}
+        self.refresh_interval = timedelta(
+            hours=refresh_hours if refresh_hours is not None else Config.COIN_INDEX_REFRESH_HOURS
+        )
+        self._refreshed_at = None
+        self._next_attempt = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def lookup(self, token_symbol: str) -> List[str]:
+        """
+        Get CoinGecko ids for a symbol, best match first
+
+        Args:
+            token_symbol: Token symbol (e.g., 'PEPE')
+
+        Returns:
+            Ranked list of coin ids (empty if unknown)
+        """
+        if self.refreshed_at() is None and time.monotonic() >= self._next_attempt:
+            # Index has never been built; build it once in the foreground
+            self.refresh()
+
+        db = SessionLocal()
+        try:
+            rows = db.query(CoinSymbol.coin_id).filter_by(
+                symbol=token_symbol.upper().strip()
+            ).order_by(CoinSymbol.rank).all()
+            return [row.coin_id for row in rows]
+        finally:
+            db.close()
+
+    def refreshed_at(self) -> Optional[datetime]:
+        """Get the time the index was last rebuilt"""
+        if self._refreshed_at is None:
+            db = SessionLocal()
+            try:
+                self._refreshed_at = db.query(func.max(CoinSymbol.updated_at)).scalar()
+            finally:
+                db.close()
+        return self._refreshed_at
+
+    def is_stale(self) -> bool:
+        """Check if the index is missing or older than the refresh interval"""
+        refreshed_at = self.refreshed_at()
+        return refreshed_at is None or datetime.utcnow() - refreshed_at >= self.refresh_interval
+
+    def refresh(self) -> int:
+        """
+        Rebuild the index from CoinGecko's coin list in a single transaction
+
+        Returns:
+            Number of index rows written (0 if another thread rebuilt the
+            index while this one waited for it)
+        """
+        seen = self._refreshed_at
+        with self._lock:
+            if self._refreshed_at is not None and self._refreshed_at != seen:
+                # e.g. a first lookup waiting on the background thread's initial build
+                return 0
+
+            try:
+                metrics.increment('api_calls', api='coingecko_coins_list')
+                rows = rank_coins(self.fetch_coins(), self.pinned)
+            except Exception as e:
+                logger.error(f"Error downloading coin list: {e}")
+                self._next_attempt = time.monotonic() + Config.COIN_INDEX_RETRY_SECONDS
+                return 0
+
+            now = datetime.utcnow()
+            for row in rows:
+                row['updated_at'] = now
+
+            db = SessionLocal()
+            try:
+                db.query(CoinSymbol).delete()
+                if rows:
+                    db.execute(CoinSymbol.__table__.insert(), rows)
+                db.commit()
+            finally:
+                db.close()
+
+            self._refreshed_at = now
+            logger.info(f"Coin index rebuilt with {len(rows)} entries")
+            return len(rows)
+
+    def start_background_refresh(self, check_interval_seconds: int = 3600):
+        """Keep the index fresh from a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    if self.is_stale():
+                        self.refresh()
+                except Exception as e:
+                    logger.error(f"Error refreshing coin index: {e}")
+                self._stop.wait(check_interval_seconds)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name='coin-index-refresh', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background refresh thread"""
+        self._stop.set()
@@ -0,0 +1,197 @@
+"""
+CoinGecko price client: asyncio core with a synchronous facade
+
+Requests go through one keep-alive requests.Session whose connection pool is
+sized to the concurrency limit. Price lookups run on a private event loop
+thread, so lookups from any thread share one set of in-flight requests: a coin
+id that is already being fetched is awaited rather than requested again.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from config import Config
+from metrics import metrics
+
+PUBLIC_API_URL = 'https://api.coingecko.com/api/v3'
+PRO_API_URL = 'https://pro-api.coingecko.com/api/v3'
+
+
+class CoinGeckoClient:
+    """
+    CoinGecko API client with pooled connections, bounded concurrency and
+    coalescing of concurrent lookups
+
+    get_price() and get_coins_list() match pycoingecko's CoinGeckoAPI, so
+    existing callers and test doubles keep working; async code can await
+    get_prices() directly on the client's loop.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, max_concurrency: int = None,
+                 batch_size: int = None, timeout: float = None, session=None):
+        """
+        Args:
+            api_key: CoinGecko API key (default: COINGECKO_API_KEY); sent as a
+                demo key, or as a pro key to the pro endpoint if COINGECKO_PRO_API is set
+            max_concurrency: Simultaneous HTTP requests (default: COINGECKO_MAX_CONCURRENCY)
+            batch_size: Coin ids per price request (default: PRICE_BATCH_SIZE)
+            timeout: Seconds per HTTP request (default: COINGECKO_TIMEOUT_SECONDS)
+            session: requests.Session to use (default: a pooled keep-alive session)
+        """
+        api_key = api_key if api_key is not None else Config.COINGECKO_API_KEY
+        # Ignore the placeholder from .env.example
+        self.api_key = api_key if api_key and not api_key.startswith('your_') else None
+        self.base_url = PRO_API_URL if self.api_key and Config.COINGECKO_PRO_API else PUBLIC_API_URL
+        self.max_concurrency = max_concurrency or Config.COINGECKO_MAX_CONCURRENCY
+        self.batch_size = batch_size or Config.PRICE_BATCH_SIZE
+        self.timeout = timeout or Config.COINGECKO_TIMEOUT_SECONDS
+        self._session = session
+
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._in_flight: Dict[str, asyncio.Future] = {}  # coin id -> request covering it
+
+    # HTTP
+
+    @property
+    def session(self):
+        """Keep-alive session with a connection pool sized to the concurrency limit"""
+        if self._session is None:
+            # Imported here so importing the price checker stays cheap
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            session = requests.Session()
+            retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+            session.mount('https://', HTTPAdapter(
+                pool_connections=1, pool_maxsize=self.max_concurrency, max_retries=retries
+            ))
+            if self.api_key:
+                header = 'x-cg-pro-api-key' if self.base_url == PRO_API_URL else 'x-cg-demo-api-key'
+                session.headers[header] = self.api_key
+            self._session = session
+        return self._session
+
+    def _request(self, path: str, params: Dict = None):
+        response = self.session.get(f'{self.base_url}{path}', params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    # Event loop
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the client's event loop thread on first use"""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix='coingecko'
+                )
+                threading.Thread(target=loop.run_forever, name='coingecko-loop', daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def close(self):
+        """Stop the event loop thread and close pooled connections"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            self._executor.shutdown(wait=False)
+        if self._session is not None:
+            self._session.close()
+
+    # Prices
+
+    async def _fetch_batch(self, coin_ids: List[str]) -> Dict[str, Dict]:
+        if self._semaphore is None:
+            # Created on the loop it is used from (required before Python 3.10)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            with metrics.span('price_lookup'):
+                data = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, self._request, '/simple/price',
+                    {'ids': ','.join(coin_ids), 'vs_currencies': 'usd'}
+                )
+            metrics.increment('api_calls', api='coingecko_price')
+            return data
+
+    def _release(self, coin_ids: List[str], task: asyncio.Future):
+        for coin_id in coin_ids:
+            if self._in_flight.get(coin_id) is task:
+                del self._in_flight[coin_id]
+
+    async def get_prices(self, coin_ids: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Get USD prices, joining requests already in flight for the same coins
+
+        Must run on the client's loop (see get_price for the synchronous facade).
+
+        Args:
+            coin_ids: CoinGecko coin ids
+
+        Returns:
+            Dictionary of coin id -> {'usd': price}; unknown coins are absent
+
+        Raises:
+            Exception: The error of any request a coin depended on
+        """
+        waiting = {}  # coin id -> request covering it
+        new = []
+        for coin_id in dict.fromkeys(coin_ids):
+            task = self._in_flight.get(coin_id)
+            if task is not None:
+                waiting[coin_id] = task
+                metrics.increment('coalesced_price_lookups')
+            else:
+                new.append(coin_id)
+
+        for start in range(0, len(new), self.batch_size):
+            batch = new[start:start + self.batch_size]
+            task = asyncio.ensure_future(self._fetch_batch(batch))
+            task.add_done_callback(lambda done, batch=batch: self._release(batch, done))
+            for coin_id in batch:
+                self._in_flight[coin_id] = task
+                waiting[coin_id] = task
+
+        tasks = list(dict.fromkeys(waiting.values()))
+        results = dict(zip(tasks, await asyncio.gather(*tasks, return_exceptions=True)))
+
+        prices = {}
+        for coin_id, task in waiting.items():
+            data = results[task]
+            if isinstance(data, BaseException):
+                raise data
+            if coin_id in data:
+                prices[coin_id] = data[coin_id]
+        return prices
+
+    def get_price(self, ids: str, vs_currencies: str = 'usd') -> Dict[str, Dict]:
+        """
+        Get USD prices for comma-separated coin ids (blocking)
+
+        Batches of more than batch_size ids are requested concurrently. Safe to
+        call from any thread except the client's own loop.
+
+        Args:
+            ids: Comma-separated CoinGecko coin ids
+            vs_currencies: Must be 'usd'
+
+        Returns:
+            Dictionary of coin id -> {'usd': price}, as pycoingecko returns it
+        """
+        if vs_currencies != 'usd':
+            raise ValueError(f"Only USD prices are supported, not {vs_currencies}")
+        coin_ids = [coin_id for coin_id in ids.split(',') if coin_id]
+        if not coin_ids:
+            return {}
+        future = asyncio.run_coroutine_threadsafe(self.get_prices(coin_ids), self._ensure_loop())
+        return future.result()
+
+    def get_coins_list(self) -> List[Dict]:
+        """Get every coin's id, symbol and name (blocking)"""
+        return self._request('/coins/list')
@@ -18,14 +18,84 @@ class Config:
     MIN_FOLLOWERS_REQUIRED = int(os.getenv('MIN_FOLLOWERS_REQUIRED', '1000'))
     MIN_GIVEAWAY_VALUE_USD = float(os.getenv('MIN_GIVEAWAY_VALUE_USD', '50'))
     
+    # Batch classification
+    CLASSIFY_POOL_THRESHOLD = int(os.getenv('CLASSIFY_POOL_THRESHOLD', '5000'))
+    CLASSIFY_WORKERS = int(os.getenv('CLASSIFY_WORKERS', '0'))  # 0 = CPU count
+    
     # Twitter API
     TWITTER_BEARER_TOKEN = os.getenv('TWITTER_BEARER_TOKEN')
     
     # CoinGecko API
     COINGECKO_API_KEY = os.getenv('COINGECKO_API_KEY')
+    COINGECKO_PRO_API = os.getenv('COINGECKO_PRO_API', 'false').lower() == 'true'  # key is a pro key
+    COINGECKO_MAX_CONCURRENCY = int(os.getenv('COINGECKO_MAX_CONCURRENCY', '4'))
+    COINGECKO_TIMEOUT_SECONDS = float(os.getenv('COINGECKO_TIMEOUT_SECONDS', '10'))
+    
+    # Price cache
+    PRICE_CACHE_TTL_SECONDS = int(os.getenv('PRICE_CACHE_TTL_SECONDS', '300'))
+    PRICE_CACHE_MAX_SIZE = int(os.getenv('PRICE_CACHE_MAX_SIZE', '1024'))
+    PRICE_BATCH_SIZE = int(os.getenv('PRICE_BATCH_SIZE', '250'))  # coin ids per get_price request
+    NEGATIVE_CACHE_TTL_SECONDS = int(os.getenv('NEGATIVE_CACHE_TTL_SECONDS', '21600'))
+    NEGATIVE_CACHE_MAX_SIZE = int(os.getenv('NEGATIVE_CACHE_MAX_SIZE', '4096'))
+    # Serve prices stored in the price history up to this age instead of calling the API (0 disables)
+    PRICE_HISTORY_MAX_AGE_SECONDS = int(os.getenv('PRICE_HISTORY_MAX_AGE_SECONDS', '300'))
+    
+    # Price sources, asked in order (cache, history, coingecko, fixture)
+    PRICE_SOURCES = [
+        name.strip() for name in os.getenv('PRICE_SOURCES', 'cache,history,coingecko,fixture').split(',')
+        if name.strip()
+    ]
+    PRICE_FIXTURE_PATH = os.getenv('PRICE_FIXTURE_PATH', '')  # JSON of {"SYMBOL": price_usd}
+    PRICE_HISTORY_TIMEOUT_SECONDS = float(os.getenv('PRICE_HISTORY_TIMEOUT_SECONDS', '2'))
+    COINGECKO_SOURCE_TIMEOUT_SECONDS = float(os.getenv('COINGECKO_SOURCE_TIMEOUT_SECONDS', '5'))
+    # Consecutive failures (errors or timeouts) before a source is skipped for the cooldown
+    PRICE_SOURCE_FAILURE_THRESHOLD = int(os.getenv('PRICE_SOURCE_FAILURE_THRESHOLD', '3'))
+    PRICE_SOURCE_COOLDOWN_SECONDS = float(os.getenv('PRICE_SOURCE_COOLDOWN_SECONDS', '60'))
+    
+    # Recently stored tweet ids kept in memory for duplicate checks
+    SEEN_TWEETS_CACHE_SIZE = int(os.getenv('SEEN_TWEETS_CACHE_SIZE', '100000'))
+    
+    # Reposts with the same handles, cashtags and numbers as a stored giveaway, whose wording
+    # SimHash differs in at most this many of 40 bits, are linked to it (0: identical wording)
+    NEAR_DUPLICATE_MAX_DISTANCE = int(os.getenv('NEAR_DUPLICATE_MAX_DISTANCE', '5'))
+    
+    # Giveaways buffered before a bulk insert
+    GIVEAWAY_WRITE_BATCH_SIZE = int(os.getenv('GIVEAWAY_WRITE_BATCH_SIZE', '500'))
+    
+    # Pending giveaways loaded per query when participating
+    PENDING_PAGE_SIZE = int(os.getenv('PENDING_PAGE_SIZE', '100'))
+    # Giveaways without a deadline stop being pending this long after they were found (0: never)
+    PENDING_MAX_AGE_DAYS = float(os.getenv('PENDING_MAX_AGE_DAYS', '14'))
+    
+    # Search window without a recent checkpoint, and result pages per query
+    SEARCH_LOOKBACK_HOURS = int(os.getenv('SEARCH_LOOKBACK_HOURS', '24'))
+    SEARCH_MAX_PAGES = int(os.getenv('SEARCH_MAX_PAGES', '10'))
+    SEARCH_QUERY_MAX_LENGTH = int(os.getenv('SEARCH_QUERY_MAX_LENGTH', '512'))
+    
+    # Local symbol -> coin id index
+    COIN_INDEX_REFRESH_HOURS = int(os.getenv('COIN_INDEX_REFRESH_HOURS', '24'))
+    COIN_INDEX_RETRY_SECONDS = int(os.getenv('COIN_INDEX_RETRY_SECONDS', '300'))
+    
+    # Metrics export: JSON snapshot written after each cycle, Prometheus endpoint (0 disables)
+    METRICS_JSON_PATH = os.getenv('METRICS_JSON_PATH', '')
+    METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))
+    # Interface the Prometheus endpoint binds (0.0.0.0 exposes it on every interface)
+    METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+    
+    # Append every search pass' results to this corpus file for offline replay (empty disables)
+    CORPUS_RECORD_PATH = os.getenv('CORPUS_RECORD_PATH', '')
     
     # Database
     DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///giveaways.db')
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+    
+    # SQLite tuning (ignored for other databases)
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', '65536'))
+    SQLITE_MMAP_SIZE_MB = int(os.getenv('SQLITE_MMAP_SIZE_MB', '256'))
+    SQLITE_BUSY_TIMEOUT_SECONDS = float(os.getenv('SQLITE_BUSY_TIMEOUT_SECONDS', '30'))
     
     # Search keywords for crypto giveaways
     CRYPTO_KEYWORDS = [
@@ -39,6 +109,17 @@ class Config:
         'bitcoin', 'ethereum', 'crypto', 'token', 'coin', 'cryptocurrency'
     ]
     
+    # Words that follow a number in giveaway text but are never tickers
+    TICKER_STOP_WORDS = [
+        'WINNER', 'WINNERS', 'WINS', 'PEOPLE', 'PERSON', 'USERS', 'FRIENDS',
+        'FOLLOWERS', 'LIKES', 'RETWEETS', 'RTS', 'TAGS', 'ENTRIES', 'SPOTS',
+        'WALLETS', 'TICKETS', 'LUCKY', 'EACH', 'MORE', 'TOTAL', 'PRIZES',
+        'HOURS', 'HOUR', 'HRS', 'DAYS', 'DAY', 'WEEKS', 'WEEK', 'MINUTES', 'MINS',
+        'MONTHS', 'AM', 'PM', 'ST', 'ND', 'RD', 'TH', 'TIMES', 'PERCENT',
+        'THOUSAND', 'MILLION', 'BILLION', 'USD', 'DOLLARS', 'BUCKS',
+        'OF', 'TO', 'IN', 'FOR', 'AND', 'OR', 'THE', 'AT', 'ON', 'BY',
+    ]
+    
     # Giveaway action keywords
     ACTION_KEYWORDS = {
         'follow': ['follow', 'following', 'follow us', 'follow @'],
@@ -0,0 +1,103 @@
+"""
+Duplicate detection for search results
+"""
+import logging
+from typing import Iterable, List, Set
+
+from sqlalchemy import bindparam, select, union_all
+
+from cache import LRUCache
+from config import Config
+from metrics import metrics
+from models import Giveaway, GiveawayDuplicate, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Keep IN (...) lists (two per query) under SQLite's bound-parameter limit
+IN_QUERY_CHUNK_SIZE = 400
+
+# Stored giveaways and reposts linked to them, in one round trip (built once, so
+# SQLAlchemy's compiled-statement cache is hit on every call)
+_ids = bindparam('ids', expanding=True)
+EXISTING_TWEET_IDS = union_all(
+    select(Giveaway.tweet_id).where(Giveaway.tweet_id.in_(_ids)),
+    select(GiveawayDuplicate.tweet_id).where(GiveawayDuplicate.tweet_id.in_(_ids)),
+)
+
+
+class SeenTweetFilter:
+    """
+    Bounded in-memory set of stored tweet ids, backed by the giveaways and
+    giveaway_duplicates tables
+    """
+
+    def __init__(self, maxsize: int = None):
+        """
+        Args:
+            maxsize: Number of recent tweet ids kept in memory
+        """
+        self.seen = LRUCache(maxsize=maxsize or Config.SEEN_TWEETS_CACHE_SIZE)
+        metrics.register_collector('seen_tweets_cache', self.seen.stats)
+
+    def warm(self) -> int:
+        """
+        Load the most recently stored tweet ids from the database
+
+        Returns:
+            Number of ids loaded
+        """
+        db = SessionLocal()
+        try:
+            rows = db.query(Giveaway.tweet_id).order_by(
+                Giveaway.id.desc()
+            ).limit(self.seen.maxsize).all()
+        finally:
+            db.close()
+
+        # Insert oldest first so the newest ids are the last to be evicted
+        self.add(row.tweet_id for row in reversed(rows))
+        logger.info(f"Loaded {len(rows)} known tweet ids")
+        return len(rows)
+
+    def add(self, tweet_ids: Iterable):
+        """Remember tweet ids that are stored in the database"""
+        for tweet_id in tweet_ids:
+            self.seen.set(str(tweet_id), True)
+
+    def filter_new(self, tweet_ids: Iterable) -> Set[str]:
+        """
+        Get the tweet ids that are not stored yet
+
+        Ids found in memory are dropped without touching the database; the rest
+        are checked with one IN query per chunk.
+
+        Args:
+            tweet_ids: Candidate tweet ids
+
+        Returns:
+            Set of ids (as strings) that are not stored as a giveaway or a duplicate
+        """
+        unknown = []
+        for tweet_id in dict.fromkeys(map(str, tweet_ids)):
+            if tweet_id not in self.seen:
+                unknown.append(tweet_id)
+
+        if not unknown:
+            return set()
+
+        existing = self._query_existing(unknown)
+        self.add(existing)
+        return set(unknown) - existing
+
+    def _query_existing(self, tweet_ids: List[str]) -> Set[str]:
+        """Find which of the given tweet ids are already stored"""
+        existing = set()
+        db = SessionLocal()
+        try:
+            for start in range(0, len(tweet_ids), IN_QUERY_CHUNK_SIZE):
+                chunk = tweet_ids[start:start + IN_QUERY_CHUNK_SIZE]
+                rows = db.execute(EXISTING_TWEET_IDS, {'ids': chunk})
+                existing.update(row.tweet_id for row in rows)
+        finally:
+            db.close()
+        return existing
@@ -17,6 +17,9 @@ def main():
         'run': 'python main.py',
         'verify': 'python setup_verify.py',
         'stats': 'python stats.py',
+        'plan': 'python query_plan.py',
+        'bench': 'python -m benchmarks.run --compare benchmarks/baseline.json',
+        'rollups': 'python rollups.py',
         'format': 'black --line-length 100 *.py && isort *.py',
         'lint': 'pylint *.py && flake8 *.py --max-line-length=100',
         'clean': 'find . -type d -name __pycache__ -exec rm -rf {} + 2>/dev/null; find . -type f -name "*.pyc" -delete',
@@ -2,126 +2,354 @@
 Giveaway detector and parser
 """
 import re
+import os
 import random
-from typing import Optional, Dict, List
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, List, Sequence, Union
 from config import Config
+from price_checker import select_token
+from records import TokenInfo, TweetCandidate
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Keyword tables (matched as substrings of the lowercased text)
+GIVEAWAY_INDICATORS = ['giveaway', 'airdrop', 'win', 'contest', 'free']
+
+CRYPTO_INDICATORS = [
+    'btc', 'eth', 'crypto', 'token', 'coin', 'usdt', 'bnb', 
+    'sol', 'ada', 'xrp', 'doge', 'bitcoin', 'ethereum', 'cryptocurrency'
+]
+
+# Rule pattern tables
+RULE_PATTERNS = {
+    'follow': [
+        r'follow\s+@?\w+',
+        r'follow\s+us',
+        r'following\s+@?\w+',
+        r'must\s+follow',
+        r'✅\s*follow',
+        r'1\.\s*follow',
+    ],
+    'retweet': [
+        r'\bretweet\b',
+        r'\brt\b',
+        r'share\s+this',
+        r'repost',
+        r'✅\s*retweet',
+        r'2\.\s*retweet',
+        r'🔁'
+    ],
+    'like': [
+        r'\blike\b',
+        r'heart',
+        r'❤️',
+        r'♥',
+        r'✅\s*like',
+        r'3\.\s*like',
+    ],
+    'comment': [
+        r'\bcomment\b',
+        r'\breply\b',
+        r'tag\s+\d+\s+friends',
+        r'mention\s+\d+',
+        r'✅\s*comment',
+        r'4\.\s*comment',
+        r'💬'
+    ],
+}
+
+MONTHS = {
+    'january': 1, 'february': 2, 'march': 3, 'april': 4, 'may': 5, 'june': 6,
+    'july': 7, 'august': 8, 'september': 9, 'october': 10, 'november': 11, 'december': 12,
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'jun': 6, 'jul': 7, 'aug': 8,
+    'sep': 9, 'sept': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+_MONTH = '(?:' + '|'.join(sorted(MONTHS, key=len, reverse=True)) + r')\b'
+_DEADLINE_LEAD = r'(?:ends?|ending|until|till|deadline|closes?)[:\s]+(?:on\s+)?'
+
+# Deadline patterns in priority order; each captures the deadline value
+DEADLINE_PATTERNS = [
+    _DEADLINE_LEAD + r'(' + _MONTH + r'\.?\s+\d{1,2})(?:st|nd|rd|th)?\b',
+    _DEADLINE_LEAD + r'(\d{1,2}(?:st|nd|rd|th)?\s+' + _MONTH + r')',
+    _DEADLINE_LEAD + r'(today|tonight|tomorrow)\b',
+    r'(\d+\s+weeks?)\b',
+    r'(\d+\s+days?)\b',
+    r'(\d+\s*(?:hours?|hrs?|h))\b',
+    r'(\d+\s*(?:minutes?|mins?))\b',
+]
+
+# Deadline values resolve_deadline understands
+RELATIVE_DEADLINE = re.compile(r'(\d+)\s*(weeks?|days?|hours?|hrs?|h|minutes?|mins?)')
+DAY_MONTH = re.compile(r'(\d{1,2})(?:st|nd|rd|th)?\s+([a-z]+)')
+MONTH_DAY = re.compile(r'([a-z]+)\.?\s+(\d{1,2})')
+RELATIVE_UNITS = {'w': 'weeks', 'd': 'days', 'h': 'hours', 'm': 'minutes'}
+# How long before the posting time a date may end and still be this year's
+# (the tweet's "today" can already be yesterday in UTC)
+DEADLINE_SLACK = timedelta(days=1)
+
+MENTION_PATTERN = r'@(\w+)'
+
+
+def resolve_deadline(deadline: str, posted_at: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Turn an extracted deadline into a point in time
+    
+    Relative deadlines ("3 days", "24h") count from the posting time. Dates
+    ("march 5", "5th mar") and "today"/"tomorrow" mean the end of that day,
+    in UTC; a date without a year is its first occurrence after the posting
+    time (less DEADLINE_SLACK), so "jan 5" posted in December is next January.
+    
+    Args:
+        deadline: Deadline value from extract_deadline
+        posted_at: When the tweet was posted (default: now); aware datetimes
+            are converted to UTC
+        
+    Returns:
+        Naive UTC datetime, or None if the value is not a valid deadline
+    """
+    if posted_at is None:
+        posted_at = datetime.utcnow()
+    elif posted_at.tzinfo is not None:
+        posted_at = posted_at.astimezone(timezone.utc).replace(tzinfo=None)
+    
+    match = RELATIVE_DEADLINE.fullmatch(deadline)
+    if match:
+        amount, unit = match.groups()
+        return posted_at + timedelta(**{RELATIVE_UNITS[unit[0]]: int(amount)})
+    
+    end_of_posting_day = posted_at.replace(hour=23, minute=59, second=59, microsecond=0)
+    if deadline in ('today', 'tonight'):
+        return end_of_posting_day
+    if deadline == 'tomorrow':
+        return end_of_posting_day + timedelta(days=1)
+    
+    match = DAY_MONTH.fullmatch(deadline)
+    if match:
+        day, month_name = match.groups()
+    else:
+        match = MONTH_DAY.fullmatch(deadline)
+        if not match:
+            return None
+        month_name, day = match.groups()
+    month = MONTHS.get(month_name)
+    if month is None:
+        return None
+    
+    earliest = posted_at - DEADLINE_SLACK
+    for year in (posted_at.year - 1, posted_at.year, posted_at.year + 1):
+        try:
+            candidate = datetime(year, month, int(day), 23, 59, 59)
+        except ValueError:
+            continue  # e.g. february 30, or february 29 outside a leap year
+        if candidate >= earliest:
+            return candidate
+    # Not within a year of the posting time (february 29 with no leap year ahead)
+    return None
+
+
+class ClassificationBatch:
+    """Columnar classification results for a batch of tweets"""
+    
+    FLAGS = ('is_giveaway', 'has_crypto', 'follow', 'retweet', 'like', 'comment')
+    
+    def __init__(self, ids: Sequence, rows: Sequence[tuple]):
+        """
+        Args:
+            ids: Tweet ids (None for plain texts), one per row
+            rows: Tuples from classify_text, one per tweet
+        """
+        self.ids = list(ids)
+        
+        # One byte per tweet for each flag column
+        for i, flag in enumerate(self.FLAGS):
+            setattr(self, flag, bytearray(row[i] for row in rows))
+        
+        self.token_symbol = [row[6] for row in rows]
+        self.token_amount = [row[7] for row in rows]
+        self.deadline = [row[8] for row in rows]
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def where(self, *flags: str) -> List[int]:
+        """
+        Get row indices where every given flag column is set
+        
+        Args:
+            flags: Flag column names, e.g. 'is_giveaway', 'follow'
+            
+        Returns:
+            List of row indices
+        """
+        columns = [getattr(self, flag) for flag in flags]
+        return [i for i in range(len(self.ids)) if all(column[i] for column in columns)]
+    
+    def row(self, index: int) -> Dict:
+        """Get a single row as a dictionary"""
+        result = {'id': self.ids[index]}
+        for flag in self.FLAGS:
+            result[flag] = bool(getattr(self, flag)[index])
+        result['token_symbol'] = self.token_symbol[index]
+        result['token_amount'] = self.token_amount[index]
+        result['deadline'] = self.deadline[index]
+        return result
+
+
+_worker_parser = None
+
+
+def _classify_in_worker(text: str) -> tuple:
+    """Process pool entry point; each worker builds its own parser once"""
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = GiveawayParser()
+    return _worker_parser.classify_text(text)
+
+
 class GiveawayParser:
     """Parse giveaway tweets and extract rules"""
     
     def __init__(self):
         self.action_keywords = Config.ACTION_KEYWORDS
+        
+        # Compile every pattern table once
+        self.rule_patterns = {
+            rule: [re.compile(pattern) for pattern in patterns]
+            for rule, patterns in RULE_PATTERNS.items()
+        }
+        self.deadline_patterns = [re.compile(pattern) for pattern in DEADLINE_PATTERNS]
+        self.mention_pattern = re.compile(MENTION_PATTERN)
+        self.stop_words = frozenset(Config.TICKER_STOP_WORDS)
+        self._last_analysis = (None, None)
     
-    def is_giveaway_tweet(self, text: str) -> bool:
+    def analyze(self, text: str) -> Dict:
         """
-        Check if tweet is a giveaway
+        Run giveaway detection, rule parsing, mention and deadline extraction in one pass
+        
+        The text is lowercased once and each table stops at its first hit. The
+        result for the most recent text is memoized, since callers usually ask
+        several questions about the same tweet in a row.
         
         Args:
             text: Tweet text
             
         Returns:
-            True if tweet appears to be a giveaway
+            Dictionary with is_giveaway, has_crypto, rules, mentions and deadline
         """
+        last_text, last_result = self._last_analysis
+        if text == last_text:
+            return last_result
+        
         text_lower = text.lower()
         
-        # Check for giveaway keywords
-        giveaway_indicators = ['giveaway', 'airdrop', 'win', 'contest', 'free']
-        has_giveaway = any(keyword in text_lower for keyword in giveaway_indicators)
+        has_giveaway = any(keyword in text_lower for keyword in GIVEAWAY_INDICATORS)
+        has_crypto = any(keyword in text_lower for keyword in CRYPTO_INDICATORS)
         
-        if not has_giveaway:
-            return False
+        rules = {
+            rule: any(pattern.search(text_lower) for pattern in patterns)
+            for rule, patterns in self.rule_patterns.items()
+        }
         
-        # Check for crypto-related keywords
-        crypto_indicators = [
-            'btc', 'eth', 'crypto', 'token', 'coin', 'usdt', 'bnb', 
-            'sol', 'ada', 'xrp', 'doge', 'bitcoin', 'ethereum', 'cryptocurrency'
-        ]
-        has_crypto = any(keyword in text_lower for keyword in crypto_indicators)
+        deadline = None
+        for pattern in self.deadline_patterns:
+            match = pattern.search(text_lower)
+            if match:
+                deadline = match.group(1)
+                break
         
-        return has_crypto
+        result = {
+            'is_giveaway': has_giveaway and has_crypto,
+            'has_crypto': has_crypto,
+            'rules': rules,
+            'mentions': self.mention_pattern.findall(text),
+            'deadline': deadline,
+        }
+        self._last_analysis = (text, result)
+        return result
     
-    def parse_rules(self, text: str) -> Dict[str, bool]:
+    def classify_text(self, text: str) -> tuple:
         """
-        Parse giveaway rules from tweet text
+        Classify one tweet without any network or database access
         
         Args:
             text: Tweet text
             
         Returns:
-            Dictionary with required actions: follow, retweet, like, comment
+            Tuple of (is_giveaway, has_crypto, follow, retweet, like, comment,
+            token_symbol, token_amount, deadline)
         """
-        text_lower = text.lower()
+        analysis = self.analyze(text)
+        rules = analysis['rules']
+        token_symbol, token_amount = select_token(text, self.stop_words)
+        return (
+            analysis['is_giveaway'],
+            analysis['has_crypto'],
+            rules['follow'],
+            rules['retweet'],
+            rules['like'],
+            rules['comment'],
+            token_symbol,
+            token_amount,
+            analysis['deadline'],
+        )
+    
+    def classify_batch(self, tweets: Sequence[Union[TweetCandidate, Dict, str]],
+                       workers: Optional[int] = None) -> ClassificationBatch:
+        """
+        Run giveaway detection, rule parsing and token extraction over many tweets
         
-        rules = {
-            'follow': False,
-            'retweet': False,
-            'like': False,
-            'comment': False
-        }
+        Batches of at least Config.CLASSIFY_POOL_THRESHOLD tweets are spread over
+        a process pool; smaller ones are classified in-process.
         
-        # Check for follow requirement
-        follow_patterns = [
-            r'follow\s+@?\w+',
-            r'follow\s+us',
-            r'following\s+@?\w+',
-            r'must\s+follow',
-            r'✅\s*follow',
-            r'1\.\s*follow',
-        ]
-        for pattern in follow_patterns:
-            if re.search(pattern, text_lower):
-                rules['follow'] = True
-                break
+        Args:
+            tweets: TweetCandidates, tweet dictionaries (with 'id' and 'text') or plain texts
+            workers: Process count for large batches (default: Config.CLASSIFY_WORKERS
+                or the CPU count)
+            
+        Returns:
+            Columnar ClassificationBatch in input order
+        """
+        texts = [tweet if isinstance(tweet, str) else tweet['text'] for tweet in tweets]
+        ids = [None if isinstance(tweet, str) else tweet.get('id') for tweet in tweets]
         
-        # Check for retweet requirement
-        retweet_patterns = [
-            r'\bretweet\b',
-            r'\brt\b',
-            r'share\s+this',
-            r'repost',
-            r'✅\s*retweet',
-            r'2\.\s*retweet',
-            r'🔁'
-        ]
-        for pattern in retweet_patterns:
-            if re.search(pattern, text_lower):
-                rules['retweet'] = True
-                break
+        workers = workers or Config.CLASSIFY_WORKERS or os.cpu_count() or 1
         
-        # Check for like requirement
-        like_patterns = [
-            r'\blike\b',
-            r'heart',
-            r'❤️',
-            r'♥',
-            r'✅\s*like',
-            r'3\.\s*like',
-        ]
-        for pattern in like_patterns:
-            if re.search(pattern, text_lower):
-                rules['like'] = True
-                break
+        if workers > 1 and len(texts) >= Config.CLASSIFY_POOL_THRESHOLD:
+            logger.info(f"Classifying {len(texts)} tweets with {workers} processes")
+            chunksize = max(1, len(texts) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                rows = list(pool.map(_classify_in_worker, texts, chunksize=chunksize))
+        else:
+            rows = [self.classify_text(text) for text in texts]
         
-        # Check for comment/reply requirement
-        comment_patterns = [
-            r'\bcomment\b',
-            r'\breply\b',
-            r'tag\s+\d+\s+friends',
-            r'mention\s+\d+',
-            r'✅\s*comment',
-            r'4\.\s*comment',
-            r'💬'
-        ]
-        for pattern in comment_patterns:
-            if re.search(pattern, text_lower):
-                rules['comment'] = True
-                break
+        return ClassificationBatch(ids, rows)
+    
+    def is_giveaway_tweet(self, text: str) -> bool:
+        """
+        Check if tweet is a giveaway
         
-        return rules
+        Args:
+            text: Tweet text
+            
+        Returns:
+            True if tweet appears to be a giveaway
+        """
+        return self.analyze(text)['is_giveaway']
+    
+    def parse_rules(self, text: str) -> Dict[str, bool]:
+        """
+        Parse giveaway rules from tweet text
+        
+        Args:
+            text: Tweet text
+            
+        Returns:
+            Dictionary with required actions: follow, retweet, like, comment
+        """
+        return dict(self.analyze(text)['rules'])
     
     def extract_mentioned_accounts(self, text: str) -> List[str]:
         """
@@ -133,9 +361,7 @@ class GiveawayParser:
         Returns:
             List of usernames (without @)
         """
-        # Find all @mentions
-        mentions = re.findall(r'@(\w+)', text)
-        return mentions
+        return list(self.analyze(text)['mentions'])
     
     def extract_deadline(self, text: str) -> Optional[str]:
         """
@@ -147,20 +373,21 @@ class GiveawayParser:
         Returns:
             Deadline string if found
         """
-        deadline_patterns = [
-            r'ends?\s+on\s+(\w+\s+\d+)',
-            r'until\s+(\w+\s+\d+)',
-            r'deadline[:\s]+(\w+\s+\d+)',
-            r'(\d+)\s+days?',
-            r'(\d+)\s+hours?',
-        ]
-        
-        for pattern in deadline_patterns:
-            match = re.search(pattern, text.lower())
-            if match:
-                return match.group(1)
+        return self.analyze(text)['deadline']
+    
+    def parse_deadline(self, text: str, posted_at: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        Extract giveaway deadline from text as a point in time
         
-        return None
+        Args:
+            text: Tweet text
+            posted_at: When the tweet was posted (default: now)
+            
+        Returns:
+            Naive UTC datetime if a deadline was found and understood
+        """
+        deadline = self.extract_deadline(text)
+        return resolve_deadline(deadline, posted_at) if deadline else None
     
     def generate_comment(self, text: str) -> str:
         """
@@ -187,13 +414,14 @@ class GiveawayParser:
         
         return random.choice(comments)
     
-    def should_participate(self, tweet_data: Dict, token_info: Dict) -> bool:
+    def should_participate(self, tweet_data: Union[TweetCandidate, Dict],
+                           token_info: Union[TokenInfo, Dict]) -> bool:
         """
         Determine if bot should participate in this giveaway
         
         Args:
-            tweet_data: Tweet information
-            token_info: Token information from price checker
+            tweet_data: TweetCandidate, or a tweet dictionary
+            token_info: TokenInfo from price checker, or a dictionary with the same keys
             
         Returns:
             True if bot should participate
@@ -0,0 +1,143 @@
+"""
+Buffered writer for new giveaways
+"""
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import select
+
+from config import Config
+from dedup import IN_QUERY_CHUNK_SIZE
+from metrics import metrics
+from models import Giveaway, GiveawayDuplicate, SessionLocal, insert_ignoring_conflicts
+from near_duplicates import to_signed
+from rollups import record_giveaways
+
+logger = logging.getLogger(__name__)
+
+
+def inserted_giveaways_query(tweet_ids: List[str]):
+    """The columns the rollups count, for the giveaways with these tweet ids"""
+    return select(
+        Giveaway.id, Giveaway.created_at, Giveaway.token_symbol, Giveaway.token_price_usd
+    ).where(Giveaway.tweet_id.in_(tweet_ids))
+
+
+class GiveawayWriter:
+    """
+    Accumulate Giveaway rows, and reposts linked to them, and write each batch
+    in a single transaction
+    """
+
+    def __init__(self, batch_size: int = None,
+                 on_flush: Optional[Callable[[List[str]], None]] = None,
+                 on_insert: Optional[Callable[[List[Dict]], None]] = None,
+                 on_failure: Optional[Callable[[List[Dict]], None]] = None):
+        """
+        Args:
+            batch_size: Number of buffered rows that triggers an automatic flush
+            on_flush: Called with the tweet ids of each successfully written batch
+                (giveaways and duplicates)
+            on_insert: Called with the giveaway rows each successful flush inserted
+                (after the commit)
+            on_failure: Called with the giveaway rows of each batch that was rolled back
+        """
+        self.batch_size = batch_size or Config.GIVEAWAY_WRITE_BATCH_SIZE
+        self.on_flush = on_flush
+        self.on_insert = on_insert
+        self.on_failure = on_failure
+        self.pending = []
+        self.duplicates = []
+        self.failed_batches = 0
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def add(self, tweet_data: Dict, token_info: Dict, deadline: Optional[datetime] = None,
+            fingerprint: Optional[int] = None):
+        """Buffer a giveaway, flushing if the batch is full"""
+        self.pending.append({
+            'tweet_id': str(tweet_data['id']),
+            'author_id': str(tweet_data['author_id']),
+            'author_username': tweet_data['author_username'],
+            'tweet_text': tweet_data['text'],
+            'fingerprint': to_signed(fingerprint) if fingerprint is not None else None,
+            'token_name': token_info.get('token_name'),
+            'token_symbol': token_info.get('token_symbol'),
+            'token_price_usd': token_info.get('token_price_usd'),
+            'estimated_value_usd': token_info.get('estimated_value_usd'),
+            'deadline': deadline,
+        })
+
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def add_duplicate(self, tweet_data: Dict, original_tweet_id: str, distance: int):
+        """Buffer a repost of a stored (or buffered) giveaway, flushing if the batch is full"""
+        self.duplicates.append({
+            'tweet_id': str(tweet_data['id']),
+            'original_tweet_id': str(original_tweet_id),
+            'author_id': str(tweet_data['author_id']),
+            'distance': distance,
+            'found_at': datetime.utcnow(),
+        })
+
+        if len(self.duplicates) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Write all buffered giveaways and duplicates in one transaction
+
+        Rows whose tweet_id is already stored are skipped.
+
+        Returns:
+            Number of giveaways inserted
+        """
+        if not self.pending and not self.duplicates:
+            return 0
+
+        rows, self.pending = self.pending, []
+        duplicates, self.duplicates = self.duplicates, []
+
+        db = SessionLocal()
+        try:
+            with metrics.span('db_commit', op='giveaways'):
+                inserted_ids = [tweet_id for tweet_id, in insert_ignoring_conflicts(
+                    db, Giveaway.__table__, rows, ['tweet_id'], return_keys=True
+                )]
+                # Only the rows this flush inserted, not ones already stored
+                for start in range(0, len(inserted_ids), IN_QUERY_CHUNK_SIZE):
+                    record_giveaways(db, db.execute(inserted_giveaways_query(
+                        inserted_ids[start:start + IN_QUERY_CHUNK_SIZE]
+                    )))
+                inserted = len(inserted_ids)
+                linked = insert_ignoring_conflicts(
+                    db, GiveawayDuplicate.__table__, duplicates, ['tweet_id']
+                )
+                db.commit()
+        except Exception as e:
+            db.rollback()
+            self.failed_batches += 1
+            logger.error(f"Error saving {len(rows)} giveaways and {len(duplicates)} duplicates: {e}")
+            if self.on_failure:
+                self.on_failure(rows)
+            return 0
+        finally:
+            db.close()
+
+        if rows:
+            metrics.increment('rows_written', inserted, table='giveaways')
+            logger.info(f"Saved {inserted} giveaways to database ({len(rows) - inserted} already stored)")
+        if duplicates:
+            metrics.increment('rows_written', linked, table='giveaway_duplicates')
+            logger.info(f"Linked {linked} reposted giveaways to their originals")
+
+        if self.on_flush:
+            self.on_flush([row['tweet_id'] for row in rows + duplicates])
+        if self.on_insert and inserted_ids:
+            inserted_ids = set(inserted_ids)
+            self.on_insert([row for row in rows if row['tweet_id'] in inserted_ids])
+
+        return inserted
@@ -2,11 +2,10 @@
 Main entry point for Twitter Giveaway Bot
 """
 import logging
-import schedule
 import time
 import sys
-from bot import TwitterGiveawayBot
 from config import Config
+from metrics import metrics
 
 # Configure logging
 logging.basicConfig(
@@ -23,6 +22,10 @@ logger = logging.getLogger(__name__)
 
 def main():
     """Main function to run the bot"""
+    # The bot pulls in the Twitter and CoinGecko clients; import it only when running
+    import schedule
+    from bot import TwitterGiveawayBot
+    
     logger.info("🚀 Starting Twitter Giveaway Bot")
     logger.info(f"Configuration:")
     logger.info(f"  - Check interval: {Config.CHECK_INTERVAL_MINUTES} minutes")
@@ -31,6 +34,9 @@ def main():
     logger.info(f"  - Max accounts to use: {Config.MAX_ACCOUNTS_TO_USE}")
     
     try:
+        if Config.METRICS_PORT:
+            metrics.start_http_server(Config.METRICS_PORT, Config.METRICS_HOST)
+        
         # Initialize bot
         bot = TwitterGiveawayBot()
         
@@ -0,0 +1,217 @@
+"""
+In-process metrics: timing spans, counters and exports
+
+Usage:
+    from metrics import metrics
+
+    with metrics.span('phase', phase='search'):
+        ...
+    metrics.increment('api_calls', api='twitter_search')
+
+The snapshot can be written to a JSON file after each cycle
+(METRICS_JSON_PATH) and served in Prometheus text format (METRICS_PORT).
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_PREFIX = 'giveaway_bot_'
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict) -> LabelKey:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+def _format_key(key: LabelKey) -> str:
+    """Render a metric key as name{label="value",...}"""
+    name, labels = key
+    if not labels:
+        return name
+    return name + '{' + ','.join(f'{label}="{value}"' for label, value in labels) + '}'
+
+
+class _Timing:
+    """Aggregate of the durations recorded for one span"""
+    __slots__ = ('count', 'total', 'max', 'last')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.last = seconds
+
+
+class MetricsRegistry:
+    """Thread-safe store of counters, span timings and gauge collectors"""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._counters: Dict[LabelKey, float] = {}
+        self._timings: Dict[LabelKey, _Timing] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, float]]] = {}
+
+    def increment(self, name: str, value: float = 1, **labels):
+        """Add to a counter"""
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        """Record one duration for a span"""
+        key = _key(name, labels)
+        with self._lock:
+            timing = self._timings.get(key)
+            if timing is None:
+                timing = self._timings[key] = _Timing()
+            timing.add(seconds)
+
+    @contextmanager
+    def span(self, name: str, **labels):
+        """Time the enclosed block (recorded even if it raises)"""
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.observe(name, self._clock() - start, **labels)
+
+    def register_collector(self, name: str, collect: Callable[[], Dict[str, float]]):
+        """
+        Register a callable read at snapshot time, e.g. a cache's stats()
+
+        Its values are reported as gauges named <name>_<key>; registering the
+        same name again replaces the previous collector.
+        """
+        with self._lock:
+            self._collectors[name] = collect
+
+    def _gauges(self) -> Dict[str, float]:
+        gauges = {}
+        for name, collect in list(self._collectors.items()):
+            try:
+                for key, value in collect().items():
+                    gauges[f'{name}_{key}'] = value
+            except Exception as e:
+                logger.debug(f"Metrics collector {name} failed: {e}")
+        return gauges
+
+    def snapshot(self) -> Dict:
+        """
+        Get the current values of every metric
+
+        Returns:
+            Dictionary with 'counters', 'timings' (count, total/max/last seconds)
+            and 'gauges', keyed by name{label="value"}
+        """
+        with self._lock:
+            counters = {_format_key(key): value for key, value in self._counters.items()}
+            timings = {
+                _format_key(key): {
+                    'count': timing.count,
+                    'total_seconds': round(timing.total, 6),
+                    'max_seconds': round(timing.max, 6),
+                    'last_seconds': round(timing.last, 6),
+                }
+                for key, timing in self._timings.items()
+            }
+        return {'counters': counters, 'timings': timings, 'gauges': self._gauges()}
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            timings = sorted(self._timings.items())
+
+        seen = set()
+        for (name, labels), value in counters:
+            metric = f'{PROMETHEUS_PREFIX}{name}_total'
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f'# TYPE {metric} counter')
+            lines.append(f'{_format_key((metric, labels))} {value}')
+
+        for (name, labels), timing in timings:
+            metric = f'{PROMETHEUS_PREFIX}{name}_seconds'
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f'# TYPE {metric} summary')
+            lines.append(f'{_format_key((metric + "_count", labels))} {timing.count}')
+            lines.append(f'{_format_key((metric + "_sum", labels))} {timing.total:.6f}')
+
+        for name, value in sorted(self._gauges().items()):
+            metric = f'{PROMETHEUS_PREFIX}{name}'
+            lines.append(f'# TYPE {metric} gauge')
+            lines.append(f'{metric} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+    def write_json(self, path: str):
+        """Write the snapshot to a JSON file (replaced atomically)"""
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(dict(self.snapshot(), written_at=time.time()), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def reset(self):
+        """Drop all counters and timings (collectors are kept)"""
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+    def start_http_server(self, port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """
+        Serve /metrics (Prometheus text) and /metrics.json from a daemon thread
+
+        Args:
+            port: Port to listen on (0 picks a free port)
+            host: Interface to bind (default: localhost only)
+
+        Returns:
+            The running server (call shutdown() to stop it)
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body = registry.render_prometheus().encode()
+                    content_type = 'text/plain; version=0.0.4'
+                elif self.path == '/metrics.json':
+                    body = json.dumps(registry.snapshot()).encode()
+                    content_type = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(f"Metrics request: {format % args}")
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+        logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+        return server
+
+
+# Process-wide registry used by the bot
+metrics = MetricsRegistry()
@@ -1,34 +1,61 @@
 """
 Database models for Twitter Giveaway Bot
 """
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Float, Text
+from sqlalchemy import (
+    create_engine,
+    event,
+    inspect,
+    text,
+    Column,
+    BigInteger,
+    Integer,
+    String,
+    Date,
+    DateTime,
+    Boolean,
+    Float,
+    Text,
+    Index,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
 from datetime import datetime
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+import hashlib
+from config import Config
 
 Base = declarative_base()
 
 class Giveaway(Base):
     """Model for storing giveaway information"""
     __tablename__ = 'giveaways'
+    __table_args__ = (
+        Index('ix_giveaways_participated_created_at', 'participated', 'created_at'),
+        Index('ix_giveaways_live_priority', 'participated', 'expired', 'estimated_value_usd', 'id'),
+        Index('ix_giveaways_live_deadline', 'participated', 'expired', 'deadline', 'created_at'),
+        Index('ix_giveaways_created_at_status', 'created_at', 'participated', 'won'),
+        Index('ix_giveaways_author_participated', 'author_id', 'participated', 'created_at'),
+        Index('ix_giveaways_token_symbol_price', 'token_symbol', 'token_price_usd'),
+        Index('ix_giveaways_fingerprint', 'fingerprint'),
+    )
     
     id = Column(Integer, primary_key=True)
     tweet_id = Column(String(50), unique=True, nullable=False)
     author_id = Column(String(50), nullable=False)
     author_username = Column(String(100), nullable=False)
     tweet_text = Column(Text, nullable=False)
+    fingerprint = Column(BigInteger)  # near_duplicates.fingerprint() of tweet_text, as signed 64-bit
     token_name = Column(String(100))
     token_symbol = Column(String(20))
     token_price_usd = Column(Float)
     estimated_value_usd = Column(Float)
     created_at = Column(DateTime, default=datetime.utcnow)
-    deadline = Column(DateTime)
+    deadline = Column(DateTime)  # UTC, parsed from the tweet text
     
     # Participation tracking
     participated = Column(Boolean, default=False)
+    expired = Column(Boolean, default=False)  # deadline passed before participating
     followed = Column(Boolean, default=False)
     retweeted = Column(Boolean, default=False)
     liked = Column(Boolean, default=False)
@@ -40,9 +67,28 @@ class Giveaway(Base):
     checked_at = Column(DateTime)
 
 
+class GiveawayDuplicate(Base):
+    """Model linking a reposted giveaway tweet to the giveaway it copies"""
+    __tablename__ = 'giveaway_duplicates'
+    __table_args__ = (
+        Index('ix_giveaway_duplicates_original', 'original_tweet_id'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    tweet_id = Column(String(50), unique=True, nullable=False)
+    original_tweet_id = Column(String(50), nullable=False)
+    author_id = Column(String(50))
+    distance = Column(Integer, nullable=False)  # differing fingerprint bits
+    found_at = Column(DateTime, default=datetime.utcnow)
+
+
 class Account(Base):
     """Model for storing Twitter account information"""
     __tablename__ = 'accounts'
+    __table_args__ = (
+        Index('ix_accounts_is_active', 'is_active'),
+        Index('ix_accounts_total_wins', 'total_wins'),
+    )
     
     id = Column(Integer, primary_key=True)
     account_number = Column(Integer, unique=True, nullable=False)
@@ -58,24 +104,287 @@ class Account(Base):
 class WinnerNotification(Base):
     """Model for storing winner notifications"""
     __tablename__ = 'winner_notifications'
+    __table_args__ = (
+        Index('ix_winner_notifications_received_at', 'received_at'),
+        Index('ix_winner_notifications_account_source', 'account_number', 'source_tweet_id',
+              unique=True),
+        Index('ix_winner_notifications_account_hash', 'account_number', 'content_hash'),
+    )
     
     id = Column(Integer, primary_key=True)
     giveaway_id = Column(Integer)
     account_number = Column(Integer)
     notification_type = Column(String(20))  # 'dm' or 'mention'
     notification_text = Column(Text)
+    source_tweet_id = Column(String(50))  # tweet the notification came from, if any
+    content_hash = Column(String(64))  # see hash_text()
     received_at = Column(DateTime, default=datetime.utcnow)
     processed = Column(Boolean, default=False)
 
 
+class CoinSymbol(Base):
+    """Model for the local symbol -> CoinGecko coin id index"""
+    __tablename__ = 'coin_index'
+    __table_args__ = (
+        Index('ix_coin_index_symbol_rank', 'symbol', 'rank'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String(50), nullable=False)  # uppercase
+    coin_id = Column(String(200), nullable=False)
+    rank = Column(Integer, default=0)  # lower is preferred
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class SearchCheckpoint(Base):
+    """Model for the newest tweet processed per search query"""
+    __tablename__ = 'search_checkpoints'
+    
+    search_query = Column(String(512), primary_key=True)
+    newest_id = Column(String(50), nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class DailyStats(Base):
+    """Model for per-day giveaway counters, maintained by rollups.py"""
+    __tablename__ = 'daily_stats'
+    
+    day = Column(Date, primary_key=True)  # UTC day the giveaway was found
+    giveaways_found = Column(Integer, nullable=False, default=0)
+    participated = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0)  # giveaways marked won
+    winner_notifications = Column(Integer, nullable=False, default=0)  # by day received
+
+
+class DailyTokenStats(Base):
+    """Model for per-day, per-token giveaway counters, maintained by rollups.py"""
+    __tablename__ = 'daily_token_stats'
+    __table_args__ = (
+        Index('ix_daily_token_stats_symbol_last', 'token_symbol', 'last_giveaway_id',
+              'last_price_usd'),
+    )
+    
+    day = Column(Date, primary_key=True)
+    token_symbol = Column(String(20), primary_key=True)
+    giveaways = Column(Integer, nullable=False, default=0)
+    last_giveaway_id = Column(Integer)  # newest giveaway counted in this row
+    last_price_usd = Column(Float)  # token price of that giveaway
+
+
+class PriceSample(Base):
+    """Model for the append-only token price history, written by price_history.py"""
+    __tablename__ = 'price_history'
+    __table_args__ = (
+        Index('ix_price_history_symbol_fetched_at', 'token_symbol', 'fetched_at', 'price_usd'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    token_symbol = Column(String(20), nullable=False)
+    coin_id = Column(String(200))  # CoinGecko id the price was fetched for
+    price_usd = Column(Float, nullable=False)
+    fetched_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
 # Database setup
-DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///giveaways.db')
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+DATABASE_URL = Config.DATABASE_URL
+
+SQLITE_JOURNAL_MODES = {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'}
+SQLITE_SYNCHRONOUS_MODES = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+
+def create_db_engine(database_url: str = None):
+    """
+    Create the database engine
+    
+    SQLite databases get the production profile from Config: WAL journaling so
+    readers (e.g. stats.py) never block the bot's writes, synchronous=NORMAL,
+    a larger page cache, memory-mapped I/O and in-memory temp tables.
+    
+    Args:
+        database_url: SQLAlchemy URL (default: DATABASE_URL)
+        
+    Returns:
+        SQLAlchemy engine
+    """
+    url = make_url(database_url or DATABASE_URL)
+    
+    if url.get_backend_name() != 'sqlite':
+        return create_engine(
+            url,
+            pool_size=Config.DB_POOL_SIZE,
+            max_overflow=Config.DB_MAX_OVERFLOW,
+            pool_pre_ping=True
+        )
+    
+    in_memory = url.database in (None, '', ':memory:')
+    connect_args = {
+        'check_same_thread': False,  # pooled connections are shared across threads
+        'timeout': Config.SQLITE_BUSY_TIMEOUT_SECONDS,
+    }
+    if in_memory:
+        # Every connection to :memory: is a separate database, so share one
+        sqlite_engine = create_engine(url, connect_args=connect_args, poolclass=StaticPool)
+    else:
+        sqlite_engine = create_engine(
+            url,
+            connect_args=connect_args,
+            pool_size=Config.DB_POOL_SIZE,
+            max_overflow=Config.DB_MAX_OVERFLOW
+        )
+    
+    journal_mode = Config.SQLITE_JOURNAL_MODE.upper()
+    synchronous = Config.SQLITE_SYNCHRONOUS.upper()
+    if journal_mode not in SQLITE_JOURNAL_MODES:
+        raise ValueError(f"Invalid SQLITE_JOURNAL_MODE: {Config.SQLITE_JOURNAL_MODE}")
+    if synchronous not in SQLITE_SYNCHRONOUS_MODES:
+        raise ValueError(f"Invalid SQLITE_SYNCHRONOUS: {Config.SQLITE_SYNCHRONOUS}")
+    
+    @event.listens_for(sqlite_engine, 'connect')
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not in_memory:
+            cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={synchronous}")
+        cursor.execute(f"PRAGMA cache_size=-{int(Config.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute(f"PRAGMA mmap_size={int(Config.SQLITE_MMAP_SIZE_MB) * 1024 * 1024}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+    
+    return sqlite_engine
+
+# Created on first use, so importing the models (e.g. for a CLI's --help) stays cheap
+engine = None
+_session_factory = sessionmaker(autocommit=False, autoflush=False)
+
+def get_engine():
+    """Get the database engine, creating it on first use"""
+    global engine
+    if engine is None:
+        engine = create_db_engine()
+    return engine
+
+def SessionLocal():
+    """Open a database session"""
+    return _session_factory(bind=get_engine())
 
 def init_db():
     """Initialize the database"""
+    engine = get_engine()
+    existing = set(inspect(engine).get_table_names())
     Base.metadata.create_all(bind=engine)
+    migrate_db()
+    
+    if existing and 'daily_stats' not in existing:
+        # Rollup tables added to a database that already has history
+        from rollups import rebuild_rollups
+        rebuild_rollups()
+
+def hash_text(text: str) -> str:
+    """Get the content hash stored alongside notification text"""
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+# Indexes from earlier schema versions that have been replaced
+OBSOLETE_INDEXES = {
+    'giveaways': ['ix_giveaways_created_at_participated', 'ix_giveaways_pending_priority',
+                  'ix_giveaways_won'],
+    'winner_notifications': ['ix_winner_notifications_account_text'],
+}
+
+def migrate_db():
+    """Bring an existing database up to date with the models"""
+    engine = get_engine()
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        # create_all() skips existing tables, so add any columns they are missing
+        columns = {column['name'] for column in inspector.get_columns(table.name)}
+        added = [column for column in table.columns if column.name not in columns]
+        for column in added:
+            _add_column(table, column)
+        if added:
+            _backfill(table.name, {column.name for column in added})
+        
+        # ... and any indexes
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        with engine.begin() as conn:
+            for name in OBSOLETE_INDEXES.get(table.name, []):
+                if name in existing:
+                    conn.execute(text(f'DROP INDEX {name}'))
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=engine)
+
+def _add_column(table, column):
+    """Add a column to an existing table, keeping its scalar default for old rows"""
+    engine = get_engine()
+    column_type = column.type.compile(dialect=engine.dialect)
+    ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+    
+    if column.default is not None and column.default.is_scalar:
+        literal = column.type.literal_processor(dialect=engine.dialect)
+        ddl += f' DEFAULT {literal(column.default.arg)}'
+    
+    with engine.begin() as conn:
+        conn.execute(text(ddl))
+
+def _backfill(table_name: str, column_names: set):
+    """Fill in derived columns for rows written before the column existed"""
+    engine = get_engine()
+    if table_name == 'winner_notifications' and 'content_hash' in column_names:
+        with engine.begin() as conn:
+            rows = conn.execute(text(
+                'SELECT id, notification_text FROM winner_notifications'
+            )).fetchall()
+            if rows:
+                conn.execute(
+                    text('UPDATE winner_notifications SET content_hash = :hash WHERE id = :id'),
+                    [{'id': row.id, 'hash': hash_text(row.notification_text)} for row in rows]
+                )
+
+def insert_ignoring_conflicts(db, table, rows, index_elements, return_keys: bool = False):
+    """
+    Insert many rows in one statement, skipping rows that hit a unique constraint
+    
+    Args:
+        db: Database session (the caller commits)
+        table: Table to insert into
+        rows: List of column -> value dictionaries
+        index_elements: Columns of the unique constraint to ignore conflicts on
+        return_keys: Return which rows were inserted instead of how many
+        
+    Returns:
+        Number of rows inserted, or with return_keys a list of the inserted
+        rows' index_elements values (one tuple per row)
+    """
+    if not rows:
+        return [] if return_keys else 0
+    
+    def keys_of(inserted_rows):
+        return [tuple(row[name] for name in index_elements) for row in inserted_rows]
+    
+    dialect = db.get_bind().dialect
+    if dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        # No portable ON CONFLICT; fall back to one savepoint per row
+        inserted = []
+        for row in rows:
+            try:
+                with db.begin_nested():
+                    db.execute(table.insert(), row)
+                inserted.append(row)
+            except IntegrityError:
+                pass
+        return keys_of(inserted) if return_keys else len(inserted)
+    
+    stmt = insert(table).on_conflict_do_nothing(index_elements=index_elements)
+    if not return_keys:
+        return db.execute(stmt, rows).rowcount
+    if dialect.insert_executemany_returning:
+        returning = stmt.returning(*(table.c[name] for name in index_elements))
+        return [tuple(row) for row in db.execute(returning, rows)]
+    # No RETURNING (SQLite before 3.35): one statement per row
+    return keys_of(row for row in rows if db.execute(stmt, row).rowcount)
 
 def get_db():
     """Get database session"""
@@ -0,0 +1,293 @@
+"""
+Near-duplicate detection for giveaway tweets
+
+Reposted giveaways differ from the original only in links, a retweet prefix,
+emoji, hashtags or a few words. Each giveaway text gets a 64-bit fingerprint:
+
+- the top 24 bits hash its identity tokens (@handles, $cashtags and numbers,
+  in order), which must match exactly, so templated giveaways from different
+  organizers or for different amounts are never merged
+- the low 40 bits are a SimHash of its normalized words and word pairs
+
+Texts with the same identity whose SimHashes differ in at most
+NEAR_DUPLICATE_MAX_DISTANCE bits are near-duplicates. The SimHash is split into
+max_distance + 1 bands; two SimHashes within max_distance bits agree exactly on
+at least one band, so a lookup only compares against the fingerprints in its
+own band buckets instead of every stored giveaway.
+"""
+import hashlib
+import logging
+import re
+import struct
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from config import Config
+from metrics import metrics
+from models import Giveaway, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+SIMHASH_BITS = 40
+IDENTITY_BITS = FINGERPRINT_BITS - SIMHASH_BITS
+
+URL_PATTERN = re.compile(r'https?://\S+')
+RETWEET_PREFIX = re.compile(r'^rt\s+@\w+:\s*')
+# Words, $tickers, #tags and @handles; amounts like 1,000 or 0.5 stay one token
+TOKEN_PATTERN = re.compile(r'[$#@]?[a-z0-9_]+(?:[.,][0-9]+)*')
+
+# Byte value -> its 8 bits spread into 16-bit counters, pre-shifted per digest byte
+# position, so adding one integer per feature counts all 64 bits at once
+_SPREAD = [sum(((byte >> bit) & 1) << (16 * bit) for bit in range(8)) for byte in range(256)]
+_SPREAD_AT = [[spread << (128 * position) for spread in _SPREAD] for position in range(8)]
+_UNPACK_COUNTS = struct.Struct('<64H').unpack
+
+
+def normalize_text(text: str) -> List[str]:
+    """
+    Reduce a tweet to the tokens that identify the giveaway
+
+    Args:
+        text: Tweet text
+
+    Returns:
+        Lowercased tokens without links, retweet prefix, emoji or punctuation
+    """
+    text = URL_PATTERN.sub(' ', text.lower())
+    return TOKEN_PATTERN.findall(RETWEET_PREFIX.sub('', text))
+
+
+def _is_identity(token: str) -> bool:
+    return token[0] in '@$' or any(char.isdigit() for char in token)
+
+
+@lru_cache(maxsize=16384)
+def _feature_bits(feature: str) -> int:
+    """A feature's 64-bit hash with each bit spread into its own 16-bit counter"""
+    digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+    return (_SPREAD_AT[0][digest[0]] | _SPREAD_AT[1][digest[1]] | _SPREAD_AT[2][digest[2]]
+            | _SPREAD_AT[3][digest[3]] | _SPREAD_AT[4][digest[4]] | _SPREAD_AT[5][digest[5]]
+            | _SPREAD_AT[6][digest[6]] | _SPREAD_AT[7][digest[7]])
+
+
+def _simhash(features: List[str]) -> int:
+    """64-bit SimHash of a list of features"""
+    # 64 counters of 16 bits in one integer: how many feature hashes set each bit
+    # (feed vocabulary repeats, so most features are cached)
+    counts = sum(map(_feature_bits, features))
+
+    # A bit is set when most features set it
+    half = len(features) // 2
+    result = 0
+    for bit, count in enumerate(_UNPACK_COUNTS(counts.to_bytes(128, 'little'))):
+        if count > half:
+            result |= 1 << bit
+    return result
+
+
+def fingerprint(text: str) -> int:
+    """
+    Compute the near-duplicate fingerprint of a tweet
+
+    Args:
+        text: Tweet text
+
+    Returns:
+        Unsigned 64-bit fingerprint: identity hash in the top IDENTITY_BITS,
+        SimHash in the low SIMHASH_BITS (0 for a text without tokens)
+    """
+    tokens = normalize_text(text)
+    if not tokens:
+        return 0
+
+    features = tokens + [f'{first} {second}' for first, second in zip(tokens, tokens[1:])]
+    identity = ' '.join(token for token in tokens if _is_identity(token))
+    identity_hash = int.from_bytes(
+        hashlib.blake2b(identity.encode('utf-8'), digest_size=IDENTITY_BITS // 8).digest(), 'little'
+    )
+    return (identity_hash << SIMHASH_BITS) | (_simhash(features) & ((1 << SIMHASH_BITS) - 1))
+
+
+def hamming_distance(first: int, second: int) -> int:
+    """Number of bits two fingerprints differ in"""
+    return bin(first ^ second).count('1')
+
+
+def to_signed(fingerprint: int) -> int:
+    """Fingerprint as stored in a signed 64-bit INTEGER column"""
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def from_signed(value: int) -> int:
+    """Fingerprint read back from the database"""
+    return value + (1 << 64) if value < 0 else value
+
+
+class NearDuplicate(NamedTuple):
+    """A stored giveaway a tweet is a near-duplicate of"""
+    tweet_id: str
+    distance: int
+
+
+class NearDuplicateIndex:
+    """
+    Banded in-memory index of recent giveaway fingerprints
+
+    Only giveaways with the same token symbol and identity tokens can be
+    near-duplicates.
+    """
+
+    def __init__(self, max_distance: int = None, maxsize: int = None):
+        """
+        Args:
+            max_distance: Differing bits still counted as a near-duplicate
+                (default: NEAR_DUPLICATE_MAX_DISTANCE)
+            maxsize: Fingerprints kept in memory, oldest dropped first
+                (default: SEEN_TWEETS_CACHE_SIZE)
+        """
+        self.max_distance = Config.NEAR_DUPLICATE_MAX_DISTANCE if max_distance is None else max_distance
+        self.maxsize = maxsize or Config.SEEN_TWEETS_CACHE_SIZE
+        # Bands narrower than 4 bits would put most fingerprints in the same buckets
+        if not 0 <= self.max_distance < SIMHASH_BITS // 4:
+            raise ValueError(f"NEAR_DUPLICATE_MAX_DISTANCE must be between 0 and "
+                             f"{SIMHASH_BITS // 4 - 1}, not {self.max_distance}")
+
+        self.band_count = self.max_distance + 1
+        self.band_bits = SIMHASH_BITS // self.band_count
+        self._band_mask = (1 << self.band_bits) - 1
+
+        # tweet id -> (fingerprint, token symbol), oldest first
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        # Ids of giveaways queued for writing but not yet stored
+        self._pending = set()
+        # per band: (token symbol, identity hash, band value) -> tweet ids
+        self._buckets: List[Dict[tuple, List[str]]] = [{} for _ in range(self.band_count)]
+        metrics.register_collector('near_duplicate_index', lambda: {'size': len(self)})
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _keys(self, fingerprint: int, token_symbol: Optional[str]):
+        identity = fingerprint >> SIMHASH_BITS
+        for band in range(self.band_count):
+            yield band, (token_symbol, identity,
+                         (fingerprint >> (band * self.band_bits)) & self._band_mask)
+
+    def warm(self) -> int:
+        """
+        Load the fingerprints of the most recently stored giveaways
+
+        Returns:
+            Number of fingerprints loaded
+        """
+        db = SessionLocal()
+        try:
+            rows = db.query(Giveaway.tweet_id, Giveaway.fingerprint, Giveaway.token_symbol).filter(
+                Giveaway.fingerprint.isnot(None)
+            ).order_by(Giveaway.id.desc()).limit(self.maxsize).all()
+        finally:
+            db.close()
+
+        for row in reversed(rows):
+            self.add(row.tweet_id, from_signed(row.fingerprint), row.token_symbol)
+        logger.info(f"Loaded {len(rows)} giveaway fingerprints")
+        return len(rows)
+
+    def add(self, tweet_id: str, fingerprint: int, token_symbol: Optional[str],
+            pending: bool = False):
+        """
+        Index a giveaway
+
+        Args:
+            tweet_id: Tweet id of the giveaway
+            fingerprint: Its fingerprint
+            token_symbol: Token it gives away
+            pending: Queued for writing but not yet stored; found like any other
+                entry until discard_pending() drops it, and adding it again
+                once stored makes it permanent
+        """
+        tweet_id = str(tweet_id)
+        if tweet_id in self._entries:
+            if not pending:
+                self._pending.discard(tweet_id)
+            return
+        self._entries[tweet_id] = (fingerprint, token_symbol)
+        for band, key in self._keys(fingerprint, token_symbol):
+            self._buckets[band].setdefault(key, []).append(tweet_id)
+        if pending:
+            self._pending.add(tweet_id)
+
+        if len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+
+    def discard_pending(self, tweet_ids: Iterable[str]):
+        """Drop pending giveaways whose write was rolled back"""
+        for tweet_id in map(str, tweet_ids):
+            if tweet_id in self._pending:
+                self._remove(tweet_id)
+
+    def _remove(self, tweet_id: str):
+        fingerprint, token_symbol = self._entries.pop(tweet_id)
+        self._pending.discard(tweet_id)
+        for band, key in self._keys(fingerprint, token_symbol):
+            bucket = self._buckets[band][key]
+            bucket.remove(tweet_id)
+            if not bucket:
+                del self._buckets[band][key]
+
+    def find(self, fingerprint: int, token_symbol: Optional[str],
+             tweet_id: str = None) -> Optional[NearDuplicate]:
+        """
+        Find the closest indexed giveaway within max_distance bits
+
+        Args:
+            fingerprint: Fingerprint of the tweet
+            token_symbol: Token the tweet gives away
+            tweet_id: The tweet's own id, never reported as its own duplicate
+
+        Returns:
+            NearDuplicate, or None
+        """
+        best = None
+        checked = set()
+        for band, key in self._keys(fingerprint, token_symbol):
+            for candidate in self._buckets[band].get(key, ()):
+                if candidate in checked or candidate == tweet_id:
+                    continue
+                checked.add(candidate)
+                distance = hamming_distance(fingerprint, self._entries[candidate][0])
+                if distance <= self.max_distance and (best is None or distance < best.distance):
+                    best = NearDuplicate(candidate, distance)
+                    if distance == 0:
+                        return best
+        return best
+
+    def find_stored(self, fingerprints: Iterable[int]) -> Dict[int, str]:
+        """
+        Look up exact fingerprint matches among all stored giveaways
+
+        Catches reposts of giveaways that have dropped out of memory; near
+        (but not identical) matches are only found in memory.
+
+        Args:
+            fingerprints: Fingerprints to look up
+
+        Returns:
+            Dictionary of fingerprint -> tweet id of the oldest giveaway with it
+        """
+        signed = list(dict.fromkeys(to_signed(fingerprint) for fingerprint in fingerprints))
+        found = {}
+        db = SessionLocal()
+        try:
+            # Keep IN (...) lists under SQLite's bound-parameter limit
+            for start in range(0, len(signed), 500):
+                rows = db.query(Giveaway.fingerprint, Giveaway.tweet_id).filter(
+                    Giveaway.fingerprint.in_(signed[start:start + 500])
+                ).order_by(Giveaway.id.desc())
+                for row in rows:
+                    found[from_signed(row.fingerprint)] = row.tweet_id
+        finally:
+            db.close()
+        return found
@@ -0,0 +1,181 @@
+"""
+Streaming iteration over giveaways that have not been participated in yet
+
+Giveaways whose deadline has passed are flagged expired by expire_giveaways()
+and drop out of the pending set, so it stays proportional to live giveaways.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional
+
+from sqlalchemy import and_, select, tuple_, union_all, update
+
+from config import Config
+from metrics import metrics
+from models import Giveaway, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingGiveaway:
+    """The columns of a Giveaway needed to participate in it"""
+    id: int
+    tweet_id: str
+    author_id: str
+    tweet_text: str
+    estimated_value_usd: Optional[float]
+    created_at: Optional[datetime]
+
+    # Set while participating and written back with the participation status
+    followed: bool = False
+    retweeted: bool = False
+    liked: bool = False
+    commented: bool = False
+
+
+PENDING_COLUMNS = (
+    Giveaway.id, Giveaway.tweet_id, Giveaway.author_id, Giveaway.tweet_text,
+    Giveaway.estimated_value_usd, Giveaway.created_at,
+)
+
+
+def pending_page_query(db, valued: bool = True, after: Optional[PendingGiveaway] = None,
+                       limit: int = 100):
+    """
+    Build the query for one page of pending giveaways
+
+    Giveaways with an estimated value come first, most valuable first, then
+    those without one; ties go to the newest. Pages continue after the last row
+    of the previous page (keyset pagination), so every page is an index range
+    scan however deep it is.
+
+    Args:
+        db: Database session
+        valued: Page through giveaways with (True) or without (False) an estimated value
+        after: Last giveaway of the previous page
+        limit: Page size
+
+    Returns:
+        Query
+    """
+    value = Giveaway.estimated_value_usd
+    query = db.query(*PENDING_COLUMNS).filter(Giveaway.participated == False,
+                                              Giveaway.expired == False)
+
+    if valued:
+        query = query.filter(value.isnot(None))
+        if after is not None:
+            query = query.filter(tuple_(value, Giveaway.id) < (after.estimated_value_usd, after.id))
+        query = query.order_by(value.desc(), Giveaway.id.desc())
+    else:
+        query = query.filter(value.is_(None))
+        if after is not None:
+            query = query.filter(Giveaway.id < after.id)
+        query = query.order_by(Giveaway.id.desc())
+
+    return query.limit(limit)
+
+
+def iter_pending_giveaways(page_size: int = None) -> Iterator[PendingGiveaway]:
+    """
+    Yield pending giveaways, highest priority first, one page at a time
+
+    Each page is read in its own short session that is closed before the page
+    is yielded, so no transaction stays open while participating and memory
+    use is bounded by the page size.
+
+    Args:
+        page_size: Giveaways loaded per query
+
+    Yields:
+        PendingGiveaway
+    """
+    page_size = page_size or Config.PENDING_PAGE_SIZE
+
+    for valued in (True, False):
+        last = None
+        while True:
+            db = SessionLocal()
+            try:
+                query = pending_page_query(db, valued, last, page_size)
+                page = [PendingGiveaway(*row) for row in query]
+            finally:
+                db.close()
+
+            yield from page
+
+            if len(page) < page_size:
+                break
+            last = page[-1]
+
+
+def expired_conditions(now: datetime, max_age_days: float = None) -> List:
+    """
+    Conditions matching live pending giveaways that have expired
+
+    A giveaway expires when its deadline passes, or, without a deadline,
+    max_age_days after it was found. Each condition is a range scan of
+    ix_giveaways_live_deadline (an OR of the two would scan every live row).
+
+    Args:
+        now: Current time (UTC)
+        max_age_days: Age that expires giveaways without a deadline
+            (default: PENDING_MAX_AGE_DAYS; 0 never expires them)
+
+    Returns:
+        List of SQL conditions
+    """
+    max_age_days = Config.PENDING_MAX_AGE_DAYS if max_age_days is None else max_age_days
+    live = and_(Giveaway.participated == False, Giveaway.expired == False)
+
+    conditions = [and_(live, Giveaway.deadline < now)]
+    if max_age_days:
+        conditions.append(and_(
+            live,
+            Giveaway.deadline.is_(None),
+            Giveaway.created_at < now - timedelta(days=max_age_days),
+        ))
+    return conditions
+
+
+def expired_giveaways_query(now: datetime, max_age_days: float = None):
+    """Ids of the giveaways the next expiry sweep will flag"""
+    return union_all(*[
+        select(Giveaway.id).where(condition)
+        for condition in expired_conditions(now, max_age_days)
+    ])
+
+
+def expire_giveaways(now: datetime = None, max_age_days: float = None) -> int:
+    """
+    Flag pending giveaways that can no longer be entered as expired
+
+    Args:
+        now: Current time (default: now, UTC)
+        max_age_days: Age that expires giveaways without a deadline
+            (default: PENDING_MAX_AGE_DAYS)
+
+    Returns:
+        Number of giveaways expired
+    """
+    now = now or datetime.utcnow()
+
+    expired = 0
+    db = SessionLocal()
+    try:
+        with metrics.span('db_commit', op='expire_giveaways'):
+            for condition in expired_conditions(now, max_age_days):
+                expired += db.execute(
+                    update(Giveaway).where(condition).values(expired=True),
+                    execution_options={'synchronize_session': False},
+                ).rowcount
+            db.commit()
+    finally:
+        db.close()
+
+    if expired:
+        metrics.increment('giveaways_expired', expired)
+        logger.info(f"Expired {expired} pending giveaways past their deadline")
+    return expired
@@ -1,22 +1,120 @@
 """
 Price checker for cryptocurrency tokens
 """
-import requests
-from typing import Optional, Dict
-from pycoingecko import CoinGeckoAPI
+from typing import Optional, Dict, FrozenSet, Iterable, List, Tuple, Union
+from cache import LRUCache
+from coin_index import CoinIndex
+from coingecko_client import CoinGeckoClient
 from config import Config
+from metrics import metrics
+from price_history import record_prices
+from price_sources import (CoinGeckoSource, FixturePriceSource, MemoryCacheSource,
+                           PriceHistorySource, PriceSource, PriceSourceChain)
+from records import TokenInfo
 import logging
 import re
 
 logger = logging.getLogger(__name__)
 
+# Map common symbols to CoinGecko IDs
+SYMBOL_MAP = {
+    'BTC': 'bitcoin',
+    'ETH': 'ethereum',
+    'BNB': 'binancecoin',
+    'SOL': 'solana',
+    'ADA': 'cardano',
+    'XRP': 'ripple',
+    'DOGE': 'dogecoin',
+    'USDT': 'tether',
+    'USDC': 'usd-coin',
+    'MATIC': 'matic-network',
+    'DOT': 'polkadot',
+    'AVAX': 'avalanche-2',
+    'LINK': 'chainlink',
+    'UNI': 'uniswap',
+    'ATOM': 'cosmos',
+}
+
+KNOWN_TOKENS = ['BTC', 'ETH', 'BNB', 'SOL', 'ADA', 'XRP', 'DOGE',
+                'USDT', 'USDC', 'MATIC', 'DOT', 'AVAX', 'LINK',
+                'UNI', 'ATOM']
+
+# Amount followed by a token symbol, e.g. "1,000 ETH"
+AMOUNT_PATTERN = re.compile(r'(\d+(?:,\d+)*(?:\.\d+)?)\s*([A-Z]{2,10})')
+
+
+def select_token(
+    text: str, stop_words: FrozenSet[str] = frozenset()
+) -> Tuple[Optional[str], Optional[float]]:
+    """
+    Pick the token symbol (and amount, if stated) a giveaway text refers to
+    
+    Args:
+        text: Giveaway tweet text
+        stop_words: Uppercase words that are never tickers
+        
+    Returns:
+        Tuple of (symbol, amount); either may be None
+    """
+    text_upper = text.upper()
+    
+    # Look for amounts with token symbols, skipping words like "100 WINNERS"
+    for match in AMOUNT_PATTERN.finditer(text_upper):
+        if match.group(2) in stop_words:
+            continue
+        amount_str = match.group(1).replace(',', '')
+        try:
+            return match.group(2), float(amount_str)
+        except ValueError:
+            pass
+    
+    # Otherwise, just look for token symbols
+    for token in KNOWN_TOKENS:
+        if token in text_upper:
+            return token, None
+    
+    return None, None
+
 
 class PriceChecker:
     """Check cryptocurrency prices"""
     
     def __init__(self):
-        self.cg = CoinGeckoAPI()
-        self.cache = {}  # Simple price cache
+        self.cg = CoinGeckoClient()
+        self.cache = LRUCache(
+            maxsize=Config.PRICE_CACHE_MAX_SIZE,
+            ttl=Config.PRICE_CACHE_TTL_SECONDS
+        )
+        # Symbols that recently failed to resolve
+        self.negative_cache = LRUCache(
+            maxsize=Config.NEGATIVE_CACHE_MAX_SIZE,
+            ttl=Config.NEGATIVE_CACHE_TTL_SECONDS
+        )
+        self.stop_words = frozenset(Config.TICKER_STOP_WORDS)
+        self.coin_index = CoinIndex(lambda: self.cg.get_coins_list(), pinned=SYMBOL_MAP)
+        self.price_sources = PriceSourceChain(self._build_sources())
+        metrics.register_collector('price_cache', self.cache.stats)
+        metrics.register_collector('price_negative_cache', self.negative_cache.stats)
+    
+    def _build_sources(self) -> List[PriceSource]:
+        """Create the price sources named in PRICE_SOURCES, in order"""
+        sources = []
+        for name in Config.PRICE_SOURCES:
+            if name == 'cache':
+                sources.append(MemoryCacheSource(self.cache, Config.PRICE_CACHE_TTL_SECONDS))
+            elif name == 'history':
+                if Config.PRICE_HISTORY_MAX_AGE_SECONDS:
+                    sources.append(PriceHistorySource(Config.PRICE_HISTORY_MAX_AGE_SECONDS,
+                                                      Config.PRICE_HISTORY_TIMEOUT_SECONDS))
+            elif name == 'coingecko':
+                sources.append(CoinGeckoSource(self._get_prices_from_coingecko,
+                                               Config.COINGECKO_SOURCE_TIMEOUT_SECONDS))
+            elif name == 'fixture':
+                if Config.PRICE_FIXTURE_PATH:
+                    sources.append(FixturePriceSource(Config.PRICE_FIXTURE_PATH))
+            else:
+                raise ValueError(f"Unknown price source in PRICE_SOURCES: {name}")
+        return sources
         
     def get_token_price(self, token_symbol: str) -> Optional[float]:
         """
@@ -28,67 +126,109 @@ class PriceChecker:
         Returns:
             Price in USD or None if not found
         """
-        token_symbol = token_symbol.upper().strip()
+        return self.get_token_prices([token_symbol]).get(token_symbol.upper().strip())
+    
+    def get_token_prices(self, token_symbols: Iterable[str]) -> Dict[str, Optional[float]]:
+        """
+        Get USD prices for several tokens through the price source chain
         
-        # Check cache first
-        if token_symbol in self.cache:
-            return self.cache[token_symbol]
+        Symbols not in the cache are looked up together, so CoinGecko gets
+        at most one request (per batch) for all of them.
         
-        try:
-            # Try CoinGecko API
-            price = self._get_price_from_coingecko(token_symbol)
-            if price:
-                self.cache[token_symbol] = price
-                return price
-                
-        except Exception as e:
-            logger.error(f"Error getting price for {token_symbol}: {e}")
+        Args:
+            token_symbols: Token symbols (e.g., ['BTC', 'ETH'])
+            
+        Returns:
+            Dictionary of uppercase symbol -> price in USD (None if not found)
+        """
+        prices = {}
+        lookup = []
+        
+        for symbol in token_symbols:
+            symbol = symbol.upper().strip()
+            if symbol in prices:
+                continue
+            prices[symbol] = None
+            if symbol not in self.stop_words and symbol not in self.negative_cache:
+                lookup.append(symbol)
         
-        return None
+        if lookup:
+            for symbol, point in self.price_sources.get_prices(lookup).items():
+                prices[symbol] = point.price_usd
+        
+        return prices
     
-    def _get_price_from_coingecko(self, token_symbol: str) -> Optional[float]:
-        """Get price from CoinGecko API"""
-        try:
-            # Map common symbols to CoinGecko IDs
-            symbol_map = {
-                'BTC': 'bitcoin',
-                'ETH': 'ethereum',
-                'BNB': 'binancecoin',
-                'SOL': 'solana',
-                'ADA': 'cardano',
-                'XRP': 'ripple',
-                'DOGE': 'dogecoin',
-                'USDT': 'tether',
-                'USDC': 'usd-coin',
-                'MATIC': 'matic-network',
-                'DOT': 'polkadot',
-                'AVAX': 'avalanche-2',
-                'LINK': 'chainlink',
-                'UNI': 'uniswap',
-                'ATOM': 'cosmos',
-            }
-            
-            coin_id = symbol_map.get(token_symbol)
-            
-            if not coin_id:
-                # Try to find by symbol
-                coins_list = self.cg.get_coins_list()
-                for coin in coins_list:
-                    if coin.get('symbol', '').upper() == token_symbol:
-                        coin_id = coin['id']
-                        break
+    def price_unavailable(self, token_symbol: str) -> bool:
+        """
+        Check whether a token went unpriced only because a price source failed
+        
+        Args:
+            token_symbol: Token symbol (e.g., 'BTC', 'ETH')
             
+        Returns:
+            True if the latest lookup found no price while a source was failing
+            or its breaker was open
+        """
+        return token_symbol.upper().strip() in self.price_sources.unavailable
+    
+    def _record_prices(self, prices: Dict[str, float], coin_ids: Dict[str, str]):
+        """Append fetched prices to the price history"""
+        try:
+            record_prices(prices, coin_ids)
+        except Exception as e:
+            logger.error(f"Error recording price history: {e}")
+    
+    def _get_prices_from_coingecko(self, token_symbols: List[str]) -> Dict[str, float]:
+        """
+        Get prices for several symbols from CoinGecko in as few requests as possible
+        
+        API errors are raised, so the price source chain can count them.
+        """
+        prices = {}
+        coin_ids = {}  # coin_id -> symbol
+        
+        for symbol in token_symbols:
+            coin_id = self._resolve_coin_id(symbol)
             if coin_id:
-                data = self.cg.get_price(ids=coin_id, vs_currencies='usd')
+                coin_ids[coin_id] = symbol
+        
+        # The client splits the ids into concurrent batch requests and joins
+        # requests already in flight for the same coins
+        if coin_ids:
+            data = self.cg.get_price(ids=','.join(coin_ids), vs_currencies='usd')
+            # A known coin missing from one response is a gap, not an unknown symbol:
+            # leave it to the later price sources and ask again next time
+            for coin_id, symbol in coin_ids.items():
                 if coin_id in data and 'usd' in data[coin_id]:
-                    return float(data[coin_id]['usd'])
-                    
+                    prices[symbol] = float(data[coin_id]['usd'])
+        
+        if prices:
+            self._record_prices(prices, {symbol: coin_id for coin_id, symbol in coin_ids.items()})
+        
+        return prices
+    
+    def _resolve_coin_id(self, token_symbol: str) -> Optional[str]:
+        """Map a symbol to its CoinGecko id via the hard-coded map or the local index"""
+        coin_id = SYMBOL_MAP.get(token_symbol)
+        if coin_id:
+            return coin_id
+        
+        try:
+            coin_ids = self.coin_index.lookup(token_symbol)
+            if not coin_ids and self.coin_index.refreshed_at() is not None:
+                # The index is built, so the symbol is genuinely unknown
+                self.negative_cache.set(token_symbol, True)
         except Exception as e:
-            logger.error(f"CoinGecko API error for {token_symbol}: {e}")
+            logger.error(f"Coin index lookup failed for {token_symbol}: {e}")
+            return None
         
-        return None
+        return coin_ids[0] if coin_ids else None
     
-    def extract_token_info(self, text: str) -> Dict[str, any]:
+    def _select_token(self, text: str) -> Tuple[Optional[str], Optional[float]]:
+        """Pick the token symbol (and amount, if stated) a giveaway text refers to"""
+        return select_token(text, self.stop_words)
+    
+    def extract_token_info(self, text: str) -> TokenInfo:
         """
         Extract token information from giveaway text
         
@@ -96,72 +236,30 @@ class PriceChecker:
             text: Giveaway tweet text
             
         Returns:
-            Dictionary with token_symbol, token_name, estimated_amount
+            TokenInfo with token_symbol, token_name, estimated_amount, token_price_usd
+            and estimated_value_usd (all None when no token is found)
         """
-        text_upper = text.upper()
-        
-        # Common crypto symbols pattern
-        symbol_pattern = r'\b([A-Z]{2,10})\b'
-        amount_pattern = r'(\d+(?:,\d+)*(?:\.\d+)?)\s*([A-Z]{2,10})'
-        
-        tokens_found = []
-        
-        # Look for amounts with token symbols
-        for match in re.finditer(amount_pattern, text_upper):
-            amount_str = match.group(1).replace(',', '')
-            symbol = match.group(2)
-            try:
-                amount = float(amount_str)
-                tokens_found.append({
-                    'symbol': symbol,
-                    'amount': amount
-                })
-            except ValueError:
-                pass
-        
-        # If we found tokens with amounts, return the first one
-        if tokens_found:
-            token = tokens_found[0]
-            price = self.get_token_price(token['symbol'])
+        symbol, amount = self._select_token(text)
+        
+        if symbol:
+            price = self.get_token_price(symbol)
             
-            return {
-                'token_symbol': token['symbol'],
-                'token_name': token['symbol'],
-                'estimated_amount': token['amount'],
-                'token_price_usd': price,
-                'estimated_value_usd': token['amount'] * price if price else None
-            }
-        
-        # Otherwise, just look for token symbols
-        known_tokens = ['BTC', 'ETH', 'BNB', 'SOL', 'ADA', 'XRP', 'DOGE', 
-                       'USDT', 'USDC', 'MATIC', 'DOT', 'AVAX', 'LINK', 
-                       'UNI', 'ATOM']
-        
-        for token in known_tokens:
-            if token in text_upper:
-                price = self.get_token_price(token)
-                return {
-                    'token_symbol': token,
-                    'token_name': token,
-                    'estimated_amount': None,
-                    'token_price_usd': price,
-                    'estimated_value_usd': None
-                }
-        
-        return {
-            'token_symbol': None,
-            'token_name': None,
-            'estimated_amount': None,
-            'token_price_usd': None,
-            'estimated_value_usd': None
-        }
+            return TokenInfo(
+                token_symbol=symbol,
+                token_name=symbol,
+                estimated_amount=amount,
+                token_price_usd=price,
+                estimated_value_usd=amount * price if price and amount is not None else None
+            )
+        
+        return TokenInfo()
     
-    def is_valuable_giveaway(self, token_info: Dict) -> bool:
+    def is_valuable_giveaway(self, token_info: Union[TokenInfo, Dict]) -> bool:
         """
         Check if giveaway meets minimum value requirements
         
         Args:
-            token_info: Token information dictionary
+            token_info: TokenInfo, or a dictionary with the same keys
             
         Returns:
             True if giveaway meets requirements
@@ -0,0 +1,175 @@
+"""
+Append-only token price history
+
+Every price fetched from CoinGecko is stored as a sample, so recent prices can
+be served locally after a restart and past giveaways can be valued without
+calling the API again.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import and_, func, select
+
+from models import PriceSample, SessionLocal
+
+
+class PricePoint(NamedTuple):
+    """One stored price"""
+    price_usd: float
+    fetched_at: datetime
+
+
+def record_prices(prices: Dict[str, float], coin_ids: Dict[str, str] = None,
+                  fetched_at: datetime = None, db=None) -> int:
+    """
+    Append fetched prices to the history
+
+    Args:
+        prices: Uppercase symbol -> price in USD
+        coin_ids: Symbol -> CoinGecko id the price was fetched for
+        fetched_at: Time of the fetch (default: now, UTC)
+        db: Database session (a new one is opened and committed if omitted)
+
+    Returns:
+        Number of samples written
+    """
+    if not prices:
+        return 0
+
+    fetched_at = fetched_at or datetime.utcnow()
+    coin_ids = coin_ids or {}
+    rows = [
+        {'token_symbol': symbol, 'coin_id': coin_ids.get(symbol), 'price_usd': price,
+         'fetched_at': fetched_at}
+        for symbol, price in prices.items()
+    ]
+
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        db.execute(PriceSample.__table__.insert(), rows)
+        if own_session:
+            db.commit()
+        return len(rows)
+    finally:
+        if own_session:
+            db.close()
+
+
+def latest_prices_query(symbols: Iterable[str], since: Optional[datetime] = None):
+    """Newest sample per symbol, optionally no older than `since`"""
+    newest = select(
+        PriceSample.token_symbol, func.max(PriceSample.fetched_at).label('fetched_at')
+    ).where(PriceSample.token_symbol.in_(list(symbols)))
+    if since is not None:
+        newest = newest.where(PriceSample.fetched_at >= since)
+    newest = newest.group_by(PriceSample.token_symbol).subquery()
+
+    return select(
+        PriceSample.token_symbol, PriceSample.price_usd, PriceSample.fetched_at
+    ).join(newest, and_(
+        PriceSample.token_symbol == newest.c.token_symbol,
+        PriceSample.fetched_at == newest.c.fetched_at,
+    ))
+
+
+def price_at_query(symbol: str, at: datetime, since: Optional[datetime] = None):
+    """Newest sample of a symbol taken at or before `at`"""
+    query = select(PriceSample.price_usd, PriceSample.fetched_at).where(
+        PriceSample.token_symbol == symbol, PriceSample.fetched_at <= at
+    )
+    if since is not None:
+        query = query.where(PriceSample.fetched_at >= since)
+    return query.order_by(PriceSample.fetched_at.desc()).limit(1)
+
+
+def price_series_query(symbol: str, start: datetime, end: datetime):
+    """All samples of a symbol in [start, end], oldest first"""
+    return select(PriceSample.price_usd, PriceSample.fetched_at).where(
+        PriceSample.token_symbol == symbol,
+        PriceSample.fetched_at >= start,
+        PriceSample.fetched_at <= end,
+    ).order_by(PriceSample.fetched_at)
+
+
+def latest_prices(symbols: Iterable[str], max_age: Optional[timedelta] = None,
+                  now: datetime = None, db=None) -> Dict[str, PricePoint]:
+    """
+    Get the newest stored price of each symbol
+
+    Args:
+        symbols: Uppercase token symbols
+        max_age: Ignore samples older than this (default: any age)
+        now: Reference time for max_age (default: now, UTC)
+        db: Database session (a new one is opened if omitted)
+
+    Returns:
+        Dictionary of symbol -> PricePoint, for the symbols with a sample
+    """
+    symbols = list(symbols)
+    if not symbols:
+        return {}
+    since = (now or datetime.utcnow()) - max_age if max_age is not None else None
+
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        return {
+            row.token_symbol: PricePoint(row.price_usd, row.fetched_at)
+            for row in db.execute(latest_prices_query(symbols, since))
+        }
+    finally:
+        if own_session:
+            db.close()
+
+
+def price_at(symbol: str, at: datetime, max_age: Optional[timedelta] = None,
+             db=None) -> Optional[PricePoint]:
+    """
+    Get the price of a symbol as it was at a given time
+
+    Args:
+        symbol: Uppercase token symbol
+        at: Point in time (UTC)
+        max_age: Ignore samples taken longer than this before `at`
+        db: Database session (a new one is opened if omitted)
+
+    Returns:
+        The newest sample taken at or before `at`, or None
+    """
+    since = at - max_age if max_age is not None else None
+
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        row = db.execute(price_at_query(symbol, at, since)).first()
+        return PricePoint(row.price_usd, row.fetched_at) if row else None
+    finally:
+        if own_session:
+            db.close()
+
+
+def price_series(symbol: str, start: datetime, end: datetime = None,
+                 db=None) -> List[PricePoint]:
+    """
+    Get every stored price of a symbol in a time range
+
+    Args:
+        symbol: Uppercase token symbol
+        start: Range start (UTC, inclusive)
+        end: Range end (UTC, inclusive; default: now)
+        db: Database session (a new one is opened if omitted)
+
+    Returns:
+        List of PricePoint, oldest first
+    """
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        return [
+            PricePoint(row.price_usd, row.fetched_at)
+            for row in db.execute(price_series_query(symbol, start, end or datetime.utcnow()))
+        ]
+    finally:
+        if own_session:
+            db.close()
@@ -0,0 +1,306 @@
+"""
+Price sources and the fallback chain PriceChecker looks prices up through
+
+The default chain is: in-memory cache -> price history -> CoinGecko -> fixture
+file. Each symbol is answered by the first source that knows it. A source is
+skipped while its circuit breaker is open, and sources with a timeout are
+abandoned when they run over it, so one slow upstream cannot stall a search
+pass.
+"""
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Set
+
+from cache import LRUCache
+from config import Config
+from metrics import metrics
+from price_history import PricePoint, latest_prices
+
+logger = logging.getLogger(__name__)
+
+
+class PriceSource:
+    """Somewhere USD prices can be looked up"""
+
+    name = 'source'
+    # Answered from memory: asked without a circuit breaker, timing or hit counter
+    in_memory = False
+
+    def __init__(self, timeout: Optional[float] = None):
+        """
+        Args:
+            timeout: Seconds before a lookup is abandoned (None waits for it)
+        """
+        self.timeout = timeout
+
+    def get_prices(self, symbols: List[str]) -> Dict[str, PricePoint]:
+        """
+        Look up prices
+
+        Args:
+            symbols: Uppercase token symbols
+
+        Returns:
+            Dictionary of symbol -> PricePoint for the symbols this source knows
+
+        Raises:
+            Exception: The source is unavailable (counts against its circuit breaker)
+        """
+        raise NotImplementedError
+
+    def store(self, prices: Dict[str, PricePoint]):
+        """Keep prices found further down the chain (only caches do)"""
+
+
+class MemoryCacheSource(PriceSource):
+    """Prices found earlier by this process"""
+
+    name = 'cache'
+    in_memory = True  # the cache keeps its own hit/miss stats
+
+    def __init__(self, cache: LRUCache, ttl: float):
+        """
+        Args:
+            cache: Cache of symbol -> PricePoint
+            ttl: Seconds a price stays valid after it was fetched
+        """
+        super().__init__()
+        self.cache = cache
+        self.ttl = ttl
+
+    def get_prices(self, symbols: List[str]) -> Dict[str, PricePoint]:
+        prices = {}
+        for symbol in symbols:
+            point = self.cache.get(symbol)
+            if point is not None:
+                prices[symbol] = point
+        return prices
+
+    def store(self, prices: Dict[str, PricePoint]):
+        now = datetime.utcnow()
+        for symbol, point in prices.items():
+            # Expire relative to when the price was fetched, not when it was cached
+            remaining = self.ttl - (now - point.fetched_at).total_seconds()
+            if remaining > 0:
+                self.cache.set(symbol, point, ttl=remaining)
+
+
+class PriceHistorySource(PriceSource):
+    """Recent samples in the price history, possibly fetched by an earlier run"""
+
+    name = 'history'
+
+    def __init__(self, max_age_seconds: float, timeout: Optional[float] = None):
+        super().__init__(timeout)
+        self.max_age = timedelta(seconds=max_age_seconds)
+
+    def get_prices(self, symbols: List[str]) -> Dict[str, PricePoint]:
+        return latest_prices(symbols, self.max_age)
+
+
+class CoinGeckoSource(PriceSource):
+    """Live prices from the CoinGecko API"""
+
+    name = 'coingecko'
+
+    def __init__(self, fetch: Callable[[List[str]], Dict[str, float]],
+                 timeout: Optional[float] = None):
+        """
+        Args:
+            fetch: Function returning symbol -> price for the symbols CoinGecko knows
+            timeout: Seconds before a lookup is abandoned
+        """
+        super().__init__(timeout)
+        self.fetch = fetch
+
+    def get_prices(self, symbols: List[str]) -> Dict[str, PricePoint]:
+        fetched_at = datetime.utcnow()
+        return {symbol: PricePoint(price, fetched_at) for symbol, price in self.fetch(symbols).items()}
+
+
+class FixturePriceSource(PriceSource):
+    """
+    Fixed prices from a JSON file of {"SYMBOL": price_usd}, for offline runs
+    and benchmarks
+    """
+
+    name = 'fixture'
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._prices: Optional[Dict[str, float]] = None
+
+    @property
+    def prices(self) -> Dict[str, float]:
+        if self._prices is None:
+            with open(self.path) as f:
+                self._prices = {symbol.upper(): float(price) for symbol, price in json.load(f).items()}
+        return self._prices
+
+    def get_prices(self, symbols: List[str]) -> Dict[str, PricePoint]:
+        now = datetime.utcnow()
+        return {symbol: PricePoint(self.prices[symbol], now)
+                for symbol in symbols if symbol in self.prices}
+
+
+class CircuitBreaker:
+    """
+    Stop calling a failing source for a while
+
+    After `failure_threshold` consecutive failures the breaker opens and the
+    source is skipped for `cooldown_seconds`; then one trial call is let
+    through, which closes the breaker again if it succeeds.
+    """
+
+    def __init__(self, failure_threshold: int, cooldown_seconds: float,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        """'closed', 'open' or 'half_open' (cooldown over, next call is a trial)"""
+        if self.opened_at is None:
+            return 'closed'
+        if self._clock() - self.opened_at < self.cooldown_seconds:
+            return 'open'
+        return 'half_open'
+
+    def allow(self) -> bool:
+        """Whether the source may be called now"""
+        with self._lock:
+            state = self.state
+            if state == 'half_open':
+                # Let one trial through; further calls wait for its outcome
+                self.opened_at = self._clock()
+                return True
+            return state == 'closed'
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = self._clock()
+
+
+class PriceSourceChain:
+    """Ordered price sources, each guarded by a circuit breaker"""
+
+    def __init__(self, sources: Sequence[PriceSource], failure_threshold: int = None,
+                 cooldown_seconds: float = None, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            sources: Sources in the order they are asked
+            failure_threshold: Consecutive failures that open a source's breaker
+                (default: PRICE_SOURCE_FAILURE_THRESHOLD)
+            cooldown_seconds: Seconds a breaker stays open (default: PRICE_SOURCE_COOLDOWN_SECONDS)
+            clock: Monotonic clock for the breakers
+        """
+        self.sources = list(sources)
+        self.breakers = {
+            source.name: CircuitBreaker(
+                failure_threshold or Config.PRICE_SOURCE_FAILURE_THRESHOLD,
+                cooldown_seconds if cooldown_seconds is not None else Config.PRICE_SOURCE_COOLDOWN_SECONDS,
+                clock,
+            )
+            for source in self.sources
+        }
+        # One executor per source that has a timeout: an abandoned lookup finishes in
+        # the background, tying up only its own source's threads
+        self._executors = {
+            source.name: ThreadPoolExecutor(max_workers=4,
+                                            thread_name_prefix=f'price-source-{source.name}')
+            for source in self.sources if source.timeout
+        }
+        # Symbols whose latest lookup found no price while a source was failing or skipped
+        self.unavailable: Set[str] = set()
+
+    def _call(self, source: PriceSource, symbols: List[str]) -> Dict[str, PricePoint]:
+        if not source.timeout:
+            return source.get_prices(symbols)
+        future = self._executors[source.name].submit(source.get_prices, symbols)
+        try:
+            return future.result(timeout=source.timeout)
+        except FutureTimeoutError:
+            future.cancel()  # still queued behind hung calls: never start it
+            raise TimeoutError(f"no answer within {source.timeout:g}s") from None
+
+    def get_prices(self, symbols: List[str]) -> Dict[str, PricePoint]:
+        """
+        Look prices up source by source until every symbol is found
+
+        Prices found by a later source are stored in the earlier ones that
+        keep them (the in-memory cache). Symbols left without a price while a
+        source failed or was skipped are kept in `unavailable` until a later
+        lookup settles them.
+
+        Args:
+            symbols: Uppercase token symbols
+
+        Returns:
+            Dictionary of symbol -> PricePoint for the symbols found
+        """
+        found = {}
+        remaining = list(symbols)
+        missed = False  # a source that might have known the remaining symbols did not answer
+
+        for index, source in enumerate(self.sources):
+            if not remaining:
+                break
+            if source.in_memory:
+                prices = source.get_prices(remaining)
+                if prices:
+                    found.update(prices)
+                    remaining = [symbol for symbol in remaining if symbol not in prices]
+                continue
+
+            breaker = self.breakers[source.name]
+            if not breaker.allow():
+                metrics.increment('price_source_skipped', source=source.name)
+                missed = True
+                continue
+
+            try:
+                with metrics.span('price_source', source=source.name):
+                    prices = self._call(source, remaining)
+            except Exception as e:
+                breaker.record_failure()
+                metrics.increment('price_source_errors', source=source.name)
+                logger.warning(f"Price source {source.name} failed "
+                               f"({breaker.state}) for {', '.join(remaining)}: {e}")
+                missed = True
+                continue
+            breaker.record_success()
+
+            prices = {symbol: prices[symbol] for symbol in remaining if symbol in prices}
+            if not prices:
+                continue
+            metrics.increment('price_source_hits', len(prices), source=source.name)
+            found.update(prices)
+            remaining = [symbol for symbol in remaining if symbol not in prices]
+            for earlier in self.sources[:index]:
+                earlier.store(prices)
+
+        self.unavailable.difference_update(symbols)
+        if missed:
+            self.unavailable.update(remaining)
+        return found
+
+    def states(self) -> Dict[str, str]:
+        """Circuit breaker state per source"""
+        return {name: breaker.state for name, breaker in self.breakers.items()}
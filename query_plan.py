@@ -0,0 +1,226 @@
+"""
+Utility script to audit the query plans of every query the bot issues
+
+Runs EXPLAIN QUERY PLAN (SQLite) for each query and flags full table scans.
+Exits with status 1 if an unexpected table scan is found.
+"""
+import re
+import sys
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple
+
+from sqlalchemy import func, select
+
+from giveaway_writer import inserted_giveaways_query
+from models import (
+    Account,
+    Base,
+    CoinSymbol,
+    Giveaway,
+    GiveawayDuplicate,
+    SessionLocal,
+    WinnerNotification,
+    get_engine,
+    init_db,
+)
+from pending_giveaways import PendingGiveaway, expired_giveaways_query, pending_page_query
+from price_history import latest_prices_query, price_at_query, price_series_query
+from stats_engine import (account_totals_query, giveaway_totals_query, recent_wins_query,
+                          token_count_query, token_summary_query, top_accounts_query)
+
+# "SCAN giveaways" without "USING ... INDEX" means every row is read
+TABLE_SCAN = re.compile(r'^SCAN (\w+)(?!.*USING)')
+
+
+class AuditedQuery(NamedTuple):
+    """A query issued by the bot"""
+    name: str
+    build: Callable  # session -> Query
+    allow_scan: bool = False  # full scan is inherent (e.g. bounded by LIMIT)
+
+
+def _week_ago() -> datetime:
+    return datetime.utcnow() - timedelta(days=7)
+
+
+AUDITED_QUERIES = [
+    # pending_giveaways.py
+    AuditedQuery('pending giveaways (first page)',
+                 lambda db: pending_page_query(db)),
+    AuditedQuery('pending giveaways (next page)',
+                 lambda db: pending_page_query(db, True, PendingGiveaway(
+                     10, '1', '1', '', 50.0, None))),
+    AuditedQuery('pending giveaways without value (next page)',
+                 lambda db: pending_page_query(db, False, PendingGiveaway(
+                     10, '1', '1', '', None, None))),
+    AuditedQuery('expired pending giveaways',
+                 lambda db: expired_giveaways_query(datetime.utcnow())),
+    AuditedQuery('expired pending giveaways (deadlines only)',
+                 lambda db: expired_giveaways_query(datetime.utcnow(), max_age_days=0)),
+    AuditedQuery('giveaway by id',
+                 lambda db: db.query(Giveaway).filter_by(id=1)),
+    # dedup.py
+    AuditedQuery('seen tweet ids',
+                 lambda db: db.query(Giveaway.tweet_id).filter(Giveaway.tweet_id.in_(['1', '2']))),
+    AuditedQuery('recent tweet ids',
+                 lambda db: db.query(Giveaway.tweet_id).order_by(Giveaway.id.desc()).limit(10),
+                 allow_scan=True),
+    AuditedQuery('seen duplicate tweet ids',
+                 lambda db: db.query(GiveawayDuplicate.tweet_id).filter(
+                     GiveawayDuplicate.tweet_id.in_(['1', '2']))),
+    # near_duplicates.py
+    AuditedQuery('recent giveaway fingerprints',
+                 lambda db: db.query(Giveaway.tweet_id, Giveaway.fingerprint, Giveaway.token_symbol).filter(
+                     Giveaway.fingerprint.isnot(None)
+                 ).order_by(Giveaway.id.desc()).limit(10),
+                 allow_scan=True),
+    AuditedQuery('stored fingerprints',
+                 lambda db: db.query(Giveaway.fingerprint, Giveaway.tweet_id).filter(
+                     Giveaway.fingerprint.in_([1, -2])
+                 ).order_by(Giveaway.id.desc())),
+    # account_manager.py
+    AuditedQuery('account by number',
+                 lambda db: db.query(Account).filter_by(account_number=1)),
+    AuditedQuery('active accounts',
+                 lambda db: db.query(Account).filter_by(is_active=True).limit(100)),
+    # winner_detector.py
+    AuditedQuery('winner notification dedup',
+                 lambda db: db.query(WinnerNotification.id).filter_by(
+                     account_number=1, content_hash='0' * 64)),
+    AuditedQuery('winner notification by source tweet',
+                 lambda db: db.query(WinnerNotification.id).filter_by(
+                     account_number=1, source_tweet_id='1')),
+    AuditedQuery('winning giveaway by author',
+                 lambda db: db.query(Giveaway).filter_by(
+                     author_id='1', participated=True
+                 ).order_by(Giveaway.created_at.desc()).limit(1)),
+    AuditedQuery('recent winner notifications',
+                 lambda db: db.query(WinnerNotification).filter(
+                     WinnerNotification.received_at >= _week_ago()
+                 ).order_by(WinnerNotification.received_at.desc())),
+    # stats_engine.py (stats.py and TwitterGiveawayBot.get_statistics)
+    # (rollup tables hold one row per day, so scanning them is expected)
+    AuditedQuery('giveaway totals',
+                 lambda db: giveaway_totals_query(_week_ago().date()), allow_scan=True),
+    AuditedQuery('account totals',
+                 lambda db: account_totals_query(), allow_scan=True),
+    AuditedQuery('top accounts',
+                 lambda db: top_accounts_query()),
+    AuditedQuery('recent wins',
+                 lambda db: recent_wins_query(_week_ago())),
+    AuditedQuery('token summary',
+                 lambda db: token_summary_query()),
+    AuditedQuery('token count',
+                 lambda db: token_count_query()),
+    # giveaway_writer.py (rows inserted by a flush, for the rollups)
+    AuditedQuery('inserted giveaways',
+                 lambda db: inserted_giveaways_query(['1', '2'])),
+    # coin_index.py
+    AuditedQuery('coin index lookup',
+                 lambda db: db.query(CoinSymbol.coin_id).filter_by(
+                     symbol='PEPE'
+                 ).order_by(CoinSymbol.rank)),
+    # price_history.py
+    AuditedQuery('latest stored prices',
+                 lambda db: latest_prices_query(['BTC', 'ETH'],
+                                                datetime.utcnow() - timedelta(minutes=5))),
+    AuditedQuery('stored price at time',
+                 lambda db: price_at_query('BTC', datetime.utcnow())),
+    AuditedQuery('stored price series',
+                 lambda db: price_series_query('BTC', _week_ago(), datetime.utcnow())),
+]
+
+
+def _statement(db, query):
+    """Get the SELECT statement for an ORM query, a Core select or a bound .count method"""
+    if hasattr(query, 'statement'):
+        return query.statement
+    if callable(query):
+        # Query.count wraps the query in SELECT count(*) FROM (...)
+        query = query.__self__
+        return select(func.count()).select_from(query.statement.subquery())
+    return query
+
+
+def explain(db, query) -> List[str]:
+    """
+    Get the SQLite query plan for a query
+
+    Args:
+        db: Database session
+        query: ORM query, Core select, or a bound Query.count method
+
+    Returns:
+        Plan lines (the "detail" column of EXPLAIN QUERY PLAN)
+    """
+    compiled = _statement(db, query).compile(
+        dialect=db.get_bind().dialect,
+        compile_kwargs={'render_postcompile': True}
+    )
+    params = []
+    for name in compiled.positiontup:
+        value = compiled.params[name]
+        if isinstance(value, datetime):
+            value = value.isoformat(' ')
+        elif isinstance(value, date):
+            value = value.isoformat()
+        params.append(value)
+
+    rows = db.connection().exec_driver_sql(
+        'EXPLAIN QUERY PLAN ' + compiled.string, tuple(params)
+    ).fetchall()
+    return [row[-1] for row in rows]
+
+
+def audit() -> Dict[str, List[str]]:
+    """
+    Explain every audited query
+
+    Returns:
+        Dictionary of query name -> plan lines
+    """
+    init_db()
+    db = SessionLocal()
+    try:
+        return {entry.name: explain(db, entry.build(db)) for entry in AUDITED_QUERIES}
+    finally:
+        db.close()
+
+
+def find_table_scans(plans: Dict[str, List[str]]) -> List[str]:
+    """Get names of queries that scan a table without an index and are not allowed to"""
+    allowed = {entry.name for entry in AUDITED_QUERIES if entry.allow_scan}
+    flagged = []
+    for name, lines in plans.items():
+        # Scans of materialized subqueries (e.g. "SCAN anon_1") are not table scans
+        scanned = {match.group(1) for match in map(TABLE_SCAN.match, lines) if match}
+        if name not in allowed and scanned & set(Base.metadata.tables):
+            flagged.append(name)
+    return flagged
+
+
+def print_report():
+    """Print the query plan of every audited query"""
+    dialect = get_engine().dialect.name
+    if dialect != 'sqlite':
+        print(f"Query plan audit only supports SQLite (database is {dialect})")
+        return 0
+
+    plans = audit()
+    flagged = find_table_scans(plans)
+
+    print("=" * 60)
+    print("Query Plan Audit")
+    print("=" * 60)
+    for name, lines in plans.items():
+        marker = "❌" if name in flagged else "✅"
+        print(f"{marker} {name}")
+        for line in lines:
+            print(f"    {line}")
+    print()
+    print(f"{len(flagged)} of {len(plans)} queries do a full table scan")
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(print_report())
@@ -0,0 +1,127 @@
+"""
+Slotted records passed through the search pipeline
+
+A search pass holds every tweet it returned, and each accepted giveaway its
+token information, until the pass is written. These records keep their fields
+in __slots__ instead of a per-instance dict, and can still be read like the
+dictionaries they replaced (record['text'], record.get('text'), 'text' in
+record), so code and tests written against dicts keep working.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Union
+
+
+class Record:
+    """Base for slotted records with dict-style field access"""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Record):
+            return type(other) is type(self) and self.to_dict() == other.to_dict()
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{type(self).__name__}({fields})'
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Field value, or `default` for an unknown field"""
+        if key not in self.__slots__:
+            return default
+        return getattr(self, key)
+
+    def keys(self) -> List[str]:
+        return list(self.__slots__)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dictionary of every field (for JSON and logging)"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]):
+        """
+        Build a record from a dictionary
+
+        Args:
+            data: Field values; unknown keys are ignored
+
+        Returns:
+            Record of this class
+        """
+        if isinstance(data, cls):
+            return data
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+
+class TweetCandidate(Record):
+    """One search result on its way through classification, pricing and storage"""
+
+    __slots__ = ('id', 'text', 'author_id', 'author_username', 'author_followers',
+                 'created_at', 'retweet_count', 'like_count',
+                 'matched_keywords', 'fingerprint', 'token_symbol')
+
+    def __init__(self, id: Union[int, str], text: str, author_id: Union[int, str, None] = None,
+                 author_username: Optional[str] = None, author_followers: int = 0,
+                 created_at: Optional[datetime] = None, retweet_count: int = 0, like_count: int = 0,
+                 matched_keywords: Optional[List[str]] = None, fingerprint: Optional[int] = None,
+                 token_symbol: Optional[str] = None):
+        """
+        Args:
+            id: Tweet id
+            text: Tweet text
+            author_id: Author's user id
+            author_username: Author's handle
+            author_followers: Author's follower count
+            created_at: When the tweet was posted
+            retweet_count: Retweets at search time
+            like_count: Likes at search time
+            matched_keywords: Search keyword sets the tweet matched
+            fingerprint: Near-duplicate fingerprint, once computed
+            token_symbol: Token the tweet gives away, once selected
+        """
+        self.id = id
+        self.text = text
+        self.author_id = author_id
+        self.author_username = author_username
+        self.author_followers = author_followers
+        self.created_at = created_at
+        self.retweet_count = retweet_count
+        self.like_count = like_count
+        self.matched_keywords = matched_keywords
+        self.fingerprint = fingerprint
+        self.token_symbol = token_symbol
+
+
+class TokenInfo(Record):
+    """Token a giveaway offers and its estimated value"""
+
+    __slots__ = ('token_symbol', 'token_name', 'estimated_amount', 'token_price_usd',
+                 'estimated_value_usd')
+
+    def __init__(self, token_symbol: Optional[str] = None, token_name: Optional[str] = None,
+                 estimated_amount: Optional[float] = None, token_price_usd: Optional[float] = None,
+                 estimated_value_usd: Optional[float] = None):
+        self.token_symbol = token_symbol
+        self.token_name = token_name
+        self.estimated_amount = estimated_amount
+        self.token_price_usd = token_price_usd
+        self.estimated_value_usd = estimated_value_usd
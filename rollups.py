@@ -0,0 +1,188 @@
+"""
+Daily rollup tables behind the statistics dashboard
+
+Counters are updated in the same transaction as the rows they count, so
+dashboards read one row per day (and token) instead of the full history.
+Run this module to rebuild the rollups from the raw tables.
+"""
+import logging
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import and_, case, func, literal, select
+
+from models import DailyStats, DailyTokenStats, Giveaway, SessionLocal, WinnerNotification, init_db
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = ('giveaways_found', 'participated', 'wins', 'winner_notifications')
+
+
+def _day(value: Optional[datetime]) -> date:
+    """Get the rollup day for a timestamp (rows not yet flushed count as today)"""
+    return (value or datetime.utcnow()).date()
+
+
+def _upsert(db, table, key: Dict, counts: Dict,
+            latest: Optional[Tuple[str, Dict]] = None):
+    """
+    Add to the counters of a rollup row, creating the row if it is missing
+
+    Args:
+        db: Database session (the caller commits)
+        table: Rollup table
+        key: Primary key column -> value
+        counts: Counter column -> amount to add
+        latest: Optional (id column, column -> value); the values replace the
+            stored ones if the id is newer than the stored id
+    """
+    id_column, latest_values = latest or (None, {})
+    values = {**key, **counts, **latest_values}
+
+    dialect = db.get_bind().dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        insert = None
+
+    if insert is not None:
+        stmt = insert(table).values(values)
+        new = stmt.excluded
+    else:
+        new = {column: literal(value, table.c[column].type) for column, value in values.items()}
+
+    update = {column: table.c[column] + new[column] for column in counts}
+    if id_column:
+        is_newer = new[id_column] > func.coalesce(table.c[id_column], 0)
+        for column in latest_values:
+            update[column] = case((is_newer, new[column]), else_=table.c[column])
+
+    if insert is not None:
+        db.execute(stmt.on_conflict_do_update(index_elements=list(key), set_=update))
+        return
+
+    # No portable upsert; update first and insert if no row matched
+    match = and_(*(table.c[column] == value for column, value in key.items()))
+    if not db.execute(table.update().where(match).values(update)).rowcount:
+        db.execute(table.insert().values(values))
+
+
+class _Rollup:
+    """Counters accumulated in memory before they are written"""
+
+    def __init__(self):
+        self.daily = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+        self.tokens = {}  # (day, symbol) -> giveaways, last_giveaway_id, last_price_usd
+
+    def add_giveaway(self, giveaway):
+        """Count a newly found giveaway"""
+        day = _day(giveaway.created_at)
+        self.daily[day]['giveaways_found'] += 1
+        if not giveaway.token_symbol:
+            return
+
+        token = self.tokens.setdefault((day, giveaway.token_symbol), {
+            'giveaways': 0, 'last_giveaway_id': None, 'last_price_usd': None
+        })
+        token['giveaways'] += 1
+        if token['last_giveaway_id'] is None or giveaway.id > token['last_giveaway_id']:
+            token['last_giveaway_id'] = giveaway.id
+            token['last_price_usd'] = giveaway.token_price_usd
+
+
+def record_giveaways(db, giveaways: Iterable):
+    """
+    Count newly inserted giveaways in the rollups
+
+    Args:
+        db: Database session the giveaways were inserted with (the caller commits)
+        giveaways: Rows with id, created_at, token_symbol and token_price_usd
+    """
+    rollup = _Rollup()
+    for giveaway in giveaways:
+        rollup.add_giveaway(giveaway)
+
+    for day, counts in rollup.daily.items():
+        _upsert(db, DailyStats.__table__, {'day': day},
+                {column: count for column, count in counts.items() if count})
+    for (day, symbol), token in rollup.tokens.items():
+        _upsert(db, DailyTokenStats.__table__, {'day': day, 'token_symbol': symbol},
+                {'giveaways': token['giveaways']},
+                latest=('last_giveaway_id', {
+                    'last_giveaway_id': token['last_giveaway_id'],
+                    'last_price_usd': token['last_price_usd'],
+                }))
+
+
+def record_participation(db, giveaway: Giveaway):
+    """Count a giveaway that was just marked as participated (the caller commits)"""
+    _upsert(db, DailyStats.__table__, {'day': _day(giveaway.created_at)}, {'participated': 1})
+
+
+def record_win(db, giveaway: Giveaway):
+    """Count a giveaway that was just marked as won (the caller commits)"""
+    _upsert(db, DailyStats.__table__, {'day': _day(giveaway.created_at)}, {'wins': 1})
+
+
+def record_winner_notification(db, received_at: datetime = None):
+    """Count a newly stored winner notification (the caller commits)"""
+    _upsert(db, DailyStats.__table__, {'day': _day(received_at)}, {'winner_notifications': 1})
+
+
+def rebuild_rollups(db=None) -> int:
+    """
+    Recompute all rollups from the giveaways and winner_notifications tables
+
+    Args:
+        db: Database session (a new one is opened if omitted)
+
+    Returns:
+        Number of days rolled up
+    """
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        rollup = _Rollup()
+        giveaways = db.execute(select(
+            Giveaway.id, Giveaway.created_at, Giveaway.token_symbol, Giveaway.token_price_usd,
+            Giveaway.participated, Giveaway.won
+        ).execution_options(yield_per=1000))
+        for row in giveaways:
+            rollup.add_giveaway(row)
+            counts = rollup.daily[_day(row.created_at)]
+            counts['participated'] += bool(row.participated)
+            counts['wins'] += bool(row.won)
+
+        notifications = db.execute(
+            select(WinnerNotification.received_at).execution_options(yield_per=1000)
+        )
+        for row in notifications:
+            rollup.daily[_day(row.received_at)]['winner_notifications'] += 1
+
+        db.query(DailyStats).delete()
+        db.query(DailyTokenStats).delete()
+        if rollup.daily:
+            db.execute(DailyStats.__table__.insert(), [
+                {'day': day, **counts} for day, counts in rollup.daily.items()
+            ])
+        if rollup.tokens:
+            db.execute(DailyTokenStats.__table__.insert(), [
+                {'day': day, 'token_symbol': symbol, **token}
+                for (day, symbol), token in rollup.tokens.items()
+            ])
+        db.commit()
+    finally:
+        if own_session:
+            db.close()
+
+    logger.info(f"Rebuilt rollups for {len(rollup.daily)} days and {len(rollup.tokens)} token-days")
+    return len(rollup.daily)
+
+
+if __name__ == "__main__":
+    init_db()
+    days = rebuild_rollups()
+    print(f"Rebuilt rollups for {days} days")
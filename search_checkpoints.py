@@ -0,0 +1,110 @@
+"""
+Per-query search checkpoints
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from config import Config
+from metrics import metrics
+from models import SearchCheckpoint, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class SearchCheckpoints:
+    """Newest processed tweet id per search query, persisted across restarts"""
+
+    def __init__(self, max_age_hours: int = None):
+        """
+        Args:
+            max_age_hours: Checkpoints older than this are ignored and the query
+                falls back to a full lookback window
+        """
+        self.max_age = timedelta(
+            hours=max_age_hours if max_age_hours is not None else Config.SEARCH_LOOKBACK_HOURS
+        )
+        self.checkpoints: Dict[str, Tuple[str, datetime]] = {}
+        self.pending: Dict[str, str] = {}
+        self.holds: Dict[str, str] = {}
+
+    def load(self) -> int:
+        """
+        Load stored checkpoints from the database
+
+        Returns:
+            Number of checkpoints loaded
+        """
+        db = SessionLocal()
+        try:
+            rows = db.query(SearchCheckpoint).all()
+            self.checkpoints = {
+                row.search_query: (row.newest_id, row.updated_at) for row in rows
+            }
+        finally:
+            db.close()
+        return len(self.checkpoints)
+
+    def since_id(self, query: str) -> Optional[str]:
+        """
+        Get the newest tweet id already processed for a query
+
+        Returns:
+            Tweet id, or None if there is no checkpoint recent enough to search from
+        """
+        checkpoint = self.checkpoints.get(query)
+        if checkpoint is None:
+            return None
+
+        newest_id, updated_at = checkpoint
+        if updated_at is None or datetime.utcnow() - updated_at > self.max_age:
+            return None
+        return newest_id
+
+    def advance(self, query: str, newest_id):
+        """Record the newest tweet id seen for a query (written by save())"""
+        newest_id = str(newest_id)
+        current = self.pending.get(query) or (self.checkpoints.get(query) or (None,))[0]
+        if current is None or int(newest_id) > int(current):
+            self.pending[query] = newest_id
+
+    def hold(self, query: str, tweet_id):
+        """Record a tweet the next save() must not move the query's checkpoint past"""
+        held_id = str(int(tweet_id) - 1)
+        current = self.holds.get(query)
+        if current is None or int(held_id) < int(current):
+            self.holds[query] = held_id
+
+    def save(self) -> int:
+        """
+        Persist checkpoints recorded since the last save
+
+        Call this only after the tweets up to the checkpoint have been processed.
+        A query with a held tweet is saved just below the oldest one, so the
+        next search returns it again.
+
+        Returns:
+            Number of checkpoints written
+        """
+        for query, held_id in self.holds.items():
+            if query in self.pending and int(held_id) < int(self.pending[query]):
+                self.pending[query] = held_id
+        self.holds = {}
+        if not self.pending:
+            return 0
+
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            for query, newest_id in self.pending.items():
+                db.merge(SearchCheckpoint(search_query=query, newest_id=newest_id, updated_at=now))
+            with metrics.span('db_commit', op='search_checkpoints'):
+                db.commit()
+        finally:
+            db.close()
+
+        for query, newest_id in self.pending.items():
+            self.checkpoints[query] = (newest_id, now)
+        saved, self.pending = len(self.pending), {}
+        logger.info(f"Saved search checkpoints for {saved} queries")
+        return saved
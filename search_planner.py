@@ -0,0 +1,103 @@
+"""
+Search query planner: packs keyword sets into as few search requests as possible
+"""
+import logging
+import re
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Query length limit of the recent search endpoint (1024 with Pro access)
+DEFAULT_MAX_QUERY_LENGTH = 512
+
+
+class PlannedQuery(NamedTuple):
+    """A search request and the keyword sets it covers"""
+    query: str
+    keywords: Tuple[str, ...]
+
+
+def render_query(keywords: Sequence[str], filters: str = '') -> str:
+    """
+    Build the query string for a group of keyword sets
+
+    A single keyword set is rendered as is; several are OR-combined, each in
+    parentheses so its terms stay ANDed together.
+
+    Args:
+        keywords: Keyword sets, e.g. ["crypto giveaway", "BTC giveaway"]
+        filters: Operators applied to every keyword set, e.g. "-is:retweet lang:en"
+
+    Returns:
+        Query string
+    """
+    if len(keywords) == 1:
+        terms = keywords[0]
+    else:
+        terms = '(' + ' OR '.join(f'({keyword})' for keyword in keywords) + ')'
+    return f'{terms} {filters}'.strip()
+
+
+def plan_queries(keywords: Sequence[str], filters: str = '',
+                 max_length: int = DEFAULT_MAX_QUERY_LENGTH) -> List[PlannedQuery]:
+    """
+    Pack keyword sets into as few queries as the query length limit allows
+
+    Args:
+        keywords: Keyword sets, in priority order
+        filters: Operators applied to every keyword set
+        max_length: Maximum query length
+
+    Returns:
+        List of PlannedQuery
+    """
+    plans = []
+    group = []
+
+    for keyword in keywords:
+        if group and len(render_query(group + [keyword], filters)) > max_length:
+            plans.append(PlannedQuery(render_query(group, filters), tuple(group)))
+            group = []
+        group.append(keyword)
+
+        if len(group) == 1 and len(render_query(group, filters)) > max_length:
+            logger.warning(f"Search keywords '{keyword}' exceed the {max_length} character query limit")
+
+    if group:
+        plans.append(PlannedQuery(render_query(group, filters), tuple(group)))
+
+    return plans
+
+
+def _keyword_pattern(keyword: str):
+    """Match all terms of a keyword set as whole words, in any order"""
+    lookaheads = ''.join(
+        rf'(?=.*(?<![\w]){re.escape(term)}(?![\w]))' for term in keyword.split()
+    )
+    return re.compile(lookaheads, re.IGNORECASE | re.DOTALL)
+
+
+class KeywordRouter:
+    """Attribute merged search results to the keyword sets that matched them"""
+
+    def __init__(self, keywords: Sequence[str]):
+        self.patterns: Dict[str, re.Pattern] = {
+            keyword: _keyword_pattern(keyword) for keyword in keywords
+        }
+
+    def match(self, text: str, keywords: Sequence[str] = None) -> List[str]:
+        """
+        Get the keyword sets a tweet matches
+
+        Args:
+            text: Tweet text
+            keywords: Keyword sets to check (defaults to all)
+
+        Returns:
+            Matching keyword sets, in the order given (empty if the search
+            matched on something other than the text, e.g. a link)
+        """
+        return [
+            keyword for keyword in (keywords or self.patterns)
+            if self.patterns[keyword].match(text)
+        ]
@@ -90,7 +90,7 @@ def check_database():
     """Check database configuration"""
     print("\n💾 Checking database configuration...")
     
-    from models import init_db, engine
+    from models import init_db
     
     try:
         init_db()
@@ -111,7 +111,6 @@ def check_dependencies():
         ('requests', 'requests'),
         ('python-dotenv', 'dotenv'),
         ('schedule', 'schedule'),
-        ('pycoingecko', 'pycoingecko'),
         ('sqlalchemy', 'sqlalchemy'),
     ]
     
@@ -0,0 +1,195 @@
+"""
+Aggregate statistics shared by stats.py and the bot
+"""
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, case, func, select
+
+from models import Account, DailyStats, DailyTokenStats, SessionLocal, WinnerNotification
+from price_history import latest_prices
+
+
+@dataclass
+class AccountSummary:
+    """Per-account totals"""
+    username: Optional[str]
+    total_wins: int
+    total_participations: int
+
+
+@dataclass
+class RecentWin:
+    """A winner notification with the account it was sent to"""
+    username: Optional[str]
+    received_at: datetime
+
+
+@dataclass
+class TokenSummary:
+    """Giveaway count and most recently seen price for a token"""
+    symbol: str
+    giveaways: int
+    last_price_usd: Optional[float]  # price when its latest giveaway was found
+    latest_price_usd: Optional[float] = None  # newest sample in the price history
+
+
+@dataclass
+class BotStatistics:
+    """Dashboard figures"""
+    total_giveaways: int = 0
+    participated: int = 0
+    wins: int = 0
+    total_accounts: int = 0
+    active_accounts: int = 0
+    recent_giveaways: int = 0
+    recent_participations: int = 0
+    recent_wins: int = 0
+    unique_tokens: int = 0
+    top_accounts: List[AccountSummary] = field(default_factory=list)
+    recent_win_list: List[RecentWin] = field(default_factory=list)
+    tokens: List[TokenSummary] = field(default_factory=list)
+
+    @property
+    def win_rate(self) -> float:
+        """Wins per participation, in percent"""
+        return self.wins / self.participated * 100 if self.participated > 0 else 0.0
+
+    def as_dict(self) -> Dict:
+        """Get the summary in the format returned by TwitterGiveawayBot.get_statistics"""
+        return {
+            'total_giveaways_found': self.total_giveaways,
+            'total_participations': self.participated,
+            'total_wins': self.wins,
+            'active_accounts': self.active_accounts,
+            'win_rate': f"{self.win_rate:.2f}%" if self.participated > 0 else "0%"
+        }
+
+
+def _sum(column):
+    return func.coalesce(func.sum(column), 0)
+
+
+def giveaway_totals_query(since: date):
+    """All giveaway counters in one aggregate over the daily rollup"""
+    recent = DailyStats.day >= since
+    return select(
+        _sum(DailyStats.giveaways_found).label('total'),
+        _sum(DailyStats.participated).label('participated'),
+        _sum(DailyStats.wins).label('wins'),
+        _sum(case((recent, DailyStats.giveaways_found), else_=0)).label('recent'),
+        _sum(case((recent, DailyStats.participated), else_=0)).label('recent_participated'),
+        _sum(case((recent, DailyStats.winner_notifications), else_=0)).label('recent_wins'),
+    )
+
+
+def account_totals_query():
+    """Account counters as scalar subqueries of one SELECT"""
+    return select(
+        select(func.count()).select_from(Account).scalar_subquery().label('total_accounts'),
+        select(func.count()).select_from(Account).where(Account.is_active == True)
+        .scalar_subquery().label('active_accounts'),
+    )
+
+
+def top_accounts_query(limit: int = 5):
+    """Accounts with the most wins"""
+    return select(
+        Account.username, Account.total_wins, Account.total_participations
+    ).order_by(Account.total_wins.desc()).limit(limit)
+
+
+def recent_wins_query(since: datetime, limit: int = 5):
+    """Latest winner notifications joined with their account"""
+    return select(
+        Account.username, WinnerNotification.received_at
+    ).select_from(WinnerNotification).outerjoin(
+        Account, Account.account_number == WinnerNotification.account_number
+    ).where(
+        WinnerNotification.received_at >= since
+    ).order_by(WinnerNotification.received_at.desc()).limit(limit)
+
+
+def token_summary_query(limit: int = 10):
+    """Giveaway count per token with the price from its latest giveaway"""
+    per_token = select(
+        DailyTokenStats.token_symbol,
+        func.sum(DailyTokenStats.giveaways).label('giveaways'),
+        func.max(DailyTokenStats.last_giveaway_id).label('latest_id'),
+    ).group_by(DailyTokenStats.token_symbol).subquery()
+
+    return select(
+        per_token.c.token_symbol, per_token.c.giveaways, DailyTokenStats.last_price_usd
+    ).join(DailyTokenStats, and_(
+        DailyTokenStats.token_symbol == per_token.c.token_symbol,
+        DailyTokenStats.last_giveaway_id == per_token.c.latest_id,
+    )).order_by(
+        per_token.c.giveaways.desc(), per_token.c.token_symbol
+    ).limit(limit)
+
+
+def token_count_query():
+    """Number of distinct tokens seen"""
+    return select(func.count(func.distinct(DailyTokenStats.token_symbol)))
+
+
+def collect_statistics(db=None, days: int = 7, detail: bool = True) -> BotStatistics:
+    """
+    Compute dashboard statistics from the rollup tables
+
+    Counters are read from rollups.py's daily tables, so the cost depends on
+    the number of days of history rather than the number of giveaways.
+
+    Args:
+        db: Database session (a new one is opened if omitted)
+        days: Size of the "recent activity" window, counted in whole UTC days
+        detail: Also load top accounts, recent wins and token summaries
+
+    Returns:
+        BotStatistics
+    """
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        since = datetime.utcnow() - timedelta(days=days)
+
+        totals = db.execute(giveaway_totals_query(since.date())).one()
+        accounts = db.execute(account_totals_query()).one()
+
+        stats = BotStatistics(
+            total_giveaways=totals.total,
+            participated=totals.participated,
+            wins=totals.wins,
+            total_accounts=accounts.total_accounts,
+            active_accounts=accounts.active_accounts,
+            recent_giveaways=totals.recent,
+            recent_participations=totals.recent_participated,
+            recent_wins=totals.recent_wins,
+        )
+
+        if detail:
+            stats.top_accounts = [
+                AccountSummary(row.username, row.total_wins, row.total_participations)
+                for row in db.execute(top_accounts_query())
+            ]
+            if stats.recent_wins:
+                stats.recent_win_list = [
+                    RecentWin(row.username, row.received_at)
+                    for row in db.execute(recent_wins_query(since))
+                ]
+            stats.unique_tokens = db.execute(token_count_query()).scalar()
+            stats.tokens = [
+                TokenSummary(row.token_symbol, row.giveaways, row.last_price_usd)
+                for row in db.execute(token_summary_query())
+            ]
+            # Value tokens at their last fetched price, without calling the API
+            latest = latest_prices([token.symbol for token in stats.tokens], db=db)
+            for token in stats.tokens:
+                if token.symbol in latest:
+                    token.latest_price_usd = latest[token.symbol].price_usd
+
+        return stats
+    finally:
+        if own_session:
+            db.close()
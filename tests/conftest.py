@@ -0,0 +1,26 @@
+"""
+Shared test fixtures
+"""
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+import models
+from models import Base, create_db_engine
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    """Point every module's SessionLocal at a fresh in-memory database"""
+    engine = create_db_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(models, 'engine', engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    """Open a session on a fresh in-memory database"""
+    session = session_factory()
+    yield session
+    session.close()
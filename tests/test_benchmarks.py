@@ -0,0 +1,51 @@
+"""
+Tests for the benchmark harness
+"""
+import itertools
+
+from benchmarks.corpus import generate_tweets
+from benchmarks.fakes import FakeSearchClient
+from benchmarks.run import compare
+
+
+def test_corpus_is_seeded():
+    """Test that the same seed gives the same corpus"""
+    first = list(generate_tweets(50, seed=7))
+    
+    assert first == list(generate_tweets(50, seed=7))
+    assert first != list(generate_tweets(50, seed=8))
+    assert [tweet['id'] for tweet in first] == sorted(tweet['id'] for tweet in first)
+
+
+def test_fake_search_pages_newer_than_since_id():
+    """Test that the fake search client pages newest first and stops at since_id"""
+    client = FakeSearchClient()
+    tweets = list(generate_tweets(250))
+    client.publish(tweets)
+    since_id = tweets[24]['id']
+    
+    ids = []
+    next_token = None
+    for _ in itertools.count():
+        response = client.search_recent_tweets("q", max_results=100, since_id=since_id,
+                                               next_token=next_token)
+        ids.extend(tweet.id for tweet in response.data)
+        next_token = response.meta.get('next_token')
+        if not next_token:
+            break
+    
+    assert ids == [tweet['id'] for tweet in reversed(tweets[25:])]
+    assert client.requests == 3
+
+
+def test_compare_flags_regressions():
+    """Test that slower or larger results are reported against the baseline"""
+    baseline = {'parse_rules': {'throughput': 1000.0, 'p99_ms': 1.0, 'peak_rss_mb': 50.0}}
+    
+    assert compare({'parse_rules': {'throughput': 900.0, 'p99_ms': 1.1, 'peak_rss_mb': 52.0}},
+                   baseline, tolerance=0.25) == []
+    regressions = compare(
+        {'parse_rules': {'throughput': 500.0, 'p99_ms': 3.0, 'peak_rss_mb': 80.0}},
+        baseline, tolerance=0.25
+    )
+    assert len(regressions) == 3
@@ -0,0 +1,59 @@
+"""
+Tests for cache module
+"""
+import pytest
+
+from cache import LRUCache
+
+
+class FakeClock:
+    """Manually advanced clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Create a controllable clock"""
+    return FakeClock()
+
+
+def test_get_and_set():
+    """Test basic storage and counters"""
+    cache = LRUCache(maxsize=10)
+    cache.set('BTC', 50000.0)
+    
+    assert cache.get('BTC') == 50000.0
+    assert cache.get('ETH') is None
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_ttl_expiry(clock):
+    """Test that entries expire after their TTL"""
+    cache = LRUCache(maxsize=10, ttl=60, clock=clock)
+    cache.set('BTC', 1.0)
+    cache.set('ETH', 2.0, ttl=300)
+    
+    clock.now = 61
+    assert cache.get('BTC') is None
+    assert 'BTC' not in cache
+    assert cache.get('ETH') == 2.0
+
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted"""
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')  # 'b' is now least recently used
+    cache.set('c', 3)
+    
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert 'c' in cache
+    assert cache.stats()['evictions'] == 1
@@ -0,0 +1,79 @@
+"""
+Tests for coin index module
+"""
+import threading
+import time
+
+import pytest
+
+from coin_index import CoinIndex, rank_coins
+from models import init_db
+
+COINS = [
+    {'id': 'pepe', 'symbol': 'pepe', 'name': 'Pepe'},
+    {'id': 'pepe-token-on-sol', 'symbol': 'pepe', 'name': 'Pepe (SOL)'},
+    {'id': 'bitcoin', 'symbol': 'btc', 'name': 'Bitcoin'},
+    {'id': 'bitcoin-wrapped-fake', 'symbol': 'btc', 'name': 'Fake'},
+]
+
+
+@pytest.fixture
+def index():
+    """Create an index backed by a static coin list"""
+    init_db()
+    calls = []
+    
+    def fetch():
+        calls.append(1)
+        return COINS
+    
+    coin_index = CoinIndex(fetch, pinned={'BTC': 'bitcoin'})
+    coin_index.calls = calls
+    return coin_index
+
+
+def test_rank_coins():
+    """Test ranking of coin ids per symbol"""
+    rows = rank_coins(COINS, pinned={'BTC': 'bitcoin'})
+    ranked = {(row['symbol'], row['rank']): row['coin_id'] for row in rows}
+    
+    assert ranked[('PEPE', 0)] == 'pepe'
+    assert ranked[('PEPE', 1)] == 'pepe-token-on-sol'
+    assert ranked[('BTC', 0)] == 'bitcoin'
+
+
+def test_lookup_builds_index_once(index):
+    """Test that lookups are served from the local index"""
+    assert index.refresh() == 4
+    assert index.lookup('pepe') == ['pepe', 'pepe-token-on-sol']
+    assert index.lookup('UNKNOWN') == []
+    assert len(index.calls) == 1
+    assert not index.is_stale()
+
+
+def test_concurrent_first_refresh_downloads_once(session_factory):
+    """Test that a lookup waiting on the first build reuses it instead of downloading again"""
+    started, release = threading.Event(), threading.Event()
+    calls = []
+    
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return COINS
+    
+    coin_index = CoinIndex(fetch)
+    background = threading.Thread(target=coin_index.refresh)
+    background.start()
+    started.wait(5)
+    
+    results = []
+    lookup = threading.Thread(target=lambda: results.append(coin_index.lookup('pepe')))
+    lookup.start()
+    time.sleep(0.05)  # let the lookup block on the running refresh
+    release.set()
+    background.join(5)
+    lookup.join(5)
+    
+    assert results == [['pepe', 'pepe-token-on-sol']]
+    assert len(calls) == 1
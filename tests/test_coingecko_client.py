@@ -0,0 +1,147 @@
+"""
+Tests for the CoinGecko client
+"""
+import threading
+import time
+
+import pytest
+
+from coingecko_client import PRO_API_URL, PUBLIC_API_URL, CoinGeckoClient
+from config import Config
+
+PRICES = {'bitcoin': 65000.0, 'ethereum': 3200.0, 'solana': 150.0, 'dogecoin': 0.15}
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class FakeSession:
+    """requests.Session stand-in that can hold requests open"""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.requests = []
+        self.release = threading.Event()
+        self.release.set()
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        with self.lock:
+            self.requests.append(params['ids'])
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            self.release.wait(5)
+            time.sleep(0.01)
+            if self.error:
+                raise self.error
+            return FakeResponse({coin_id: {'usd': PRICES[coin_id]}
+                                 for coin_id in params['ids'].split(',') if coin_id in PRICES})
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def session():
+    return FakeSession()
+
+
+@pytest.fixture
+def client(session):
+    client = CoinGeckoClient(api_key='', max_concurrency=2, batch_size=2, session=session)
+    yield client
+    client.close()
+
+
+def test_get_price_batches(client, session):
+    """Test that ids are split into batches and the results merged"""
+    data = client.get_price(ids='bitcoin,ethereum,solana,unknown-coin', vs_currencies='usd')
+    
+    assert data == {'bitcoin': {'usd': 65000.0}, 'ethereum': {'usd': 3200.0},
+                    'solana': {'usd': 150.0}}
+    assert sorted(session.requests) == ['bitcoin,ethereum', 'solana,unknown-coin']
+
+
+def test_concurrent_lookups_share_request(client, session):
+    """Test that a lookup for a coin already in flight joins that request"""
+    session.release.clear()
+    results = {}
+    first = threading.Thread(target=lambda: results.update(first=client.get_price('bitcoin')))
+    first.start()
+    while not session.requests:
+        time.sleep(0.001)
+    
+    second = threading.Thread(
+        target=lambda: results.update(second=client.get_price('bitcoin,ethereum'))
+    )
+    second.start()
+    while len(session.requests) < 2:
+        time.sleep(0.001)
+    session.release.set()
+    first.join(5)
+    second.join(5)
+    
+    assert session.requests == ['bitcoin', 'ethereum']
+    assert results['first'] == {'bitcoin': {'usd': 65000.0}}
+    assert results['second'] == {'bitcoin': {'usd': 65000.0}, 'ethereum': {'usd': 3200.0}}
+    
+    # Nothing stays in flight once answered
+    client.get_price('bitcoin')
+    assert session.requests == ['bitcoin', 'ethereum', 'bitcoin']
+
+
+def test_concurrency_bounded(session):
+    """Test that no more than max_concurrency requests run at once"""
+    client = CoinGeckoClient(api_key='', max_concurrency=2, batch_size=1, session=session)
+    try:
+        assert len(client.get_price(ids=','.join(PRICES))) == 4
+    finally:
+        client.close()
+    
+    assert len(session.requests) == 4
+    assert session.max_active == 2
+
+
+def test_errors_reach_every_waiter():
+    """Test that a failed request raises for its callers and is not reused"""
+    session = FakeSession(error=ConnectionError("down"))
+    client = CoinGeckoClient(api_key='', session=session)
+    try:
+        with pytest.raises(ConnectionError):
+            client.get_price('bitcoin')
+        session.error = None
+        assert client.get_price('bitcoin') == {'bitcoin': {'usd': 65000.0}}
+    finally:
+        client.close()
+
+
+def test_api_key_header(monkeypatch):
+    """Test that keys are sent with the matching header and placeholders ignored"""
+    demo = CoinGeckoClient(api_key='CG-demo')
+    assert demo.base_url == PUBLIC_API_URL
+    assert demo.session.headers['x-cg-demo-api-key'] == 'CG-demo'
+    
+    monkeypatch.setattr(Config, 'COINGECKO_PRO_API', True)
+    pro = CoinGeckoClient(api_key='CG-pro')
+    assert pro.base_url == PRO_API_URL
+    assert pro.session.headers['x-cg-pro-api-key'] == 'CG-pro'
+    
+    placeholder = CoinGeckoClient(api_key='your_coingecko_api_key')
+    assert placeholder.api_key is None
+    assert placeholder.base_url == PUBLIC_API_URL
+    for client in (demo, pro, placeholder):
+        client.close()
@@ -0,0 +1,57 @@
+"""
+Tests for duplicate detection module
+"""
+import uuid
+
+import pytest
+
+from dedup import SeenTweetFilter
+from models import Giveaway, GiveawayDuplicate, SessionLocal, init_db
+
+
+@pytest.fixture
+def stored_tweet_id():
+    """Store a giveaway and return its tweet id"""
+    init_db()
+    tweet_id = f"dedup-{uuid.uuid4().hex}"
+    db = SessionLocal()
+    db.add(Giveaway(
+        tweet_id=tweet_id,
+        author_id="1",
+        author_username="user",
+        tweet_text="Win 1 BTC"
+    ))
+    db.commit()
+    db.close()
+    return tweet_id
+
+
+def test_filter_new(stored_tweet_id):
+    """Test that stored ids are filtered with one lookup"""
+    seen = SeenTweetFilter(maxsize=10)
+    new_id = f"dedup-{uuid.uuid4().hex}"
+    
+    assert seen.filter_new([stored_tweet_id, new_id, new_id]) == {new_id}
+    
+    # The stored id is now answered from memory
+    assert stored_tweet_id in seen.seen
+    assert seen.filter_new([stored_tweet_id]) == set()
+
+
+def test_warm(stored_tweet_id):
+    """Test warming the filter from the database"""
+    seen = SeenTweetFilter(maxsize=1000)
+    assert seen.warm() >= 1
+    assert stored_tweet_id in seen.seen
+
+
+def test_linked_duplicates_are_seen():
+    """Test that reposts linked to a stored giveaway count as stored"""
+    init_db()
+    tweet_id = f"dedup-{uuid.uuid4().hex}"
+    db = SessionLocal()
+    db.add(GiveawayDuplicate(tweet_id=tweet_id, original_tweet_id="1", distance=0))
+    db.commit()
+    db.close()
+    
+    assert SeenTweetFilter(maxsize=10).filter_new([tweet_id]) == set()
@@ -1,9 +1,11 @@
 """
 Tests for giveaway parser module
 """
+from datetime import datetime, timedelta, timezone
+
 import pytest
 
-from giveaway_parser import GiveawayParser
+from giveaway_parser import GiveawayParser, resolve_deadline
 
 
 @pytest.fixture
@@ -95,3 +97,87 @@ def test_extract_mentioned_accounts(parser):
     assert 'user1' in mentions
     assert 'user2' in mentions
     assert len(mentions) == 2
+
+
+def test_analyze(parser):
+    """Test single-pass analysis of a giveaway tweet"""
+    text = "🎁 Win 2 ETH! ✅ Follow @Organizer ✅ RT ✅ Tag 3 friends. Ends on March 5"
+    result = parser.analyze(text)
+    
+    assert result['is_giveaway'] is True
+    assert result['rules'] == {'follow': True, 'retweet': True, 'like': False, 'comment': True}
+    assert result['mentions'] == ['Organizer']
+    assert result['deadline'] == 'march 5'
+    
+    # Individual helpers agree with the combined analysis
+    assert parser.parse_rules(text) == result['rules']
+    assert parser.extract_deadline(text) == 'march 5'
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("Ends in 24 hours", datetime(2024, 12, 21, 10, 0)),
+    ("Ends in 12h, RT to enter", datetime(2024, 12, 20, 22, 0)),
+    ("Winners in 3 days", datetime(2024, 12, 23, 10, 0)),
+    ("Runs for 2 weeks", datetime(2025, 1, 3, 10, 0)),
+    ("Ends on December 24", datetime(2024, 12, 24, 23, 59, 59)),
+    ("Deadline: 5th Jan", datetime(2025, 1, 5, 23, 59, 59)),
+    ("Closes dec. 22nd", datetime(2024, 12, 22, 23, 59, 59)),
+    ("Giveaway ends 5th mar.", datetime(2025, 3, 5, 23, 59, 59)),
+    ("Ends Sept 3", datetime(2025, 9, 3, 23, 59, 59)),
+    ("Ends dec 19", datetime(2024, 12, 19, 23, 59, 59)),
+    ("Until 29 feb", None),
+    ("Ends tomorrow!", datetime(2024, 12, 21, 23, 59, 59)),
+    ("Ends 2 march", datetime(2025, 3, 2, 23, 59, 59)),
+    ("Until Feb 30", None),
+    ("Win 2 ETH, follow and RT", None),
+])
+def test_parse_deadline(parser, text, expected):
+    """Test resolving relative and absolute deadlines against the posting time"""
+    assert parser.parse_deadline(text, datetime(2024, 12, 20, 10, 0)) == expected
+
+
+def test_resolve_deadline_near_year_end():
+    """Test that dates already past at posting time roll over to the next year"""
+    posted_at = datetime(2024, 12, 31, 18, 0)
+    
+    assert resolve_deadline('jan 2', posted_at) == datetime(2025, 1, 2, 23, 59, 59)
+    assert resolve_deadline('dec 29', posted_at) == datetime(2025, 12, 29, 23, 59, 59)
+    assert resolve_deadline('dec 31', posted_at) == datetime(2024, 12, 31, 23, 59, 59)
+    # Just after midnight UTC, the previous day is still "today" somewhere
+    assert resolve_deadline('dec 31', datetime(2025, 1, 1, 0, 30)) == datetime(2024, 12, 31, 23, 59, 59)
+
+
+def test_resolve_deadline_aware_posting_time():
+    """Test that aware posting times (as tweepy returns them) give naive UTC"""
+    posted_at = datetime(2024, 1, 1, 12, 0, tzinfo=timezone(timedelta(hours=2)))
+    
+    assert resolve_deadline('2 hours', posted_at) == datetime(2024, 1, 1, 12, 0)
+
+
+def test_classify_batch(parser):
+    """Test bulk classification into columns"""
+    tweets = [
+        {'id': 1, 'text': "Win 2 ETH! Follow @org and RT"},
+        {'id': 2, 'text': "Just bought some BTC"},
+        "100 WINNERS get 50 SOL each, like and comment",
+    ]
+    batch = parser.classify_batch(tweets)
+    
+    assert len(batch) == 3
+    assert batch.where('is_giveaway') == [0, 2]
+    assert batch.where('is_giveaway', 'follow') == [0]
+    assert batch.token_symbol == ['ETH', 'BTC', 'SOL']
+    assert batch.token_amount[2] == 50.0
+    assert batch.row(0)['retweet'] is True
+    assert batch.ids == [1, 2, None]
+
+
+def test_classify_batch_process_pool(parser, monkeypatch):
+    """Test that large batches give the same result through the process pool"""
+    monkeypatch.setattr('config.Config.CLASSIFY_POOL_THRESHOLD', 10)
+    texts = [f"Crypto giveaway #{i}: win {i} ETH, follow @org{i}" for i in range(20)]
+    
+    pooled = parser.classify_batch(texts, workers=2)
+    
+    assert pooled.where('is_giveaway', 'follow') == list(range(20))
+    assert pooled.token_amount == [float(i) for i in range(20)]
@@ -0,0 +1,117 @@
+"""
+Tests for giveaway writer module
+"""
+import uuid
+
+import pytest
+
+from giveaway_writer import GiveawayWriter
+from models import (DailyStats, Giveaway, GiveawayDuplicate, SessionLocal, init_db,
+                    insert_ignoring_conflicts)
+from near_duplicates import from_signed
+
+
+def make_tweet(tweet_id):
+    """Build tweet data as search_giveaways does"""
+    return {
+        'id': tweet_id,
+        'text': "Win 1 ETH!",
+        'author_id': 42,
+        'author_username': 'organizer',
+    }
+
+
+@pytest.fixture
+def writer():
+    """Create a writer that records flushed ids"""
+    init_db()
+    flushed = []
+    giveaway_writer = GiveawayWriter(batch_size=3, on_flush=flushed.extend)
+    giveaway_writer.flushed = flushed
+    return giveaway_writer
+
+
+def test_flush_writes_batch(writer):
+    """Test that buffered rows are written together"""
+    ids = [f"writer-{uuid.uuid4().hex}" for _ in range(2)]
+    for tweet_id in ids:
+        writer.add(make_tweet(tweet_id), {'token_symbol': 'ETH', 'token_price_usd': 3000.0})
+    
+    assert len(writer) == 2
+    assert writer.flush() == 2
+    assert writer.flushed == ids
+    
+    db = SessionLocal()
+    saved = db.query(Giveaway).filter(Giveaway.tweet_id.in_(ids)).all()
+    db.close()
+    assert len(saved) == 2
+    assert all(giveaway.participated is False for giveaway in saved)
+
+
+def test_conflicts_are_skipped(writer):
+    """Test that already stored tweet ids are ignored"""
+    tweet_id = f"writer-{uuid.uuid4().hex}"
+    writer.add(make_tweet(tweet_id), {})
+    writer.flush()
+    
+    writer.add(make_tweet(tweet_id), {})
+    writer.add(make_tweet(f"writer-{uuid.uuid4().hex}"), {})
+    assert writer.flush() == 1
+
+
+def test_auto_flush_at_batch_size(writer):
+    """Test that a full batch is flushed automatically"""
+    for _ in range(3):
+        writer.add(make_tweet(f"writer-{uuid.uuid4().hex}"), {})
+    
+    assert len(writer) == 0
+    assert len(writer.flushed) == 3
+
+
+def test_flush_links_duplicates(writer):
+    """Test that reposts are written to giveaway_duplicates with their original"""
+    original, repost = (f"writer-{uuid.uuid4().hex}" for _ in range(2))
+    writer.add(make_tweet(original), {'token_symbol': 'ETH'}, fingerprint=(1 << 63) + 5)
+    writer.add_duplicate(make_tweet(repost), original, 2)
+    
+    assert writer.flush() == 1
+    assert writer.flushed == [original, repost]
+    
+    db = SessionLocal()
+    stored = db.query(Giveaway).filter_by(tweet_id=original).one()
+    duplicate = db.query(GiveawayDuplicate).filter_by(tweet_id=repost).one()
+    db.close()
+    assert from_signed(stored.fingerprint) == (1 << 63) + 5
+    assert (duplicate.original_tweet_id, duplicate.distance) == (original, 2)
+
+
+def test_rollups_count_only_inserted_rows(session_factory):
+    """Test that rows stored by someone else are not counted again by a flush"""
+    db = session_factory()
+    db.add(Giveaway(tweet_id='stored', author_id='1', author_username='other', tweet_text='x'))
+    db.commit()
+    
+    writer = GiveawayWriter()
+    for tweet_id in ('stored', 'new-1', 'new-2'):
+        writer.add(make_tweet(tweet_id), {'token_symbol': 'ETH', 'token_price_usd': 3000.0})
+    assert writer.flush() == 2
+    
+    assert db.query(DailyStats.giveaways_found).scalar() == 2
+    db.close()
+
+
+@pytest.mark.parametrize('executemany_returning', [True, False])
+def test_insert_ignoring_conflicts_returns_inserted_keys(session_factory, monkeypatch,
+                                                         executemany_returning):
+    """Test that return_keys lists only the rows that were not already stored"""
+    rows = [{'tweet_id': tweet_id, 'author_id': '1', 'author_username': 'a', 'tweet_text': 'x'}
+            for tweet_id in ('a', 'b')]
+    db = session_factory()
+    # False takes the one-statement-per-row path used without RETURNING
+    monkeypatch.setattr(db.get_bind().dialect, 'insert_executemany_returning',
+                        executemany_returning)
+    assert insert_ignoring_conflicts(db, Giveaway.__table__, rows[:1], ['tweet_id']) == 1
+    
+    keys = insert_ignoring_conflicts(db, Giveaway.__table__, rows, ['tweet_id'], return_keys=True)
+    db.close()
+    assert keys == [('b',)]
@@ -0,0 +1,142 @@
+"""
+Tests for metrics collection and export
+"""
+import json
+import urllib.request
+from types import SimpleNamespace
+
+import pytest
+
+import bot as bot_module
+from bot import TwitterGiveawayBot
+from cache import LRUCache
+from metrics import MetricsRegistry, metrics
+
+
+class FakeClock:
+    """Clock advanced by hand"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_span_records_duration():
+    """Test that spans aggregate count, total and max per label set"""
+    clock = FakeClock()
+    registry = MetricsRegistry(clock=clock)
+    
+    for seconds in (0.5, 1.5):
+        with registry.span('phase', phase='search'):
+            clock.now += seconds
+    
+    timing = registry.snapshot()['timings']['phase{phase="search"}']
+    assert timing['count'] == 2
+    assert timing['total_seconds'] == 2.0
+    assert timing['max_seconds'] == 1.5
+    assert timing['last_seconds'] == 1.5
+
+
+def test_span_recorded_on_error():
+    """Test that a span is recorded when its block raises"""
+    registry = MetricsRegistry()
+    with pytest.raises(ValueError):
+        with registry.span('db_commit', op='giveaways'):
+            raise ValueError("boom")
+    
+    assert registry.snapshot()['timings']['db_commit{op="giveaways"}']['count'] == 1
+
+
+def test_counters_and_collectors():
+    """Test counters per label set and gauges read from collectors"""
+    registry = MetricsRegistry()
+    registry.increment('api_calls', api='twitter_search')
+    registry.increment('api_calls', api='twitter_search')
+    registry.increment('rows_written', 25, table='giveaways')
+    
+    cache = LRUCache(maxsize=10)
+    cache.set('BTC', 65000.0)
+    cache.get('BTC')
+    cache.get('ETH')
+    registry.register_collector('price_cache', cache.stats)
+    
+    snapshot = registry.snapshot()
+    assert snapshot['counters'] == {
+        'api_calls{api="twitter_search"}': 2,
+        'rows_written{table="giveaways"}': 25,
+    }
+    assert snapshot['gauges']['price_cache_hits'] == 1
+    assert snapshot['gauges']['price_cache_misses'] == 1
+    
+    registry.reset()
+    assert registry.snapshot()['counters'] == {}
+    assert 'price_cache_size' in registry.snapshot()['gauges']
+
+
+def test_render_prometheus():
+    """Test the Prometheus text format"""
+    registry = MetricsRegistry()
+    registry.increment('api_calls', api='coingecko_price')
+    registry.observe('price_lookup', 0.25)
+    registry.register_collector('seen_tweets_cache', lambda: {'size': 3})
+    
+    text = registry.render_prometheus()
+    assert '# TYPE giveaway_bot_api_calls_total counter' in text
+    assert 'giveaway_bot_api_calls_total{api="coingecko_price"} 1' in text
+    assert 'giveaway_bot_price_lookup_seconds_count 1' in text
+    assert 'giveaway_bot_price_lookup_seconds_sum 0.250000' in text
+    assert 'giveaway_bot_seen_tweets_cache_size 3' in text
+
+
+def test_write_json(tmp_path):
+    """Test that the snapshot is written as JSON"""
+    registry = MetricsRegistry()
+    registry.increment('cycles', status='ok')
+    path = tmp_path / 'metrics.json'
+    
+    registry.write_json(str(path))
+    
+    data = json.loads(path.read_text())
+    assert data['counters'] == {'cycles{status="ok"}': 1}
+    assert not (tmp_path / 'metrics.json.tmp').exists()
+
+
+def test_http_server():
+    """Test the /metrics and /metrics.json endpoints"""
+    registry = MetricsRegistry()
+    registry.increment('participations')
+    server = registry.start_http_server(0)
+    # Only reachable from this machine unless a host is given
+    assert server.server_address[0] == '127.0.0.1'
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    try:
+        with urllib.request.urlopen(f'{base}/metrics') as response:
+            assert 'giveaway_bot_participations_total 1' in response.read().decode()
+        with urllib.request.urlopen(f'{base}/metrics.json') as response:
+            assert json.load(response)['counters'] == {'participations': 1}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_run_cycle_records_phases(tmp_path, monkeypatch):
+    """Test that run_cycle times each phase and writes the snapshot"""
+    path = tmp_path / 'metrics.json'
+    monkeypatch.setattr(bot_module.Config, 'METRICS_JSON_PATH', str(path))
+    fake_bot = SimpleNamespace(
+        search_giveaways=lambda: None,
+        participate_in_giveaways=lambda: None,
+        check_winners=lambda: None,
+    )
+    fake_bot._export_metrics = lambda: TwitterGiveawayBot._export_metrics(fake_bot)
+    metrics.reset()
+    
+    TwitterGiveawayBot.run_cycle(fake_bot)
+    
+    data = json.loads(path.read_text())
+    assert data['timings']['cycle']['count'] == 1
+    for phase in ('search', 'participate', 'winners'):
+        assert data['timings'][f'phase{{phase="{phase}"}}']['count'] == 1
+    assert data['counters']['cycles{status="ok"}'] == 1
@@ -117,3 +117,32 @@ def test_account_unique_number(db_session):
     
     with pytest.raises(Exception):
         db_session.commit()
+
+
+def test_sqlite_engine_profile(tmp_path):
+    """Test that SQLite connections get the production pragmas"""
+    from sqlalchemy import text
+    
+    from models import create_db_engine
+    
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == 'wal'
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+        assert conn.execute(text("PRAGMA cache_size")).scalar() < 0  # sized in KiB
+    engine.dispose()
+
+
+def test_in_memory_engine_shares_database():
+    """Test that an in-memory engine keeps one database across sessions"""
+    from sqlalchemy import text
+    
+    from models import create_db_engine
+    
+    engine = create_db_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 0
+    engine.dispose()
@@ -0,0 +1,124 @@
+"""
+Tests for near-duplicate detection
+"""
+import pytest
+
+import giveaway_writer
+from giveaway_writer import GiveawayWriter
+from models import Giveaway
+from near_duplicates import (NearDuplicateIndex, fingerprint, from_signed, hamming_distance,
+                             to_signed)
+
+ORIGINAL = "🎁 GIVEAWAY! Win 100 $SOL! Follow @solproject, RT and like to enter. Ends in 48 hours"
+
+
+@pytest.mark.parametrize('repost', [
+    f"RT @someone: {ORIGINAL}",
+    f"{ORIGINAL} https://t.co/abc123",
+    ORIGINAL.upper().replace('🎁 ', ''),
+])
+def test_reposts_share_fingerprint(repost):
+    """Test that links, retweet prefixes, case and emoji do not change the fingerprint"""
+    assert fingerprint(repost) == fingerprint(ORIGINAL)
+
+
+def test_edited_repost_is_near_duplicate():
+    """Test that a repost with a few extra words is found within the distance"""
+    index = NearDuplicateIndex(max_distance=5)
+    index.add('1', fingerprint(ORIGINAL), 'SOL')
+    
+    match = index.find(fingerprint(f"{ORIGINAL} 🔥 #crypto"), 'SOL')
+    
+    assert match is not None and match.tweet_id == '1'
+    assert 0 < match.distance <= 5
+
+
+@pytest.mark.parametrize('other, symbol', [
+    (ORIGINAL.replace('@solproject', '@otherproject'), 'SOL'),  # different organizer
+    (ORIGINAL.replace('100', '5'), 'SOL'),                      # different amount
+    (ORIGINAL, 'ETH'),                                          # different token
+])
+def test_different_giveaways_not_merged(other, symbol):
+    """Test that templated giveaways differing in identity are never linked"""
+    index = NearDuplicateIndex(max_distance=9)
+    index.add('1', fingerprint(ORIGINAL), 'SOL')
+    
+    assert index.find(fingerprint(other), symbol) is None
+
+
+def test_find_skips_own_tweet():
+    """Test that a tweet is not reported as a duplicate of itself"""
+    index = NearDuplicateIndex()
+    index.add('1', fingerprint(ORIGINAL), 'SOL')
+    
+    assert index.find(fingerprint(ORIGINAL), 'SOL', tweet_id='1') is None
+
+
+def test_index_evicts_oldest():
+    """Test that the index stays bounded and forgets the oldest fingerprints"""
+    index = NearDuplicateIndex(maxsize=2)
+    texts = [ORIGINAL.replace('@solproject', f'@project{i}') for i in range(3)]
+    for i, text in enumerate(texts):
+        index.add(str(i), fingerprint(text), 'SOL')
+    
+    assert len(index) == 2
+    assert index.find(fingerprint(texts[0]), 'SOL') is None
+    assert index.find(fingerprint(texts[2]), 'SOL').tweet_id == '2'
+
+
+def test_signed_round_trip():
+    """Test that fingerprints survive a signed 64-bit column"""
+    value = fingerprint(ORIGINAL) | (1 << 63)
+    
+    assert -(1 << 63) <= to_signed(value) < 0
+    assert from_signed(to_signed(value)) == value
+    assert hamming_distance(0b1011, 0b0001) == 2
+
+
+def test_warm_and_find_stored(session_factory):
+    """Test loading stored fingerprints and exact lookups in the database"""
+    db = session_factory()
+    db.add(Giveaway(tweet_id='100', author_id='1', author_username='user', tweet_text=ORIGINAL,
+                    token_symbol='SOL', fingerprint=to_signed(fingerprint(ORIGINAL))))
+    db.commit()
+    db.close()
+    
+    index = NearDuplicateIndex(maxsize=10)
+    assert index.warm() == 1
+    assert index.find(fingerprint(f"RT @x: {ORIGINAL}"), 'SOL').tweet_id == '100'
+    
+    other = fingerprint("Win 1 BTC")
+    assert index.find_stored([fingerprint(ORIGINAL), other]) == {fingerprint(ORIGINAL): '100'}
+
+
+def test_pending_entries_follow_the_write(session_factory, monkeypatch):
+    """Test that a giveaway whose batch rolls back is dropped from the index"""
+    index = NearDuplicateIndex(maxsize=10)
+    writer = GiveawayWriter(
+        on_insert=lambda rows: [index.add(row['tweet_id'], from_signed(row['fingerprint']),
+                                          row['token_symbol']) for row in rows],
+        on_failure=lambda rows: index.discard_pending(row['tweet_id'] for row in rows),
+    )
+    tweet = {'id': 1, 'text': ORIGINAL, 'author_id': 2, 'author_username': 'org'}
+    repost = fingerprint(f"RT @x: {ORIGINAL}")
+    
+    # Queued: found by later copies in the same batch
+    index.add('1', fingerprint(ORIGINAL), 'SOL', pending=True)
+    writer.add(tweet, {'token_symbol': 'SOL'}, fingerprint=fingerprint(ORIGINAL))
+    assert index.find(repost, 'SOL').tweet_id == '1'
+    
+    def fail(*args, **kwargs):
+        raise RuntimeError("disk I/O error")
+    
+    with monkeypatch.context() as patch:
+        patch.setattr(giveaway_writer, 'insert_ignoring_conflicts', fail)
+        assert writer.flush() == 0
+    assert index.find(repost, 'SOL') is None
+    assert len(index) == 0
+    
+    # Stored: kept, and no longer dropped by a later failure
+    index.add('1', fingerprint(ORIGINAL), 'SOL', pending=True)
+    writer.add(tweet, {'token_symbol': 'SOL'}, fingerprint=fingerprint(ORIGINAL))
+    assert writer.flush() == 1
+    index.discard_pending(['1'])
+    assert index.find(repost, 'SOL').tweet_id == '1'
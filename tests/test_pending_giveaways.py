@@ -0,0 +1,87 @@
+"""
+Tests for pending giveaway iteration
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import Giveaway
+from pending_giveaways import expire_giveaways, iter_pending_giveaways
+
+
+def add_giveaways(factory, values, participated=False):
+    """Insert one giveaway per estimated value and return their ids"""
+    db = factory()
+    giveaways = [
+        Giveaway(tweet_id=f"pending-{i}-{participated}", author_id="1", author_username="user",
+                 tweet_text="Win", estimated_value_usd=value, participated=participated)
+        for i, value in enumerate(values)
+    ]
+    db.add_all(giveaways)
+    db.commit()
+    ids = [giveaway.id for giveaway in giveaways]
+    db.close()
+    return ids
+
+
+@pytest.mark.parametrize('page_size', [1, 2, 3, 100])
+def test_priority_order_across_pages(session_factory, page_size):
+    """Test that every pending giveaway is yielded once, most valuable first"""
+    ids = add_giveaways(session_factory, [50.0, None, 200.0, 50.0, None, 10.0])
+    add_giveaways(session_factory, [1000.0], participated=True)
+    
+    pending = list(iter_pending_giveaways(page_size=page_size))
+    
+    # value desc, then newest first; unknown values last
+    assert [giveaway.id for giveaway in pending] == [
+        ids[2], ids[3], ids[0], ids[5], ids[4], ids[1]
+    ]
+    assert pending[0].tweet_text == "Win"
+
+
+def test_participating_during_iteration(session_factory):
+    """Test that marking yielded giveaways as participated does not skip any"""
+    ids = add_giveaways(session_factory, [float(value) for value in range(5)])
+    
+    seen = []
+    for giveaway in iter_pending_giveaways(page_size=2):
+        seen.append(giveaway.id)
+        db = session_factory()
+        db.query(Giveaway).filter_by(id=giveaway.id).update({'participated': True})
+        db.commit()
+        db.close()
+    
+    assert seen == list(reversed(ids))
+
+
+def test_expired_giveaways_leave_pending_set(session_factory):
+    """Test that the expiry sweep drops giveaways past their deadline or too old"""
+    now = datetime(2024, 6, 1, 12, 0)
+    db = session_factory()
+    giveaways = {
+        name: Giveaway(tweet_id=f"expiry-{name}", author_id="1", author_username="user",
+                       tweet_text="Win", estimated_value_usd=10.0, created_at=created_at,
+                       deadline=deadline, participated=participated)
+        for name, created_at, deadline, participated in [
+            ('ended', now - timedelta(days=2), now - timedelta(hours=1), False),
+            ('live', now - timedelta(days=2), now + timedelta(hours=1), False),
+            ('undated_old', now - timedelta(days=30), None, False),
+            ('undated_new', now - timedelta(days=1), None, False),
+            ('entered', now - timedelta(days=2), now - timedelta(hours=1), True),
+        ]
+    }
+    db.add_all(giveaways.values())
+    db.commit()
+    ids = {name: giveaway.id for name, giveaway in giveaways.items()}
+    db.close()
+    
+    assert expire_giveaways(now, max_age_days=14) == 2
+    assert expire_giveaways(now, max_age_days=14) == 0
+    
+    pending = {giveaway.id for giveaway in iter_pending_giveaways()}
+    assert pending == {ids['live'], ids['undated_new']}
+    
+    # Participated giveaways keep their status
+    db = session_factory()
+    assert db.get(Giveaway, ids['entered']).expired is False
+    db.close()
@@ -7,8 +7,8 @@ from price_checker import PriceChecker
 
 
 @pytest.fixture
-def checker():
-    """Create a price checker instance"""
+def checker(session_factory):
+    """Create a price checker instance with an empty price history"""
     return PriceChecker()
 
 
@@ -71,3 +71,70 @@ def test_cache_mechanism(checker):
     # Should be the same (from cache)
     if price1 is not None:
         assert price1 == price2
+
+
+class FakeCoinGecko:
+    """Stand-in for CoinGeckoClient that records requests"""
+    
+    def __init__(self, prices):
+        self.prices = prices
+        self.price_calls = []
+    
+    def get_price(self, ids, vs_currencies):
+        self.price_calls.append(ids)
+        return {coin_id: {'usd': self.prices[coin_id]}
+                for coin_id in ids.split(',') if coin_id in self.prices}
+    
+    def get_coins_list(self):
+        return []
+
+
+def test_get_token_prices_single_request(checker):
+    """Test that a pass' symbols are resolved in one request"""
+    checker.cg = FakeCoinGecko({'bitcoin': 50000.0, 'ethereum': 3000.0, 'solana': 150.0})
+    
+    prices = checker.get_token_prices(['BTC', 'ETH', 'SOL'])
+    
+    assert prices == {'BTC': 50000.0, 'ETH': 3000.0, 'SOL': 150.0}
+    assert len(checker.cg.price_calls) == 1
+    
+    # Subsequent lookups are served from cache
+    assert checker.extract_token_info("Win 2 ETH")['estimated_value_usd'] == 6000.0
+    assert len(checker.cg.price_calls) == 1
+
+
+def test_stop_words_skipped(checker):
+    """Test that count words are never treated as tickers"""
+    checker.cg = FakeCoinGecko({'ethereum': 3000.0})
+    
+    info = checker.extract_token_info("100 WINNERS get 2 ETH each, ends in 24 HOURS")
+    
+    assert info['token_symbol'] == 'ETH'
+    assert info['estimated_amount'] == 2.0
+    assert checker.get_token_price('WINNERS') is None
+    assert checker.cg.price_calls == ['ethereum']
+
+
+def test_negative_cache(checker):
+    """Test that symbols with no known coin are not looked up again"""
+    fake = FakeCoinGecko({})
+    checker.cg = fake
+    
+    assert checker.get_token_price('ZZQX') is None
+    assert checker.get_token_price('ZZQX') is None
+    
+    assert fake.price_calls == []
+    assert 'ZZQX' in checker.negative_cache
+
+
+def test_missing_price_not_negative_cached(checker):
+    """Test that a known coin missing from one response is asked for again"""
+    fake = FakeCoinGecko({})
+    checker.cg = fake
+    
+    assert checker.get_token_price('BTC') is None
+    assert 'BTC' not in checker.negative_cache
+    
+    fake.prices['bitcoin'] = 50000.0
+    assert checker.get_token_price('BTC') == 50000.0
+    assert len(fake.price_calls) == 2
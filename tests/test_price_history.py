@@ -0,0 +1,87 @@
+"""
+Tests for the price history store
+"""
+from datetime import datetime, timedelta
+
+from models import PriceSample
+from price_checker import PriceChecker
+from price_history import latest_prices, price_at, price_series, record_prices
+
+NOW = datetime(2024, 6, 1, 12, 0)
+
+
+def record_minutes_ago(prices, minutes):
+    record_prices(prices, fetched_at=NOW - timedelta(minutes=minutes))
+
+
+def test_latest_prices_within_max_age(session_factory):
+    """Test that the newest sample per symbol is returned, if recent enough"""
+    record_minutes_ago({'BTC': 60000.0, 'ETH': 3000.0}, 30)
+    record_minutes_ago({'BTC': 61000.0}, 10)
+    record_minutes_ago({'BTC': 62000.0}, 2)
+    
+    latest = latest_prices(['BTC', 'ETH', 'SOL'], now=NOW)
+    assert {symbol: point.price_usd for symbol, point in latest.items()} == \
+        {'BTC': 62000.0, 'ETH': 3000.0}
+    assert latest['BTC'].fetched_at == NOW - timedelta(minutes=2)
+    
+    recent = latest_prices(['BTC', 'ETH'], max_age=timedelta(minutes=5), now=NOW)
+    assert list(recent) == ['BTC']
+
+
+def test_price_at_and_series(session_factory):
+    """Test point-in-time and range reads"""
+    for minutes, price in [(30, 60000.0), (20, 61000.0), (10, 62000.0)]:
+        record_minutes_ago({'BTC': price}, minutes)
+    
+    assert price_at('BTC', NOW - timedelta(minutes=15)).price_usd == 61000.0
+    assert price_at('BTC', NOW - timedelta(minutes=45)) is None
+    assert price_at('BTC', NOW - timedelta(minutes=15), max_age=timedelta(minutes=2)) is None
+    
+    series = price_series('BTC', NOW - timedelta(minutes=25), NOW)
+    assert [point.price_usd for point in series] == [61000.0, 62000.0]
+
+
+class FakeCoinGecko:
+    """Stand-in for CoinGeckoClient that records requests"""
+    
+    def __init__(self, prices):
+        self.prices = prices
+        self.price_calls = []
+    
+    def get_price(self, ids, vs_currencies):
+        self.price_calls.append(ids)
+        return {coin_id: {'usd': self.prices[coin_id]} for coin_id in ids.split(',')
+                if coin_id in self.prices}
+    
+    def get_coins_list(self):
+        return []
+
+
+def test_price_checker_records_and_reuses_history(session_factory):
+    """Test that fetched prices are stored and served to a new checker without the API"""
+    checker = PriceChecker()
+    checker.cg = FakeCoinGecko({'bitcoin': 65000.0})
+    assert checker.get_token_price('BTC') == 65000.0
+    assert len(checker.cg.price_calls) == 1
+    
+    db = session_factory()
+    sample = db.query(PriceSample).one()
+    assert (sample.token_symbol, sample.coin_id, sample.price_usd) == ('BTC', 'bitcoin', 65000.0)
+    db.close()
+    
+    # A restarted bot finds the recent sample instead of calling CoinGecko
+    restarted = PriceChecker()
+    restarted.cg = FakeCoinGecko({'bitcoin': 70000.0})
+    assert restarted.get_token_price('BTC') == 65000.0
+    assert restarted.cg.price_calls == []
+
+
+def test_price_checker_ignores_stale_history(session_factory):
+    """Test that samples older than PRICE_HISTORY_MAX_AGE_SECONDS are refetched"""
+    record_prices({'BTC': 50000.0}, fetched_at=datetime.utcnow() - timedelta(hours=1))
+    
+    checker = PriceChecker()
+    checker.cg = FakeCoinGecko({'bitcoin': 65000.0})
+    assert checker.get_token_price('BTC') == 65000.0
+    assert checker.cg.price_calls == ['bitcoin']
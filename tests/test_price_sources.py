@@ -0,0 +1,168 @@
+"""
+Tests for price sources and the fallback chain
+"""
+import json
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from cache import LRUCache
+from config import Config
+from price_checker import PriceChecker
+from price_history import PricePoint
+from price_sources import (CircuitBreaker, FixturePriceSource, MemoryCacheSource, PriceSource,
+                           PriceSourceChain)
+
+
+class StaticSource(PriceSource):
+    """Source answering from a dictionary, or failing on demand"""
+
+    def __init__(self, name, prices, timeout=None):
+        super().__init__(timeout)
+        self.name = name
+        self.prices = prices
+        self.calls = []
+        self.error = None
+        self.block = None
+
+    def get_prices(self, symbols):
+        self.calls.append(list(symbols))
+        if self.block:
+            self.block.wait(5)
+        if self.error:
+            raise self.error
+        now = datetime.utcnow()
+        return {symbol: PricePoint(self.prices[symbol], now) for symbol in symbols
+                if symbol in self.prices}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_chain_falls_back_and_caches():
+    """Test that each symbol is answered by the first source knowing it"""
+    cache = MemoryCacheSource(LRUCache(maxsize=10), ttl=300)
+    primary = StaticSource('primary', {'BTC': 65000.0})
+    backup = StaticSource('backup', {'BTC': 1.0, 'ETH': 3200.0})
+    chain = PriceSourceChain([cache, primary, backup])
+    
+    prices = chain.get_prices(['BTC', 'ETH', 'MOONX'])
+    
+    assert {symbol: point.price_usd for symbol, point in prices.items()} == \
+        {'BTC': 65000.0, 'ETH': 3200.0}
+    assert backup.calls == [['ETH', 'MOONX']]
+    
+    # Found prices were stored in the cache
+    assert set(chain.get_prices(['BTC', 'ETH'])) == {'BTC', 'ETH'}
+    assert len(primary.calls) == 1
+
+
+def test_cache_expires_from_fetch_time():
+    """Test that cached prices expire relative to when they were fetched"""
+    cache = MemoryCacheSource(LRUCache(maxsize=10), ttl=300)
+    cache.store({
+        'OLD': PricePoint(1.0, datetime.utcnow() - timedelta(seconds=400)),
+        'NEW': PricePoint(2.0, datetime.utcnow() - timedelta(seconds=100)),
+    })
+    
+    assert list(cache.get_prices(['OLD', 'NEW'])) == ['NEW']
+
+
+def test_circuit_breaker_skips_failing_source():
+    """Test that a failing source is skipped until its cooldown ends"""
+    clock = FakeClock()
+    flaky = StaticSource('flaky', {'BTC': 65000.0})
+    flaky.error = ConnectionError("down")
+    backup = StaticSource('backup', {'BTC': 60000.0})
+    chain = PriceSourceChain([flaky, backup], failure_threshold=2, cooldown_seconds=60,
+                             clock=clock)
+    
+    for _ in range(3):
+        assert chain.get_prices(['BTC'])['BTC'].price_usd == 60000.0
+    assert len(flaky.calls) == 2
+    assert chain.states()['flaky'] == 'open'
+    
+    # After the cooldown one trial call goes through and closes the breaker
+    clock.now += 61
+    flaky.error = None
+    assert chain.get_prices(['BTC'])['BTC'].price_usd == 65000.0
+    assert chain.states()['flaky'] == 'closed'
+
+
+def test_breaker_reopens_after_failed_trial():
+    """Test that a failed trial call reopens the breaker for another cooldown"""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=10, clock=clock)
+    breaker.record_failure()
+    assert not breaker.allow()
+    
+    clock.now += 10
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial at a time
+    breaker.record_failure()
+    assert breaker.state == 'open'
+
+
+def test_slow_source_abandoned():
+    """Test that a source running over its timeout is skipped for the next one"""
+    slow = StaticSource('slow', {'BTC': 65000.0}, timeout=0.05)
+    slow.block = threading.Event()
+    backup = StaticSource('backup', {'BTC': 60000.0})
+    chain = PriceSourceChain([slow, backup], failure_threshold=1)
+    
+    assert chain.get_prices(['BTC'])['BTC'].price_usd == 60000.0
+    assert chain.states()['slow'] == 'open'
+    slow.block.set()
+
+
+def test_hung_source_does_not_block_others():
+    """Test that calls stuck in one source leave other timed sources free"""
+    hung = StaticSource('hung', {'BTC': 65000.0}, timeout=0.02)
+    hung.block = threading.Event()
+    fast = StaticSource('fast', {'BTC': 60000.0}, timeout=1.0)
+    chain = PriceSourceChain([hung, fast], failure_threshold=100)
+    
+    try:
+        # More hung calls than a source has threads
+        for _ in range(6):
+            assert chain.get_prices(['BTC'])['BTC'].price_usd == 60000.0
+    finally:
+        hung.block.set()
+
+
+def test_fixture_source(tmp_path):
+    """Test prices read from a fixture file"""
+    path = tmp_path / 'prices.json'
+    path.write_text(json.dumps({'btc': 65000, 'ETH': 3200.5}))
+    
+    prices = FixturePriceSource(str(path)).get_prices(['BTC', 'ETH', 'SOL'])
+    
+    assert {symbol: point.price_usd for symbol, point in prices.items()} == \
+        {'BTC': 65000.0, 'ETH': 3200.5}
+
+
+def test_price_checker_offline(tmp_path, monkeypatch):
+    """Test that a cache + fixture chain prices tokens without CoinGecko"""
+    path = tmp_path / 'prices.json'
+    path.write_text(json.dumps({'BTC': 65000.0}))
+    monkeypatch.setattr(Config, 'PRICE_SOURCES', ['cache', 'fixture'])
+    monkeypatch.setattr(Config, 'PRICE_FIXTURE_PATH', str(path))
+    
+    checker = PriceChecker()
+    checker.cg = None  # any CoinGecko call would fail
+    
+    assert checker.extract_token_info("Win 2 BTC!")['estimated_value_usd'] == 130000.0
+    assert checker.get_token_price('ETH') is None
+
+
+def test_unknown_source_rejected(monkeypatch):
+    """Test that a misspelled PRICE_SOURCES entry fails at startup"""
+    monkeypatch.setattr(Config, 'PRICE_SOURCES', ['cache', 'coingeko'])
+    with pytest.raises(ValueError):
+        PriceChecker()
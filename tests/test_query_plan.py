@@ -0,0 +1,43 @@
+"""
+Tests for query plan audit
+"""
+from sqlalchemy import inspect, text
+
+from models import get_engine, init_db
+from query_plan import audit, find_table_scans
+
+
+def test_no_unexpected_table_scans():
+    """Test that every audited query is served by an index"""
+    assert find_table_scans(audit()) == []
+
+
+def test_find_table_scans():
+    """Test table scan detection on plan lines"""
+    plans = {
+        'indexed': ['SEARCH giveaways USING INDEX ix_giveaways_fingerprint (fingerprint=?)'],
+        'covering': ['SCAN giveaways USING COVERING INDEX ix_giveaways_fingerprint'],
+        'full scan': ['SCAN giveaways'],
+    }
+    assert find_table_scans(plans) == ['full scan']
+
+
+def test_migration_adds_missing_indexes():
+    """Test that init_db restores missing indexes and drops obsolete ones"""
+    init_db()
+    engine = get_engine()
+    with engine.begin() as conn:
+        conn.execute(text('DROP INDEX ix_giveaways_fingerprint'))
+        conn.execute(text('CREATE INDEX ix_giveaways_won ON giveaways (won)'))
+    
+    init_db()
+    
+    names = {index['name'] for index in inspect(engine).get_indexes('giveaways')}
+    assert 'ix_giveaways_fingerprint' in names
+    assert 'ix_giveaways_won' not in names
+
+
+def test_subquery_scans_not_flagged():
+    """Test that scanning a materialized subquery is not reported"""
+    plans = {'token summary': ['MATERIALIZE anon_1', 'SCAN anon_1']}
+    assert find_table_scans(plans) == []
@@ -0,0 +1,59 @@
+"""
+Tests for slotted pipeline records
+"""
+import json
+
+import pytest
+
+from records import TokenInfo, TweetCandidate
+
+
+def test_tweet_candidate_dict_access():
+    """Records read and write like the dictionaries they replaced"""
+    tweet = TweetCandidate(id=1, text="Win 2 ETH!", author_followers=500)
+
+    assert tweet['text'] == "Win 2 ETH!"
+    assert tweet.get('author_followers', 0) == 500
+    assert tweet.get('missing', 'default') == 'default'
+    assert 'fingerprint' in tweet
+    assert 'missing' not in tweet
+
+    tweet['matched_keywords'] = ['giveaway']
+    assert tweet.matched_keywords == ['giveaway']
+    with pytest.raises(KeyError):
+        tweet['missing']
+    with pytest.raises(KeyError):
+        tweet['missing'] = 1
+
+
+def test_records_have_no_instance_dict():
+    """Fields live in slots; unknown attributes cannot be added"""
+    tweet = TweetCandidate(id=1, text="text")
+    info = TokenInfo(token_symbol='BTC')
+
+    assert not hasattr(tweet, '__dict__')
+    assert not hasattr(info, '__dict__')
+    with pytest.raises(AttributeError):
+        tweet.extra = 1
+
+
+def test_from_dict_round_trip():
+    """Corpus lines convert to records and back, ignoring unknown keys"""
+    data = {'id': 7, 'text': "100 SOL giveaway", 'author_id': 3, 'author_username': 'org',
+            'author_followers': 10, 'created_at': None, 'retweet_count': 1, 'like_count': 2,
+            'extra': 'ignored'}
+    tweet = TweetCandidate.from_dict(data)
+
+    assert tweet.id == 7
+    assert tweet.matched_keywords is None
+    assert TweetCandidate.from_dict(tweet) is tweet
+    del data['extra']
+    assert tweet == dict(data, matched_keywords=None, fingerprint=None, token_symbol=None)
+    assert json.loads(json.dumps(tweet.to_dict()))['text'] == "100 SOL giveaway"
+
+
+def test_token_info_defaults():
+    """An empty TokenInfo matches the old no-token dictionary"""
+    assert TokenInfo() == {'token_symbol': None, 'token_name': None, 'estimated_amount': None,
+                           'token_price_usd': None, 'estimated_value_usd': None}
+    assert TokenInfo(token_symbol='BTC') != TokenInfo(token_symbol='ETH')
@@ -0,0 +1,74 @@
+"""
+Tests for rollup tables
+"""
+from datetime import datetime, timedelta
+
+from models import DailyStats, DailyTokenStats, Giveaway, WinnerNotification
+from rollups import (rebuild_rollups, record_giveaways, record_participation, record_win,
+                     record_winner_notification)
+
+
+def add_giveaways(db, *specs):
+    """Insert giveaways from (tweet_id, symbol, price, age_days) tuples"""
+    giveaways = [
+        Giveaway(tweet_id=tweet_id, author_id="1", author_username="user", tweet_text="Win",
+                 token_symbol=symbol, token_price_usd=price,
+                 created_at=datetime.utcnow() - timedelta(days=age_days))
+        for tweet_id, symbol, price, age_days in specs
+    ]
+    db.add_all(giveaways)
+    db.flush()
+    return giveaways
+
+
+def snapshot(db):
+    """Get the rollup tables as comparable values"""
+    daily = sorted(
+        (row.day, row.giveaways_found, row.participated, row.wins, row.winner_notifications)
+        for row in db.query(DailyStats)
+    )
+    tokens = sorted(
+        (row.day, row.token_symbol, row.giveaways, row.last_giveaway_id, row.last_price_usd)
+        for row in db.query(DailyTokenStats)
+    )
+    return daily, tokens
+
+
+def test_incremental_updates_match_rebuild(db):
+    """Test that recording events as they happen gives the same rollups as a rebuild"""
+    first = add_giveaways(db, ("1", "BTC", 50000.0, 0), ("2", "ETH", 3000.0, 3))
+    record_giveaways(db, first)
+    second = add_giveaways(db, ("3", "BTC", 51000.0, 0), ("4", None, None, 0))
+    record_giveaways(db, second)
+    
+    for giveaway in (first[0], first[1]):
+        giveaway.participated = True
+        record_participation(db, giveaway)
+    first[0].won = True
+    record_win(db, first[0])
+    db.add(WinnerNotification(account_number=1, notification_text="Congrats"))
+    record_winner_notification(db)
+    db.commit()
+    
+    incremental = snapshot(db)
+    rebuild_rollups(db)
+    
+    assert snapshot(db) == incremental
+    
+    daily, tokens = incremental
+    today = datetime.utcnow().date()
+    assert daily[-1] == (today, 3, 1, 1, 1)
+    assert (today, "BTC", 2, second[0].id, 51000.0) in tokens
+
+
+def test_older_price_does_not_replace_newer(db):
+    """Test that the last price follows the newest giveaway id"""
+    newer, older = add_giveaways(db, ("1", "SOL", 150.0, 0), ("2", "SOL", 140.0, 0))
+    newer.id, older.id = 10, 5
+    db.flush()
+    
+    record_giveaways(db, [newer])
+    record_giveaways(db, [older])
+    
+    row = db.query(DailyTokenStats).one()
+    assert (row.giveaways, row.last_giveaway_id, row.last_price_usd) == (2, 10, 150.0)
@@ -0,0 +1,116 @@
+"""
+Tests for search checkpoints and incremental search
+"""
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.suite import BenchmarkContext, make_bot
+from bot import TwitterGiveawayBot
+from config import Config
+from models import init_db
+from search_checkpoints import SearchCheckpoints
+
+
+@pytest.fixture
+def query():
+    """A search query no other test uses"""
+    init_db()
+    return f"giveaway {uuid.uuid4().hex}"
+
+
+def test_checkpoint_persists(query):
+    """Test that saved checkpoints are loaded by a new instance"""
+    checkpoints = SearchCheckpoints()
+    checkpoints.advance(query, 100)
+    checkpoints.advance(query, 250)
+    checkpoints.advance(query, 120)
+    
+    assert checkpoints.since_id(query) is None  # not saved yet
+    assert checkpoints.save() == 1
+    
+    restored = SearchCheckpoints()
+    restored.load()
+    assert restored.since_id(query) == '250'
+
+
+def test_stale_checkpoint_ignored(query):
+    """Test that a checkpoint older than the lookback window is not used"""
+    checkpoints = SearchCheckpoints(max_age_hours=24)
+    checkpoints.checkpoints[query] = ('250', datetime.utcnow() - timedelta(hours=25))
+    
+    assert checkpoints.since_id(query) is None
+
+
+class FakeSearchClient:
+    """Serves search results in pages"""
+    
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+    
+    def search_recent_tweets(self, **params):
+        self.calls.append(params)
+        index = int(params.get('next_token', 0))
+        tweets = self.pages[index]
+        meta = {'newest_id': str(tweets[0])} if tweets else {}
+        if index + 1 < len(self.pages):
+            meta['next_token'] = str(index + 1)
+        user = SimpleNamespace(id=1, username='organizer', public_metrics={})
+        data = [SimpleNamespace(id=tweet_id, text="Win", author_id=1, created_at=None,
+                                public_metrics={}) for tweet_id in tweets]
+        return SimpleNamespace(data=data, includes={'users': [user]}, meta=meta)
+
+
+def test_search_query_paginates_from_since_id():
+    """Test that a search follows next_token and reports the newest id"""
+    fake_bot = SimpleNamespace(search_client=FakeSearchClient([[30, 29], [28, 27], [26]]))
+    fake_bot._parse_search_page = lambda tweets: TwitterGiveawayBot._parse_search_page(
+        fake_bot, tweets
+    )
+    
+    tweets, newest_id = TwitterGiveawayBot._search_query(fake_bot, "crypto giveaway", since_id='25')
+    
+    assert [tweet['id'] for tweet in tweets] == [30, 29, 28, 27, 26]
+    assert newest_id == '30'
+    calls = fake_bot.search_client.calls
+    assert len(calls) == 3
+    assert all(call['since_id'] == '25' and 'start_time' not in call for call in calls)
+    assert calls[2]['next_token'] == '2'
+
+
+def test_search_query_without_checkpoint_uses_lookback():
+    """Test that a query without a checkpoint searches the lookback window"""
+    fake_bot = SimpleNamespace(search_client=FakeSearchClient([[]]))
+    fake_bot._parse_search_page = lambda tweets: TwitterGiveawayBot._parse_search_page(
+        fake_bot, tweets
+    )
+    
+    tweets, newest_id = TwitterGiveawayBot._search_query(fake_bot, "crypto giveaway")
+    
+    assert (tweets, newest_id) == ([], None)
+    assert 'start_time' in fake_bot.search_client.calls[0]
+
+
+def test_unpriced_giveaway_searched_again(session_factory, monkeypatch):
+    """Test that a giveaway left unpriced by a failing price source is found by the next pass"""
+    monkeypatch.setattr(Config, 'PRICE_SOURCE_COOLDOWN_SECONDS', 0)
+    bot = make_bot(BenchmarkContext(size=0))
+    tweet = {'id': 5_000_000, 'text': "GIVEAWAY! Win 100 $SOL! Follow @org, RT and like",
+             'author_id': 7, 'author_username': 'org', 'author_followers': 250_000,
+             'created_at': datetime.utcnow(), 'retweet_count': 10, 'like_count': 20}
+    bot.search_client.publish([tweet])
+    
+    def unavailable(ids, vs_currencies):
+        raise ConnectionError("CoinGecko is down")
+    
+    monkeypatch.setattr(bot.price_checker.cg, 'get_price', unavailable)
+    assert bot.search_giveaways() == []
+    assert all(int(bot.search_checkpoints.since_id(planned.query)) < tweet['id']
+               for planned in bot._build_search_queries())
+    
+    monkeypatch.undo()
+    assert [giveaway.id for giveaway in bot.search_giveaways()] == [tweet['id']]
+    assert bot.search_giveaways() == []
@@ -0,0 +1,51 @@
+"""
+Tests for search query planner
+"""
+from search_planner import KeywordRouter, plan_queries, render_query
+
+KEYWORDS = ["crypto giveaway", "token giveaway", "BTC giveaway", "win crypto"]
+FILTERS = "-is:retweet lang:en"
+
+
+def test_single_keyword_query_unchanged():
+    """Test that one keyword set renders like a plain query"""
+    assert render_query(["crypto giveaway"], FILTERS) == "crypto giveaway -is:retweet lang:en"
+
+
+def test_keywords_merged_into_one_query():
+    """Test that keyword sets are OR-combined when they fit"""
+    plans = plan_queries(KEYWORDS, FILTERS)
+    
+    assert len(plans) == 1
+    assert plans[0].query == (
+        "((crypto giveaway) OR (token giveaway) OR (BTC giveaway) OR (win crypto)) "
+        "-is:retweet lang:en"
+    )
+    assert plans[0].keywords == tuple(KEYWORDS)
+
+
+def test_length_limit_splits_queries():
+    """Test that no query exceeds the length limit and every keyword is covered"""
+    plans = plan_queries(KEYWORDS, FILTERS, max_length=70)
+    
+    assert len(plans) > 1
+    assert all(len(plan.query) <= 70 for plan in plans)
+    assert [keyword for plan in plans for keyword in plan.keywords] == KEYWORDS
+
+
+def test_oversized_keyword_gets_own_query():
+    """Test that a keyword set longer than the limit is still searched"""
+    plans = plan_queries(["crypto giveaway", "x" * 100], FILTERS, max_length=50)
+    
+    assert [plan.keywords for plan in plans] == [("crypto giveaway",), ("x" * 100,)]
+
+
+def test_router_matches_all_terms_as_words():
+    """Test that results are attributed to the keyword sets they match"""
+    router = KeywordRouter(KEYWORDS)
+    
+    assert router.match("Huge GIVEAWAY! Win 1 $BTC, crypto fans") == [
+        "crypto giveaway", "BTC giveaway", "win crypto"
+    ]
+    assert router.match("Win some cryptocurrency") == []
+    assert router.match("token giveaway", keywords=["crypto giveaway"]) == []
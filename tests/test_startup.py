@@ -0,0 +1,91 @@
+"""
+Tests for import-time budgets of the entry points
+
+Each check runs `python -X importtime` in a fresh interpreter. Budgets are
+multiples of the time it takes to import SQLAlchemy's ORM in the same
+environment, so a slow CI runner or another Python version scales both sides
+alike. They are loose (about twice the measured ratio or more) and catch a
+whole dependency tree creeping back into module load; the exact clients that
+must stay deferred are checked by module name below.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Every import budget is relative to this module's import time
+BASELINE_MODULE = 'sqlalchemy.orm'
+
+# Module -> cumulative import time budget, as a multiple of BASELINE_MODULE's
+IMPORT_BUDGETS = {
+    'config': 0.25,
+    'main': 0.5,
+    'stats': 2.0,
+    'query_plan': 2.5,
+    'bot': 2.5,
+}
+
+# Imported only when a client is actually created
+DEFERRED_MODULES = ('tweepy', 'requests', 'schedule')
+
+
+def _run(args) -> subprocess.CompletedProcess:
+    # Run outside the repo so importing main does not create bot.log there
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    with tempfile.TemporaryDirectory() as cwd:
+        return subprocess.run([sys.executable, *args], cwd=cwd, env=env,
+                              capture_output=True, text=True, check=True)
+
+
+def _import_time_ms(module: str) -> float:
+    """Cumulative import time of a module in a fresh interpreter"""
+    completed = _run(['-X', 'importtime', '-c', f'import {module}'])
+    for line in completed.stderr.splitlines():
+        parts = line.split('|')
+        # Top-level imports are the only lines without extra indentation
+        if len(parts) == 3 and parts[2] == f' {module}':
+            return int(parts[1]) / 1000
+    raise AssertionError(f"No import time reported for {module}:\n{completed.stderr}")
+
+
+def _best_import_time_ms(module: str) -> float:
+    # Best of three, so a busy machine or a cold bytecode cache does not fail the test
+    return min(_import_time_ms(module) for _ in range(3))
+
+
+def _loaded_modules(code: str) -> set:
+    completed = _run(['-c', f'{code}\nimport sys\nprint(" ".join(sys.modules))'])
+    return set(completed.stdout.split())
+
+
+@pytest.fixture(scope='module')
+def baseline_ms() -> float:
+    """Import time of BASELINE_MODULE on this machine"""
+    return _best_import_time_ms(BASELINE_MODULE)
+
+
+@pytest.mark.parametrize('module', sorted(IMPORT_BUDGETS))
+def test_import_time_budget(module, baseline_ms):
+    """Test that importing an entry point stays within its budget"""
+    best = _best_import_time_ms(module)
+    budget = IMPORT_BUDGETS[module] * baseline_ms
+    assert best <= budget, (f"import {module} took {best:.0f} ms, {best / baseline_ms:.2f}x "
+                            f"{BASELINE_MODULE} (budget {IMPORT_BUDGETS[module]}x = {budget:.0f} ms)")
+
+
+@pytest.mark.parametrize('module', ['bot', 'main', 'stats', 'query_plan', 'giveaway_parser'])
+def test_api_clients_not_imported(module):
+    """Test that the Twitter and CoinGecko clients are not imported at module load"""
+    loaded = _loaded_modules(f'import {module}')
+    assert not loaded & set(DEFERRED_MODULES)
+
+
+def test_engine_created_on_first_use():
+    """Test that importing the models does not create the database engine"""
+    loaded = _loaded_modules('import models, stats\nassert models.engine is None')
+    assert 'sqlalchemy.dialects.sqlite' not in loaded
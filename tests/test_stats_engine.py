@@ -0,0 +1,66 @@
+"""
+Tests for statistics engine
+"""
+from datetime import datetime, timedelta
+
+from models import Account, Giveaway, WinnerNotification
+from price_history import record_prices
+from rollups import rebuild_rollups
+from stats_engine import collect_statistics
+
+
+def add_giveaway(db, tweet_id, symbol=None, price=None, participated=False, won=False, age_days=0):
+    db.add(Giveaway(
+        tweet_id=tweet_id,
+        author_id="1",
+        author_username="user",
+        tweet_text="Win",
+        token_symbol=symbol,
+        token_price_usd=price,
+        participated=participated,
+        won=won,
+        created_at=datetime.utcnow() - timedelta(days=age_days)
+    ))
+
+
+def test_collect_statistics(db):
+    """Test aggregate figures and joined details"""
+    add_giveaway(db, "1", "BTC", 50000.0, participated=True, won=True)
+    add_giveaway(db, "2", "BTC", 51000.0, participated=True)
+    add_giveaway(db, "3", "ETH", 3000.0, age_days=30)
+    add_giveaway(db, "4")
+    db.add(Account(account_number=1, username="bot1", total_wins=1, total_participations=2))
+    db.add(Account(account_number=2, username="bot2", is_active=False))
+    db.add(WinnerNotification(account_number=1, notification_text="Congrats"))
+    db.add(WinnerNotification(account_number=7, notification_text="Congrats"))
+    db.commit()
+    rebuild_rollups(db)
+    record_prices({'BTC': 60000.0}, db=db)
+    
+    stats = collect_statistics(db)
+    
+    assert stats.total_giveaways == 4
+    assert stats.participated == 2
+    assert stats.wins == 1
+    assert stats.win_rate == 50.0
+    assert stats.total_accounts == 2
+    assert stats.active_accounts == 1
+    assert stats.recent_giveaways == 3
+    assert stats.recent_participations == 2
+    assert stats.recent_wins == 2
+    assert sorted(win.username or '' for win in stats.recent_win_list) == ['', 'bot1']
+    assert stats.top_accounts[0].username == "bot1"
+    assert stats.unique_tokens == 2
+    assert [(t.symbol, t.giveaways, t.last_price_usd) for t in stats.tokens] == [
+        ('BTC', 2, 51000.0), ('ETH', 1, 3000.0)
+    ]
+    assert [t.latest_price_usd for t in stats.tokens] == [60000.0, None]
+    assert stats.as_dict()['win_rate'] == "50.00%"
+
+
+def test_empty_database(db):
+    """Test statistics on an empty database"""
+    stats = collect_statistics(db)
+    
+    assert stats.total_giveaways == 0
+    assert stats.as_dict()['win_rate'] == "0%"
@@ -0,0 +1,72 @@
+"""
+Tests for tweet corpus files and corpus replay
+"""
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.corpus import generate_tweets
+from benchmarks.replay import replay
+from tweet_corpus import read_corpus, write_corpus
+
+
+@pytest.mark.parametrize('name', ['corpus.jsonl', 'corpus.jsonl.gz'])
+def test_corpus_round_trip(tmp_path, name):
+    """Test that tweets read back equal to what was written, compressed or not"""
+    path = str(tmp_path / name)
+    tweets = list(generate_tweets(20, seed=3))
+    
+    assert write_corpus(tweets[:15], path) == 15
+    assert write_corpus(tweets[15:], path, append=True) == 5
+    
+    assert list(read_corpus(path)) == tweets
+
+
+def test_corpus_keeps_timezones(tmp_path):
+    """Test that timezone-aware created_at values (as tweepy returns them) survive"""
+    path = str(tmp_path / 'corpus.jsonl.gz')
+    created_at = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    write_corpus([{'id': 1, 'text': 'gm', 'created_at': created_at, 'matched_keywords': []}], path)
+    
+    assert next(read_corpus(path))['created_at'] == created_at
+
+
+class FakeClock:
+    """Clock that only advances when slept on or when a tweet is processed"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_replay_paces_tweets():
+    """Test that replay spaces tweets by the target rate and counts accepted giveaways"""
+    clock = FakeClock()
+    started = []
+    
+    def process(tweet_data):
+        started.append(clock.now)
+        clock.now += 0.001
+        return tweet_data['id'] % 2 == 0
+    
+    flushed = []
+    fake_bot = SimpleNamespace(
+        _process_potential_giveaway=process,
+        giveaway_writer=SimpleNamespace(flush=lambda: flushed.append(True)),
+    )
+    tweets = [{'id': i} for i in range(10)]
+    
+    report = replay(fake_bot, tweets, rate=100, clock=clock, sleep=clock.sleep)
+    
+    assert started == pytest.approx([i / 100 for i in range(10)])
+    assert report.tweets == 10
+    assert report.accepted == 5
+    assert report.max_lag_ms == 0
+    assert report.p50_ms == pytest.approx(1.0)
+    assert flushed == [True]
@@ -0,0 +1,85 @@
+"""
+Tests for winner detector module
+"""
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+import models
+from models import SessionLocal, WinnerNotification, hash_text, init_db
+from winner_detector import WinnerDetector
+
+
+class FakeAccountManager:
+    """Stand-in for TwitterAccountManager that records stat updates"""
+    
+    def __init__(self):
+        self.wins = []
+    
+    def update_account_stats(self, account_number, participated=False, won=False):
+        if won:
+            self.wins.append(account_number)
+
+
+@pytest.fixture
+def detector():
+    """Create a detector with a fake account manager"""
+    init_db()
+    return WinnerDetector(FakeAccountManager())
+
+
+def count_notifications(account_number):
+    """Count stored notifications for an account"""
+    db = SessionLocal()
+    try:
+        return db.query(WinnerNotification).filter_by(account_number=account_number).count()
+    finally:
+        db.close()
+
+
+def test_duplicate_source_tweet_ignored(detector):
+    """Test that the same mention is only stored once"""
+    account_number = uuid.uuid4().int % 10**9
+    tweet_id = uuid.uuid4().hex[:20]
+    
+    detector._save_winner_notification(account_number, 'mention', "Congrats, you won!", tweet_id)
+    detector._save_winner_notification(account_number, 'mention', "Congrats, you won! (edited)", tweet_id)
+    
+    assert count_notifications(account_number) == 1
+    assert detector.account_manager.wins == [account_number]
+
+
+def test_duplicate_text_ignored(detector):
+    """Test that identical text from another tweet is treated as a duplicate"""
+    account_number = uuid.uuid4().int % 10**9
+    
+    detector._save_winner_notification(account_number, 'mention', "You are the winner!", '1')
+    detector._save_winner_notification(account_number, 'mention', "You are the winner!", '2')
+    detector._save_winner_notification(account_number, 'mention', "Claim your prize", '3')
+    
+    assert count_notifications(account_number) == 2
+
+
+def test_migration_adds_hash_columns(monkeypatch, tmp_path):
+    """Test that an old winner_notifications table gains and backfills the new columns"""
+    old_engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with old_engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE winner_notifications (id INTEGER PRIMARY KEY, giveaway_id INTEGER, "
+            "account_number INTEGER, notification_type VARCHAR(20), notification_text TEXT, "
+            "received_at DATETIME, processed BOOLEAN)"
+        ))
+        conn.execute(text(
+            "INSERT INTO winner_notifications (account_number, notification_text) VALUES (1, 'Congrats')"
+        ))
+    monkeypatch.setattr(models, 'engine', old_engine)
+    
+    models.init_db()
+    
+    columns = {column['name'] for column in inspect(old_engine).get_columns('winner_notifications')}
+    assert {'source_tweet_id', 'content_hash'} <= columns
+    with old_engine.connect() as conn:
+        stored = conn.execute(text("SELECT content_hash FROM winner_notifications")).scalar()
+    assert stored == hash_text('Congrats')
+    old_engine.dispose()
@@ -0,0 +1,66 @@
+"""
+Tweet corpus files: search results stored as JSON lines (gzip-compressed for .gz paths)
+
+Used to record what the search returns in production (CORPUS_RECORD_PATH) and
+to replay recorded or synthetic corpora offline (python -m benchmarks.replay).
+"""
+import gzip
+import json
+from datetime import datetime
+from typing import Dict, IO, Iterable, Iterator
+
+
+def _open(path: str, mode: str) -> IO:
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot store {type(value).__name__} in a tweet corpus")
+
+
+def write_corpus(tweets: Iterable[Dict], path: str, append: bool = False) -> int:
+    """
+    Write tweet dictionaries to a corpus file
+
+    Appending to a .gz file adds a new gzip member, which read_corpus reads
+    transparently.
+
+    Args:
+        tweets: Tweets in the format returned by TwitterGiveawayBot._search_query
+        path: Output file (.jsonl or .jsonl.gz)
+        append: Add to the file instead of replacing it
+
+    Returns:
+        Number of tweets written
+    """
+    count = 0
+    with _open(path, 'a' if append else 'w') as f:
+        for tweet_data in tweets:
+            f.write(json.dumps(tweet_data, default=_encode, ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def read_corpus(path: str) -> Iterator[Dict]:
+    """
+    Read tweet dictionaries from a corpus file, one line at a time
+
+    Args:
+        path: Corpus file (.jsonl or .jsonl.gz)
+
+    Yields:
+        Tweet dictionaries, with created_at parsed back to a datetime
+    """
+    with _open(path, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            tweet_data = json.loads(line)
+            if isinstance(tweet_data.get('created_at'), str):
+                tweet_data['created_at'] = datetime.fromisoformat(tweet_data['created_at'])
+            yield tweet_data
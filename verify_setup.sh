@@ -103,7 +103,7 @@ echo "────────────────────────
 if [ -f ".venv/bin/python" ]; then
     PACKAGES=$(.venv/bin/python -m pip list 2>/dev/null)
     
-    for pkg in tweepy requests python-dotenv schedule pycoingecko sqlalchemy black isort pylint flake8 pytest; do
+    for pkg in tweepy requests python-dotenv schedule sqlalchemy black isort pylint flake8 pytest; do
         if echo "$PACKAGES" | grep -qi "^${pkg}"; then
             echo "  ✅ $pkg"
         else
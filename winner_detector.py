@@ -1,9 +1,10 @@
 """
 Winner detection system for monitoring DMs and mentions
 """
-import tweepy
 from typing import List, Dict, Optional
-from models import WinnerNotification, Giveaway, SessionLocal
+from models import WinnerNotification, Giveaway, SessionLocal, hash_text, insert_ignoring_conflicts
+from metrics import metrics
+from rollups import record_win, record_winner_notification
 from account_manager import TwitterAccountManager
 from datetime import datetime, timedelta
 import logging
@@ -82,6 +83,7 @@ class WinnerDetector:
                 max_results=100,
                 tweet_fields=['created_at', 'author_id', 'text']
             )
+            metrics.increment('api_calls', api='twitter_mentions')
             
             if not mentions.data:
                 return
@@ -124,12 +126,15 @@ class WinnerDetector:
                                    notification_text: str, tweet_id: str = None, 
                                    author_id: str = None):
         """Save winner notification to database"""
+        content_hash = hash_text(notification_text)
+        source_tweet_id = str(tweet_id) if tweet_id is not None else None
+        
         db = SessionLocal()
         try:
-            # Check if notification already exists
-            existing = db.query(WinnerNotification).filter_by(
+            # Check if notification already exists (indexed point lookup on the hash)
+            existing = db.query(WinnerNotification.id).filter_by(
                 account_number=account_number,
-                notification_text=notification_text
+                content_hash=content_hash
             ).first()
             
             if existing:
@@ -137,6 +142,7 @@ class WinnerDetector:
             
             # Find related giveaway if possible
             giveaway_id = None
+            newly_won = None
             if author_id:
                 giveaway = db.query(Giveaway).filter_by(
                     author_id=author_id,
@@ -145,18 +151,31 @@ class WinnerDetector:
                 
                 if giveaway:
                     giveaway_id = giveaway.id
+                    if not giveaway.won:
+                        newly_won = giveaway
                     giveaway.won = True
                     giveaway.winner_announced = True
             
-            # Save notification
-            notification = WinnerNotification(
-                giveaway_id=giveaway_id,
-                account_number=account_number,
-                notification_type=notification_type,
-                notification_text=notification_text
-            )
-            db.add(notification)
-            db.commit()
+            # Save notification; the same source tweet is only stored once per account
+            inserted = insert_ignoring_conflicts(db, WinnerNotification.__table__, [{
+                'giveaway_id': giveaway_id,
+                'account_number': account_number,
+                'notification_type': notification_type,
+                'notification_text': notification_text,
+                'source_tweet_id': source_tweet_id,
+                'content_hash': content_hash,
+            }], ['account_number', 'source_tweet_id'])
+            
+            if not inserted:
+                db.rollback()
+                return
+            
+            record_winner_notification(db)
+            if newly_won is not None:
+                record_win(db, newly_won)
+            with metrics.span('db_commit', op='winner_notification'):
+                db.commit()
+            metrics.increment('rows_written', table='winner_notifications')
             
             # Update account stats
             self.account_manager.update_account_stats(account_number, won=True)